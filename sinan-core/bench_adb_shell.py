@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+ADB 执行方式对比：每次新建 adb 进程 vs 常驻 adb shell 会话
+
+用法: python bench_adb_shell.py <serial> [次数]
+使用无副作用的 `true` 命令测量每秒可执行的操作数
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.drivers.android import AndroidDevice
+
+
+def bench(device: AndroidDevice, count: int) -> float:
+    """执行 count 次空命令，返回每秒操作数"""
+    device._shell("true")  # 预热（建立会话）
+    start = time.perf_counter()
+    for _ in range(count):
+        device._shell("true")
+    elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    serial = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    subprocess_ops = bench(AndroidDevice(serial, use_shell_session=False), count)
+    session_device = AndroidDevice(serial, use_shell_session=True)
+    session_ops = bench(session_device, count)
+    session_device.disconnect()
+
+    print(f"设备: {serial}  次数: {count}")
+    print(f"  subprocess 单次调用: {subprocess_ops:8.1f} ops/s")
+    print(f"  常驻 shell 会话:     {session_ops:8.1f} ops/s")
+    print(f"  加速比: {session_ops / subprocess_ops:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+决策缓存收益测试：每条指令完整匹配 vs 按屏幕指纹命中缓存
+
+用法: python bench_decision_cache.py [items ...]
+每轮模拟一次新的 UI dump（新的元素存储，匹配索引需要重建），比较：
+- 不使用缓存时 decide_strategy 的耗时（建索引 + 分词 + 匹配）
+- 按元素重新计算 elements_fingerprint 作为屏幕指纹的耗时
+- 以 UITreeDiffer 快照的结构哈希为指纹命中缓存的耗时（指纹随增量解析得到）
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from bench_ui_parser import make_dump
+from sinan_core.agents.decision_cache import DecisionCache, elements_fingerprint
+from sinan_core.agents.executor import ExecutionAgent
+from sinan_core.agents.ui_diff import UITreeDiffer
+from sinan_core.agents.ui_parser import UITreeParser
+
+INSTRUCTION = "点击新鲜草莓 7 号"
+
+
+def measure(func, repeat: int = 20) -> float:
+    """返回最快一次的耗时（ms）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench(parser: UITreeParser, items: int):
+    xml = make_dump(items)
+    snapshot = UITreeDiffer(parser).snapshot_android(xml)
+    elements = snapshot.elements()
+    print(f"{items} 个列表项，{len(elements)} 个元素:")
+
+    store = parser.parse_android_store(xml)
+    plain = ExecutionAgent()
+    cached = ExecutionAgent(decision_cache=DecisionCache())
+    cached.decide_strategy(INSTRUCTION, store)
+    cached.decide_strategy(INSTRUCTION, elements, snapshot.fingerprint)
+
+    parse_ms = measure(lambda: parser.parse_android_store(xml))
+    match_ms = measure(lambda: plain.decide_strategy(INSTRUCTION, parser.parse_android_store(xml))) - parse_ms
+    print(f"  {'解析（不计入下列各项）':<20} {parse_ms:8.3f} ms")
+    print(f"  {'完整匹配（含建索引）':<20} {match_ms:8.3f} ms")
+    for label, func in [
+        ("elements_fingerprint", lambda: elements_fingerprint(store)),
+        ("命中缓存（重新计算指纹）", lambda: cached.decide_strategy(INSTRUCTION, store)),
+        ("命中缓存（快照指纹）", lambda: cached.decide_strategy(INSTRUCTION, elements, snapshot.fingerprint)),
+    ]:
+        print(f"  {label:<20} {measure(func):8.3f} ms")
+
+
+def main():
+    parser = UITreeParser()
+    for items in [int(a) for a in sys.argv[1:]] or [20, 200, 2000]:
+        bench(parser, items)
+
+
+if __name__ == "__main__":
+    main()
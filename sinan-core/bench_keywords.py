@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+指令关键词提取效果测试：旧版按空白切分 vs 屏幕词表最大匹配分词
+
+用法: python bench_keywords.py [corpus.json]
+默认使用 tests/fixtures/instruction_corpus.json，每条记录包含指令、
+当时屏幕上的元素文本和期望命中的元素。统计两种分词方式下
+UI_TREE 策略直接命中期望元素的比例。
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.agents.executor import ExecutionAgent, ExecutionStrategy
+
+DEFAULT_CORPUS = Path(__file__).parent / "tests" / "fixtures" / "instruction_corpus.json"
+
+
+def legacy_extract_keywords(instruction: str) -> list[str]:
+    """旧版关键词提取：删除动词后按空白切分"""
+    verbs = ["点击", "点", "按", "选择", "打开", "进入", "找到", "tap", "click"]
+    text = instruction
+    for verb in verbs:
+        text = text.replace(verb, " ")
+    keywords = [w.strip() for w in text.split() if w.strip()]
+    return keywords or [instruction]
+
+
+class LegacyAgent(ExecutionAgent):
+    """使用旧版关键词提取的执行 Agent"""
+
+    def _extract_keywords(self, instruction, vocabulary=frozenset()):
+        return legacy_extract_keywords(instruction)
+
+
+def hit_rate(agent: ExecutionAgent, corpus: list[dict]) -> tuple[float, list[str]]:
+    """UI_TREE 直接命中期望元素的比例及未命中的指令"""
+    misses = []
+    for record in corpus:
+        elements = [
+            {"text": text, "center": [0, i * 100]}
+            for i, text in enumerate(record["screen"])
+        ]
+        strategy, target = agent.decide_strategy(record["instruction"], elements)
+        if strategy != ExecutionStrategy.UI_TREE or target["text"] != record["target"]:
+            misses.append(f"{record['instruction']} -> {strategy.value}")
+    return 1 - len(misses) / len(corpus), misses
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    corpus = json.loads(path.read_text(encoding="utf-8"))
+    print(f"语料: {path.name}，{len(corpus)} 条指令\n")
+
+    for name, agent in (("旧版按空白切分", LegacyAgent()), ("最大匹配分词", ExecutionAgent())):
+        rate, misses = hit_rate(agent, corpus)
+        print(f"{name}: UI_TREE 命中率 {rate:.0%}")
+        for miss in misses:
+            print(f"    未命中: {miss}")
+
+    # 分词缓存：同一屏幕上重复执行语料
+    agent = ExecutionAgent()
+    rounds = 50
+    start = time.perf_counter()
+    for _ in range(rounds):
+        hit_rate(agent, corpus)
+    elapsed = time.perf_counter() - start
+    tokenizer = agent.tokenizer
+    total = tokenizer.hits + tokenizer.misses
+    print(f"\n重复 {rounds} 轮: 每条决策 {elapsed / (rounds * len(corpus)) * 1e6:.1f}us，"
+          f"分词缓存命中率 {tokenizer.hits / total:.0%}")
+
+
+if __name__ == "__main__":
+    main()
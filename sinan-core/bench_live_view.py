@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+实时画面推送性能测试：瓦片差异帧与整帧对比
+
+用法: python bench_live_view.py [--frames 60] [--tile 128]
+
+生成 1080x2400 的模拟画面序列，分三种场景：
+- 静止：只有状态栏时钟变化
+- 局部：进度条和一个列表项在变化
+- 滚动：整屏内容上移（最坏情况，退化为关键帧）
+对每个场景统计每帧平均推送体积（整帧 JPEG vs 差异帧）和差异计算 + 编码耗时。
+"""
+import argparse
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.api.frames import pack_live_frame
+from sinan_core.drivers.frame_encoder import PREVIEW
+from sinan_core.drivers.tile_diff import TileDiffer
+
+SCREEN_SIZE = (1080, 2400)
+
+
+def render(index: int, scenario: str) -> Image.Image:
+    """渲染第 index 帧"""
+    offset = index * 40 if scenario == "滚动" else 0
+    image = Image.new("RGB", SCREEN_SIZE, (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    for i in range(-1, 20):
+        top = 200 + i * 140 - offset % 140
+        color = (40 + (i + offset // 140) * 7 % 200, 120, 200)
+        draw.rounded_rectangle([40, top, SCREEN_SIZE[0] - 40, top + 110], radius=16, fill=color)
+    draw.rectangle([0, 0, SCREEN_SIZE[0], 80], fill=(30, 30, 30))
+    draw.text((SCREEN_SIZE[0] - 160, 30), f"12:{index % 60:02d}", fill="white")
+    if scenario == "局部":
+        draw.rectangle([40, 1200, 40 + index * 16 % 1000, 1220], fill=(255, 64, 0))
+        draw.text((80, 640), f"Downloading {index}%", fill="white")
+    return image
+
+
+def full_frame(image: Image.Image) -> int:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=PREVIEW.quality)
+    return len(buffer.getvalue())
+
+
+def delta_frame(differ: TileDiffer, image: Image.Image, seq: int) -> int:
+    delta = differ.diff(image)
+    if delta.empty:
+        return 0
+    regions = []
+    for x, y, region in delta.regions:
+        buffer = BytesIO()
+        region.save(buffer, format="JPEG", quality=PREVIEW.quality)
+        regions.append((x, y, buffer.getvalue()))
+    return len(pack_live_frame(1, seq, PREVIEW, delta.size, regions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--tile", type=int, default=128)
+    args = parser.parse_args()
+
+    print(f"{'场景':>4} {'整帧/帧':>9} {'差异帧/帧':>9} {'节省':>7} {'整帧编码':>9} {'差异+编码':>9}")
+    for scenario in ("静止", "局部", "滚动"):
+        frames = [render(i, scenario) for i in range(args.frames)]
+
+        start = time.perf_counter()
+        full = sum(full_frame(image) for image in frames)
+        full_time = time.perf_counter() - start
+
+        differ = TileDiffer(tile_size=args.tile)
+        start = time.perf_counter()
+        # 首帧为关键帧，两种方式都要发送，只统计之后的帧
+        delta_frame(differ, frames[0], 0)
+        delta = sum(delta_frame(differ, image, seq) for seq, image in enumerate(frames[1:], 1))
+        delta_time = time.perf_counter() - start
+        full -= full_frame(frames[0])
+
+        n = args.frames - 1
+        print(f"{scenario:>4} {full / n / 1024:>7.1f}KB {delta / n / 1024:>7.1f}KB "
+              f"{1 - delta / full:>7.1%} {full_time / args.frames * 1000:>7.1f}ms "
+              f"{delta_time / args.frames * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
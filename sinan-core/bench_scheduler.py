@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+多设备并行调度吞吐量测试（模拟设备）
+
+用法: python bench_scheduler.py [设备数] [用例数]
+模拟设备的每次操作耗时 50~150ms，对比 1 台设备与 N 台设备的用例吞吐量
+"""
+import asyncio
+import random
+import sys
+from pathlib import Path
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.agents.scheduler import CaseScheduler, DeviceSlot
+from sinan_core.drivers.async_base import AsyncBaseDevice
+from sinan_core.models.case import TestCase, TestStep
+
+
+class FakeDevice(AsyncBaseDevice):
+    """模拟设备，操作耗时随机"""
+
+    async def connect(self): return True
+    async def disconnect(self): pass
+    async def get_ui_tree(self): return {}
+
+    async def _act(self) -> bool:
+        await asyncio.sleep(random.uniform(0.05, 0.15))
+        return True
+
+    async def tap(self, x, y): return await self._act()
+    async def swipe(self, x1, y1, x2, y2, duration_ms=300): return await self._act()
+    async def input_text(self, text): return await self._act()
+
+    async def screenshot(self):
+        return Image.new("RGB", (108, 240))
+
+
+def make_cases(count: int) -> list[TestCase]:
+    cases = []
+    for i in range(count):
+        case = TestCase(case_id=f"tc_{i:04d}", case_name=f"用例{i}")
+        for j in range(3):
+            case.add_step(TestStep(step_id=j + 1, action="tap", target_desc="", coordinates=[1, 1]))
+        cases.append(case)
+    return cases
+
+
+async def bench(devices: int, cases: int):
+    slots = [DeviceSlot(f"fake-{i}", "android", FakeDevice()) for i in range(devices)]
+    scheduler = CaseScheduler(slots)
+    async for _ in scheduler.run(make_cases(cases)):
+        pass
+    stats = scheduler.stats
+    print(f"  {devices:3d} 台设备: {stats.cases} 个用例 / {stats.elapsed:6.2f} s  "
+          f"吞吐量 {stats.throughput:6.2f} 用例/s  窃取 {stats.stolen} 次")
+    return stats.throughput
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    cases = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    print(f"用例数: {cases}，每个用例 3 步")
+    single = asyncio.run(bench(1, cases))
+    multi = asyncio.run(bench(devices, cases))
+    print(f"  加速比: {multi / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
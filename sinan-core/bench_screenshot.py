@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Android 截图方式对比：原始帧缓冲 vs exec-out 内存直读 vs screencap + pull 临时文件
+
+用法: python bench_screenshot.py <serial> [帧数]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.drivers.android import AndroidDevice
+
+
+def bench(capture, frames: int) -> list[float]:
+    """连续截图 frames 次，返回每帧耗时（毫秒）"""
+    capture()  # 预热
+    latencies = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        capture()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list[float]):
+    """打印延迟统计"""
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {name:<20} 平均 {statistics.mean(latencies):7.1f} ms  "
+          f"中位 {statistics.median(latencies):7.1f} ms  P95 {p95:7.1f} ms")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    serial = sys.argv[1]
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    device = AndroidDevice(serial)
+
+    print(f"设备: {serial}  帧数: {frames}")
+    if device._screenshot_exec_out() is None:
+        print("  exec-out 截图不可用")
+    else:
+        report("exec-out 内存直读", bench(device._screenshot_exec_out, frames))
+    if device._screenshot_raw() is None:
+        print("  原始帧缓冲截图不可用")
+    else:
+        report("原始帧缓冲", bench(device._screenshot_raw, frames))
+    report("screencap + pull", bench(device._screenshot_pull, frames))
+    device.disconnect()
+
+
+if __name__ == "__main__":
+    main()
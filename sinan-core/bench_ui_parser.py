@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+UI 树解析性能测试：旧版整树解析 + 递归遍历 vs 流式解析
+
+用法: python bench_ui_parser.py [dump.xml ...]
+不传文件时生成约 1.7MB 的模拟 RecyclerView dump（约 10000 个节点）
+"""
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.agents.bounds import compute_geometry, decode_bounds
+from sinan_core.agents.ui_parser import UITreeParser
+
+
+def legacy_parse_android(xml_content: str) -> list[dict]:
+    """旧版解析器：ET.fromstring + 递归遍历"""
+    elements = []
+
+    def traverse(node):
+        nums = re.findall(r'\d+', node.get("bounds", "[0,0][0,0]"))
+        bounds = [int(x) for x in nums] if len(nums) == 4 else [0, 0, 0, 0]
+        element = {
+            "text": node.get("text", ""),
+            "class": node.get("class", ""),
+            "content_desc": node.get("content-desc", ""),
+            "resource_id": node.get("resource-id", ""),
+            "bounds": bounds,
+            "center": [(bounds[0] + bounds[2]) // 2, (bounds[1] + bounds[3]) // 2],
+        }
+        if element["text"] or element["content_desc"] or element["resource_id"]:
+            elements.append(element)
+        for child in node:
+            traverse(child)
+
+    traverse(ET.fromstring(xml_content))
+    return elements
+
+
+def legacy_bounds(bounds_strs: list[str]) -> list[list[int]]:
+    """旧版逐节点 bounds 解析 + Python 计算中心点"""
+    centers = []
+    for s in bounds_strs:
+        nums = re.findall(r'\d+', s)
+        b = [int(x) for x in nums] if len(nums) == 4 else [0, 0, 0, 0]
+        centers.append([(b[0] + b[2]) // 2, (b[1] + b[3]) // 2])
+    return centers
+
+
+def make_dump(items: int = 2000) -> str:
+    """生成模拟的长列表 dump"""
+    rows = []
+    for i in range(items):
+        y = i * 200
+        rows.append(
+            f'<node index="{i}" text="" resource-id="com.demo:id/item" class="android.widget.LinearLayout" '
+            f'package="com.demo" content-desc="" checkable="false" clickable="true" bounds="[0,{y}][1080,{y + 200}]">'
+            f'<node index="0" text="" resource-id="com.demo:id/icon" class="android.widget.ImageView" '
+            f'package="com.demo" content-desc="商品图片{i}" bounds="[24,{y + 24}][176,{y + 176}]"/>'
+            f'<node index="1" text="新鲜草莓 {i} 号" resource-id="com.demo:id/title" class="android.widget.TextView" '
+            f'package="com.demo" content-desc="" bounds="[200,{y + 24}][1000,{y + 90}]"/>'
+            f'<node index="2" text="¥{i}.99" resource-id="com.demo:id/price" class="android.widget.TextView" '
+            f'package="com.demo" content-desc="" bounds="[200,{y + 100}][500,{y + 170}]"/>'
+            f'<node index="3" text="加入购物车" resource-id="com.demo:id/add" class="android.widget.Button" '
+            f'package="com.demo" content-desc="" clickable="true" bounds="[800,{y + 100}][1056,{y + 170}]"/>'
+            f'</node>'
+        )
+    return ('<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">'
+            '<node class="androidx.recyclerview.widget.RecyclerView" bounds="[0,0][1080,2400]">'
+            + "".join(rows) + "</node></hierarchy>")
+
+
+def measure(func, repeat: int = 5) -> tuple[float, float]:
+    """返回 (最快耗时 ms, 峰值内存 MB)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024 / 1024
+
+
+def main():
+    if len(sys.argv) > 1:
+        dumps = {p: Path(p).read_text(encoding="utf-8") for p in sys.argv[1:]}
+    else:
+        dumps = {"模拟 dump": make_dump()}
+
+    parser = UITreeParser()
+    for name, xml in dumps.items():
+        print(f"{name}: {len(xml) / 1024 / 1024:.2f} MB, {xml.count('<node')} 个节点")
+        cases = [
+            ("旧版 fromstring + 递归", lambda xml=xml: legacy_parse_android(xml)),
+            ("流式解析 -> 紧凑存储", lambda xml=xml: parser.parse_android_store(xml)),
+            ("流式解析 -> 字典列表", lambda xml=xml: parser.parse_android(xml)),
+            ("流式查找首个匹配", lambda xml=xml: next(parser.iter_android(
+                xml, predicate=lambda e: "加入购物车" in e["text"], limit=1))),
+        ]
+        for label, func in cases:
+            ms, mb = measure(func)
+            print(f"  {label:<24} {ms:8.1f} ms  峰值内存 {mb:7.2f} MB")
+
+        bounds_strs = re.findall(r'bounds="([^"]*)"', xml)
+        print(f"  bounds 解码（{len(bounds_strs)} 个）:")
+        for label, func in [
+            ("逐节点 re.findall", lambda bounds_strs=bounds_strs: legacy_bounds(bounds_strs)),
+            ("批量向量化解码", lambda bounds_strs=bounds_strs: compute_geometry(decode_bounds(bounds_strs))),
+        ]:
+            ms, _ = measure(func)
+            print(f"    {label:<22} {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+视觉模型输入预处理性能测试：不同像素预算下的耗时与定位误差
+
+用法: python bench_vision_preprocess.py [--vllm http://127.0.0.1:8001/v1]
+
+生成 1080x2400 的模拟截图（网格按钮，目标按钮使用独有颜色），对每个预算：
+- 统计预处理 + PNG 编码耗时、上传体积和近似视觉 token 数
+- 用颜色定位模拟「在送入图像上完全准确」的模型，映射回设备坐标后统计误差，
+  即预处理本身引入的误差上限
+指定 --vllm 时额外调用真实服务，统计端到端延迟和定位误差。
+"""
+import argparse
+import base64
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.vision.preprocess import DEFAULT_FACTOR, ImagePreprocessor
+
+SCREEN_SIZE = (1080, 2400)
+TARGET_COLOR = (255, 64, 0)
+BUDGETS = [None, 2048 * 28 * 28, 1024 * 28 * 28, 512 * 28 * 28, 256 * 28 * 28]
+
+
+def make_screen(rows: int = 12, cols: int = 3, target: int = 19) -> tuple[Image.Image, list[int]]:
+    """生成模拟截图，返回图像和目标按钮的 bbox"""
+    image = Image.new("RGB", SCREEN_SIZE, (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    cell_w, cell_h = SCREEN_SIZE[0] // cols, (SCREEN_SIZE[1] - 200) // rows
+    target_box = None
+    for i in range(rows * cols):
+        r, c = divmod(i, cols)
+        box = [c * cell_w + 30, 200 + r * cell_h + 20, (c + 1) * cell_w - 30, 200 + (r + 1) * cell_h - 20]
+        color = TARGET_COLOR if i == target else (40 + 5 * i, 120, 200)
+        draw.rounded_rectangle(box, radius=16, fill=color)
+        draw.text((box[0] + 20, box[1] + 20), f"Button {i}", fill="white")
+        if i == target:
+            target_box = box
+    return image, target_box
+
+
+def locate_color(image: Image.Image, color: tuple[int, int, int]) -> dict:
+    """模拟模型：在送入的图像上按颜色定位目标"""
+    pixels = np.asarray(image.convert("RGB"), dtype=np.int16)
+    mask = np.abs(pixels - np.array(color)).sum(axis=2) < 60
+    ys, xs = np.nonzero(mask)
+    x1, y1, x2, y2 = int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())
+    return {"bbox": [x1, y1, x2, y2], "center": ((x1 + x2) // 2, (y1 + y2) // 2)}
+
+
+def center_error(result: dict, truth: list[int]) -> float:
+    cx, cy = (truth[0] + truth[2]) / 2, (truth[1] + truth[3]) / 2
+    return float(np.hypot(result["center"][0] - cx, result["center"][1] - cy))
+
+
+def encode(image: Image.Image) -> str:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def run_offline(screen: Image.Image, truth: list[int], rounds: int = 5):
+    print(f"{'预算':>14} {'送入尺寸':>10} {'视觉token':>9} {'预处理+编码':>11} {'上传体积':>9} {'中心误差':>8}")
+    for budget in BUDGETS:
+        preprocessor = ImagePreprocessor(max_pixels=budget)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            prepared = preprocessor.prepare(screen)
+            payload = encode(prepared.image)
+        elapsed = (time.perf_counter() - start) / rounds
+        result = prepared.to_device(locate_color(prepared.image, TARGET_COLOR))
+        tokens = prepared.image.width * prepared.image.height // (DEFAULT_FACTOR * DEFAULT_FACTOR)
+        label = "原图" if budget is None else f"{budget // (28 * 28)}x28²"
+        size = f"{prepared.image.width}x{prepared.image.height}"
+        print(f"{label:>14} {size:>10} {tokens:>9} {elapsed * 1000:>9.1f}ms "
+              f"{len(payload) / 1024:>7.0f}KB {center_error(result, truth):>6.1f}px")
+
+    # 感兴趣区域：只送入目标所在的一行
+    preprocessor = ImagePreprocessor()
+    roi = [0, truth[1] - 40, SCREEN_SIZE[0], truth[3] + 40]
+    prepared = preprocessor.prepare(screen, roi=roi)
+    result = prepared.to_device(locate_color(prepared.image, TARGET_COLOR))
+    print(f"{'ROI 裁剪':>14} {prepared.image.width}x{prepared.image.height:<5} "
+          f"{prepared.image.width * prepared.image.height // 784:>9} {'':>11} "
+          f"{len(encode(prepared.image)) / 1024:>7.0f}KB {center_error(result, truth):>6.1f}px")
+
+
+def run_vllm(url: str, screen: Image.Image, truth: list[int]):
+    from sinan_core.vision.vllm_backend import VLLMBackend
+
+    backend = VLLMBackend(base_url=url)
+    if not backend.initialize():
+        print(f"\n无法连接 vLLM 服务: {url}")
+        return
+    print(f"\nvLLM 端到端 ({url})")
+    for budget in BUDGETS:
+        prepared = ImagePreprocessor(max_pixels=budget).prepare(screen)
+        start = time.perf_counter()
+        result = prepared.to_device(backend.detect_element(prepared.image, "Button 19"))
+        elapsed = time.perf_counter() - start
+        label = "原图" if budget is None else f"{budget // (28 * 28)}x28²"
+        error = f"{center_error(result, truth):.1f}px" if result else "未找到"
+        print(f"{label:>14}: {elapsed:.2f}s，中心误差 {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vllm", help="vLLM 服务地址，不指定时只做离线测试")
+    args = parser.parse_args()
+
+    screen, truth = make_screen()
+    run_offline(screen, truth)
+    if args.vllm:
+        run_vllm(args.vllm, screen, truth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+WebSocket 广播负载测试：逐个 await 与按连接发送队列对比
+
+用法: python bench_ws_broadcast.py [--clients 100 300 500] [--events 20]
+
+模拟数百个客户端：大部分为正常客户端（每条消息 1ms），少量慢客户端
+（每条 200ms）和已断开的客户端（发送即报错）。连续广播 --events 条
+设备变化通知，统计：
+- 正常客户端收到每条通知的延迟 p50 / p99
+- 广播调用本身阻塞调用方的时间
+- 慢客户端实际收到的消息数（合并后）和广播结束后残留的失效连接数
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from sinan_core.api.websocket import ConnectionManager
+
+FAST_DELAY = 0.001
+SLOW_DELAY = 0.2
+SLOW_RATIO = 0.02
+DEAD_RATIO = 0.05
+
+
+class SimulatedClient:
+    """模拟客户端，记录每条消息从广播到收到的延迟"""
+
+    def __init__(self, delay: float, dead: bool = False):
+        self.delay = delay
+        self.dead = dead
+        self.latencies: list[float] = []
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_json(self, message):
+        await self.send_text(json.dumps(message))
+
+    async def send_text(self, data):
+        if self.dead:
+            raise ConnectionResetError("client gone")
+        await asyncio.sleep(self.delay)
+        sent_at = json.loads(data)["payload"]["sentAt"]
+        self.latencies.append(time.perf_counter() - sent_at)
+
+    async def send_bytes(self, data):
+        await asyncio.sleep(self.delay)
+
+
+class LegacyManager:
+    """改造前的广播：逐个 await，异常吞掉不移除"""
+
+    def __init__(self):
+        self.active_connections = []
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    async def broadcast(self, message: dict, key=None):
+        for connection in self.active_connections:
+            try:
+                await connection.send_json(message)
+            except Exception:
+                pass
+
+
+def make_clients(count: int) -> list[SimulatedClient]:
+    slow = max(1, int(count * SLOW_RATIO))
+    dead = max(1, int(count * DEAD_RATIO))
+    clients = [SimulatedClient(SLOW_DELAY) for _ in range(slow)]
+    clients += [SimulatedClient(FAST_DELAY, dead=True) for _ in range(dead)]
+    clients += [SimulatedClient(FAST_DELAY) for _ in range(count - slow - dead)]
+    return clients
+
+
+async def run(manager, clients: list[SimulatedClient], events: int) -> dict:
+    for client in clients:
+        await manager.connect(client)
+
+    blocked = 0.0
+    for i in range(events):
+        message = {"type": "device_change", "payload": {"seq": i, "sentAt": time.perf_counter()}}
+        start = time.perf_counter()
+        await manager.broadcast(message, key="device_change")
+        blocked += time.perf_counter() - start
+        # 设备变化通知之间的间隔
+        await asyncio.sleep(0.01)
+
+    fast = [c for c in clients if not c.dead and c.delay == FAST_DELAY]
+    if isinstance(manager, ConnectionManager):
+        # 等待所有存活连接（包括慢客户端）发送完
+        await asyncio.gather(*(manager.outbox(c).join() for c in clients if manager.outbox(c)))
+
+    latencies = sorted(x for c in fast for x in c.latencies)
+    slow = [c for c in clients if c.delay == SLOW_DELAY]
+    result = {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "blocked": blocked / events,
+        "slow_received": statistics.mean(len(c.latencies) for c in slow),
+        "stale": sum(1 for c in manager.active_connections if c.dead),
+    }
+    if isinstance(manager, ConnectionManager):
+        for client in list(manager.active_connections):
+            manager.disconnect(client)
+        await asyncio.sleep(0)
+    return result
+
+
+async def main_async(counts: list[int], events: int):
+    print(f"{'客户端':>6} {'方式':>6} {'p50延迟':>9} {'p99延迟':>9} {'广播阻塞':>9} {'慢客户端收到':>12} {'残留失效连接':>12}")
+    for count in counts:
+        for label, manager in (("逐个", LegacyManager()), ("队列", ConnectionManager())):
+            r = await run(manager, make_clients(count), events)
+            print(f"{count:>6} {label:>6} {r['p50'] * 1000:>7.1f}ms {r['p99'] * 1000:>7.1f}ms "
+                  f"{r['blocked'] * 1000:>7.2f}ms {r['slow_received']:>10.1f}/{events} {r['stale']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 300, 500])
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.clients, args.events))
+
+
+if __name__ == "__main__":
+    main()
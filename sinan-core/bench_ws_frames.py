@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+WebSocket 截图推送性能测试：JSON base64 与二进制帧对比
+
+用法: python bench_ws_frames.py [--rounds 20]
+
+用本地测试客户端连接只包含截图推送的 WebSocket 服务，对不同尺寸、
+格式的模拟截图分别以旧协议（base64 嵌入 JSON）和二进制帧发送，统计：
+- 线上消息体积（JSON 文本 + 二进制帧）
+- 发送延迟：从客户端请求到截图字节解码完成的耗时
+每轮使用新截图，编码耗时计入两种协议。
+"""
+import argparse
+import base64
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+from sinan_core.api.frames import unpack_frame
+from sinan_core.api.websocket import ConnectionManager
+from sinan_core.drivers.frame_encoder import PNG, PREVIEW, WEBP
+
+SIZES = [(720, 1600), (1080, 2400), (1440, 3200)]
+FORMATS = [PNG, PREVIEW, WEBP]
+
+
+def make_screen(size: tuple[int, int], seed: int) -> Image.Image:
+    """生成模拟截图：色块按钮加文字"""
+    image = Image.new("RGB", size, (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    cell_h = size[1] // 16
+    for i in range(16):
+        color = ((seed * 37 + i * 15) % 255, 120, 200)
+        draw.rounded_rectangle([40, i * cell_h + 10, size[0] - 40, (i + 1) * cell_h - 10], radius=16, fill=color)
+        draw.text((60, i * cell_h + 30), f"Item {seed}-{i}", fill="white")
+    return image
+
+
+def build_app() -> FastAPI:
+    """只推送截图的 WebSocket 服务"""
+    app = FastAPI()
+    manager = ConnectionManager()
+    formats = {fmt.name: fmt for fmt in FORMATS}
+
+    @app.websocket("/ws")
+    async def endpoint(websocket: WebSocket):
+        await manager.connect(websocket)
+        try:
+            while True:
+                data = await websocket.receive_json()
+                payload = data.get("payload", {})
+                if data["type"] == "hello":
+                    await manager.send(websocket, {"type": "hello", "payload": manager.negotiate(websocket, payload)})
+                elif data["type"] == "shot":
+                    image = make_screen(tuple(payload["size"]), payload["seed"])
+                    await manager.send_with_screenshot(
+                        websocket, {"type": "step_done", "payload": {"stepId": 1}},
+                        image, step_id=1, fmt=formats[payload["format"]]
+                    )
+        except WebSocketDisconnect:
+            manager.disconnect(websocket)
+
+    return app
+
+
+def measure(client: TestClient, binary: bool, size, fmt, rounds: int) -> tuple[int, list[float]]:
+    """返回单条截图消息的线上字节数和每轮延迟"""
+    latencies = []
+    wire = 0
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"type": "hello", "payload": {"binaryFrames": binary}})
+        websocket.receive_json()
+        for seed in range(rounds):
+            start = time.perf_counter()
+            websocket.send_json({"type": "shot", "payload": {"size": list(size), "seed": seed, "format": fmt.name}})
+            text = websocket.receive_text()
+            message = json.loads(text)
+            if binary:
+                frame = websocket.receive_bytes()
+                header, _ = unpack_frame(frame)
+                assert header.msg_id == message["payload"]["screenshotFrame"]
+                wire = len(text.encode()) + len(frame)
+            else:
+                # 客户端解码 base64 的开销计入延迟
+                base64.b64decode(message["payload"]["screenshot"])
+                wire = len(text.encode())
+            latencies.append(time.perf_counter() - start)
+    return wire, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(build_app())
+    print(f"{'尺寸':>10} {'格式':>5} {'JSON体积':>10} {'二进制体积':>10} {'节省':>6} "
+          f"{'JSON p50':>9} {'二进制 p50':>10}")
+    for size in SIZES:
+        for fmt in FORMATS:
+            json_bytes, json_lat = measure(client, False, size, fmt, args.rounds)
+            bin_bytes, bin_lat = measure(client, True, size, fmt, args.rounds)
+            saved = 1 - bin_bytes / json_bytes
+            label = f"{size[0]}x{size[1]}"
+            print(f"{label:>10} {fmt.name:>5} {json_bytes / 1024:>8.0f}KB {bin_bytes / 1024:>8.0f}KB "
+                  f"{saved:>6.1%} {statistics.median(json_lat) * 1000:>7.1f}ms "
+                  f"{statistics.median(bin_lat) * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
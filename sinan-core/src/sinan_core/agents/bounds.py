@@ -0,0 +1,75 @@
+"""批量 bounds 解码
+
+一次 dump 中的全部 bounds 在一次向量化操作中解码为 (N, 4) int32 数组，
+中心点、面积、可见性也按列批量计算，不再逐节点在 Python 中处理。
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+_BOUNDS_RE = re.compile(r"\d+")
+# 格式规范的 "[x1,y1][x2,y2]"，每个匹配对应一行
+_BOUNDS_ROW_RE = re.compile(r"\[(\d+),(\d+)\]\[(\d+),(\d+)\]")
+
+
+def parse_bounds(bounds_str: str) -> list[int]:
+    """解析单个 bounds 字符串 [x1,y1][x2,y2]"""
+    match = _BOUNDS_RE.findall(bounds_str)
+    if len(match) == 4:
+        return [int(x) for x in match]
+    return [0, 0, 0, 0]
+
+
+def decode_bounds(bounds_strs: list[str]) -> np.ndarray:
+    """批量解码 Android bounds 字符串为 (N, 4) int32 数组"""
+    if not bounds_strs:
+        return np.zeros((0, 4), dtype=np.int32)
+
+    # 用空格连接，匹配不会跨越两个 bounds；每个 bounds 都规范时匹配数等于行数
+    rows = _BOUNDS_ROW_RE.findall(" ".join(bounds_strs))
+    if len(rows) == len(bounds_strs):
+        return np.array(rows, dtype=np.int32)
+
+    # 存在格式异常的 bounds，逐个解析以保证行对齐
+    return np.array([parse_bounds(s) for s in bounds_strs], dtype=np.int32)
+
+
+def decode_bounds_dicts(bounds_dicts: list[dict]) -> np.ndarray:
+    """批量解码鸿蒙 {left, top, right, bottom} 为 (N, 4) int32 数组"""
+    if not bounds_dicts:
+        return np.zeros((0, 4), dtype=np.int32)
+    return np.array(
+        [(b.get("left", 0), b.get("top", 0), b.get("right", 0), b.get("bottom", 0))
+         for b in bounds_dicts],
+        dtype=np.int32,
+    )
+
+
+@dataclass
+class BoundsBatch:
+    """批量计算的几何属性"""
+    bounds: np.ndarray   # (N, 4) int32
+    centers: np.ndarray  # (N, 2) int32
+    areas: np.ndarray    # (N,) int64
+    visible: np.ndarray  # (N,) bool
+
+
+def compute_geometry(bounds: np.ndarray, screen_size: Optional[tuple[int, int]] = None) -> BoundsBatch:
+    """
+    向量化计算中心点、面积和可见性
+
+    Args:
+        bounds: (N, 4) int32 数组
+        screen_size: 屏幕 (宽, 高)，提供时与屏幕无交集的元素视为不可见
+    """
+    b = bounds.astype(np.int64)
+    width = b[:, 2] - b[:, 0]
+    height = b[:, 3] - b[:, 1]
+    centers = np.stack([(b[:, 0] + b[:, 2]) // 2, (b[:, 1] + b[:, 3]) // 2], axis=1).astype(np.int32)
+    visible = (width > 0) & (height > 0)
+    if screen_size is not None:
+        screen_w, screen_h = screen_size
+        visible &= (b[:, 0] < screen_w) & (b[:, 1] < screen_h) & (b[:, 2] > 0) & (b[:, 3] > 0)
+    areas = np.where(visible, width * height, 0)
+    return BoundsBatch(bounds=bounds, centers=centers, areas=areas, visible=visible)
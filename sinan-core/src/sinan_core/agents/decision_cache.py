@@ -0,0 +1,144 @@
+"""策略决策缓存
+
+回放用例时，同一屏幕上的同一指令每次都会得到相同的决策。缓存以
+(指令, 屏幕指纹) 为键保存策略和目标元素。屏幕指纹优先使用增量解析时
+顺带得到的 UI 树快照结构哈希（见 ui_diff），未提供时按元素列表计算。视觉模型结果不在这里缓存，由 VisionAgent 的
+VisionResultCache 按截图感知哈希缓存。
+
+缓存按 LRU 淘汰，可选持久化到 JSON 文件，回归测试再次运行时
+屏幕未变化即可完全跳过匹配。写入只标记脏数据，由 flush() 批量落盘
+（后台定期刷新并在关闭时刷新），不在每次写入时同步重写文件。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+from .ui_elements import UIElementStore
+
+
+def elements_fingerprint(elements: Union[list[dict], UIElementStore]) -> str:
+    """UI 元素的结构哈希（十六进制），元素属性和位置完全相同则相同"""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(elements, UIElementStore):
+        for column in (elements.texts, elements.classes, elements.descs, elements.resource_ids):
+            h.update("\x1f".join(column).encode())
+            h.update(b"\x1e")
+        h.update(elements.bounds.tobytes())
+    else:
+        h.update(json.dumps(elements, sort_keys=True, ensure_ascii=False, default=str).encode())
+    return h.hexdigest()
+
+
+class DecisionCache:
+    """以 (类别, 指令, 屏幕指纹) 为键的 LRU 决策缓存"""
+
+    def __init__(self, max_entries: int = 1024, path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            max_entries: 最多缓存的决策数，超过时淘汰最久未用的
+            path: 可选的持久化文件，存在时启动加载，调用 flush() 时保存
+        """
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # 自上次保存以来是否有写入
+        self.dirty = False
+        # 定期保存的线程与关闭时的保存可能同时写文件
+        self._write_lock = threading.Lock()
+        if self.path and self.path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(kind: str, instruction: str, screen_key: str) -> str:
+        return f"{kind}\x1f{instruction}\x1f{screen_key}"
+
+    def get(self, kind: str, instruction: str, screen_key: str) -> Optional[Any]:
+        """
+        查询缓存
+
+        Args:
+            kind: 决策类别，如 strategy
+            instruction: 自然语言指令
+            screen_key: 屏幕指纹
+
+        Returns:
+            缓存的决策，未命中为 None
+        """
+        key = self._key(kind, instruction, screen_key)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, kind: str, instruction: str, screen_key: str, value: Any):
+        """写入缓存，value 需可 JSON 序列化"""
+        key = self._key(kind, instruction, screen_key)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.dirty = True
+
+    def clear(self):
+        """清空缓存（不删除持久化文件）"""
+        self._entries.clear()
+
+    def flush(self):
+        """有未保存的写入时保存到持久化文件"""
+        if self.path and self.dirty:
+            self.dirty = False
+            self._write(list(self._entries.items()))
+
+    async def flush_async(self):
+        """在线程中保存，不阻塞事件循环
+
+        条目快照在事件循环中取得，写文件期间的新写入留待下次保存。
+        """
+        if self.path and self.dirty:
+            self.dirty = False
+            items = list(self._entries.items())
+            try:
+                await asyncio.to_thread(self._write, items)
+            except BaseException:
+                self.dirty = True
+                raise
+
+    async def run_flusher(self, interval: float = 5.0):
+        """定期保存，直到被取消；取消时做最后一次保存"""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush_async()
+        finally:
+            self.flush()
+
+    def _write(self, items: list):
+        """写入持久化文件，先写临时文件再替换，避免中断时损坏"""
+        with self._write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(items, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+    def _load(self):
+        """加载持久化文件，文件损坏时从空缓存开始"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, value in items[-self.max_entries:]:
+            self._entries[key] = value
@@ -1,8 +1,14 @@
 # sinan-core/src/sinan_core/agents/executor.py
 """执行决策 Agent"""
+import asyncio
+import copy
 from enum import Enum
-from typing import Optional, Tuple, Union
+from typing import Optional, Sequence, Tuple, Union
 from PIL import Image
+from .decision_cache import DecisionCache, elements_fingerprint
+from .matcher import ElementMatcher, MatchCandidate
+from .tokenizer import InstructionTokenizer
+from .ui_elements import UIElementStore
 from .ui_parser import UITreeParser
 
 
@@ -13,73 +19,98 @@ class ExecutionStrategy(Enum):
     VISION = "vision"        # 视觉模型识别
 
 
+# 排名第一的候选领先第二名至少这么多分才视为明确目标，
+# 例如唯一的完全相同匹配领先其余子串匹配
+CLEAR_WIN_MARGIN = 2.0
+
+
 class ExecutionAgent:
     """执行决策 Agent，负责选择最优执行策略"""
 
-    def __init__(self):
+    def __init__(self, decision_cache: Optional[DecisionCache] = None):
+        """
+        Args:
+            decision_cache: 可选的决策缓存，同一屏幕上的同一指令直接复用上次决策
+        """
         self.parser = UITreeParser()
+        self.tokenizer = InstructionTokenizer()
+        self.decision_cache = decision_cache
         self._vision_agent = None
 
     def decide_strategy(
         self,
         instruction: str,
-        ui_elements: list[dict]
+        ui_elements: Union[list[dict], UIElementStore],
+        screen_key: Optional[str] = None
     ) -> Tuple[ExecutionStrategy, Optional[Union[dict, list[dict]]]]:
         """
         决定执行策略
 
         Args:
             instruction: 自然语言指令
-            ui_elements: UI 树元素列表
+            ui_elements: UI 树元素列表或紧凑元素存储
+            screen_key: 屏幕指纹，用于决策缓存，默认为元素的结构哈希
 
         Returns:
             (策略类型, 目标元素)
         """
-        # 提取指令中的关键词
-        keywords = self._extract_keywords(instruction)
-
-        # 尝试从 UI 树匹配
-        candidates = []
-        for keyword in keywords:
-            matches = self.parser.fuzzy_match(keyword, ui_elements)
-            candidates.extend(matches)
-
-        # 去重
-        seen = set()
-        unique_candidates = []
-        for c in candidates:
-            key = str(c.get("center", []))
-            if key not in seen:
-                seen.add(key)
-                unique_candidates.append(c)
-
-        if len(unique_candidates) == 1:
+        if self.decision_cache is not None:
+            screen_key = screen_key or elements_fingerprint(ui_elements)
+            cached = self.decision_cache.get("strategy", instruction, screen_key)
+            if cached is not None:
+                return ExecutionStrategy(cached["strategy"]), copy.deepcopy(cached["target"])
+
+        # 以屏幕文本为词典提取指令中的关键词
+        matcher = ElementMatcher.for_elements(ui_elements)
+        keywords = self._extract_keywords(instruction, matcher.vocabulary)
+
+        # 一次匹配全部关键词，候选已按元素去重并按分数排序
+        strategy, target = self._choose(matcher.match(keywords))
+        if self.decision_cache is not None:
+            self.decision_cache.put("strategy", instruction, screen_key, {
+                "strategy": strategy.value,
+                "target": copy.deepcopy(target),
+            })
+        return strategy, target
+
+    def _choose(
+        self,
+        ranked: list[MatchCandidate]
+    ) -> Tuple[ExecutionStrategy, Optional[Union[dict, list[dict]]]]:
+        """
+        根据排好序的候选选择策略
+
+        拼音 / 编辑距离的兜底命中置信度低（如「退出」近似「退款」），
+        不参与自动点击；只有兜底命中时交给视觉模型。
+        """
+        candidates = [c for c in ranked if not c.fuzzy]
+
+        if len(candidates) == 1:
             # 唯一匹配，直接使用 UI 树
-            return ExecutionStrategy.UI_TREE, unique_candidates[0]
+            return ExecutionStrategy.UI_TREE, candidates[0].element
 
-        if len(unique_candidates) > 1:
-            # 多个候选，需要 LLM 辅助选择
-            return ExecutionStrategy.LLM_SELECT, unique_candidates
+        if len(candidates) > 1:
+            if candidates[0].score - candidates[1].score >= CLEAR_WIN_MARGIN:
+                # 排名第一的候选明显优于其他候选
+                return ExecutionStrategy.UI_TREE, candidates[0].element
+            # 多个相近候选，按排名交给 LLM 辅助选择
+            return ExecutionStrategy.LLM_SELECT, [c.element for c in candidates]
 
-        # 没有匹配，使用视觉模型
+        # 没有可靠匹配，使用视觉模型
         return ExecutionStrategy.VISION, None
 
-    def _extract_keywords(self, instruction: str) -> list[str]:
-        """从指令中提取关键词"""
-        # 移除常见动词
-        verbs = ["点击", "点", "按", "选择", "打开", "进入", "找到", "tap", "click"]
-        text = instruction
-        for verb in verbs:
-            text = text.replace(verb, " ")
-
-        # 分词（简单实现）
-        keywords = [w.strip() for w in text.split() if w.strip()]
+    def _extract_keywords(self, instruction: str, vocabulary: frozenset[str] = frozenset()) -> list[str]:
+        """
+        从指令中提取关键词
 
-        # 如果没有提取到关键词，使用原始指令
-        if not keywords:
-            keywords = [instruction]
+        Args:
+            instruction: 自然语言指令
+            vocabulary: 屏幕文本词表，用于中文分词
 
-        return keywords
+        Returns:
+            关键词列表，没有提取到时为原始指令
+        """
+        return self.tokenizer.tokenize(instruction, vocabulary)
 
     def _get_vision_agent(self):
         """获取或初始化视觉模型代理"""
@@ -89,10 +120,30 @@ class ExecutionAgent:
             self._vision_agent.initialize()
         return self._vision_agent
 
+    @staticmethod
+    def candidate_region(candidates: Optional[list[dict]]) -> Optional[list[int]]:
+        """
+        候选元素的外接矩形，作为视觉模型的感兴趣区域
+
+        Args:
+            candidates: LLM_SELECT 策略给出的候选元素
+
+        Returns:
+            [x1, y1, x2, y2]，没有可用的 bounds 时为 None
+        """
+        boxes = [c["bounds"] for c in candidates or () if c.get("bounds")]
+        if not boxes:
+            return None
+        return [
+            min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes),
+        ]
+
     def execute_vision_strategy(
         self,
         instruction: str,
-        screenshot: Image.Image
+        screenshot: Image.Image,
+        roi: Optional[Sequence[int]] = None
     ) -> Optional[dict]:
         """
         使用视觉模型执行策略
@@ -100,11 +151,42 @@ class ExecutionAgent:
         Args:
             instruction: 自然语言指令
             screenshot: 屏幕截图
+            roi: 可选的感兴趣区域（如候选元素所在区域），区域内未识别到时检测整屏
 
         Returns:
             包含 bbox 和 center 的字典，或 None
         """
+        # 视觉结果由 VisionAgent 的结果缓存按截图感知哈希缓存
         vision_agent = self._get_vision_agent()
         if not vision_agent.is_initialized():
             return None
-        return vision_agent.detect_element(screenshot, instruction)
+        result = vision_agent.detect_element(screenshot, instruction, roi)
+        if result is None and roi is not None:
+            result = vision_agent.detect_element(screenshot, instruction)
+        return result
+
+    async def execute_vision_strategy_async(
+        self,
+        instruction: str,
+        screenshot: Image.Image,
+        roi: Optional[Sequence[int]] = None
+    ) -> Optional[dict]:
+        """
+        使用视觉模型执行策略，不阻塞事件循环
+
+        Args:
+            instruction: 自然语言指令
+            screenshot: 屏幕截图
+            roi: 可选的感兴趣区域（如候选元素所在区域），区域内未识别到时检测整屏
+
+        Returns:
+            包含 bbox 和 center 的字典，或 None
+        """
+        # 首次加载模型较慢，放到线程中
+        vision_agent = await asyncio.to_thread(self._get_vision_agent)
+        if not vision_agent.is_initialized():
+            return None
+        result = await vision_agent.detect_element_async(screenshot, instruction, roi)
+        if result is None and roi is not None:
+            result = await vision_agent.detect_element_async(screenshot, instruction)
+        return result
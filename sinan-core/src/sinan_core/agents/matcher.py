@@ -0,0 +1,221 @@
+"""带索引的元素匹配引擎
+
+每个 UI 快照只建一次索引：把 text / content_desc / resource_id 小写后
+按单字和二元组（bigram）建立倒排表。查询时先用倒排表求交集得到候选字段，
+再逐个校验并分级打分：
+
+    完全相同 > 前缀 > 子串 > 拼音相同 / 编辑距离相近
+
+所有关键词在一次调用中完成匹配，结果按元素序号去重并按分数排序。
+"""
+from dataclasses import dataclass
+from typing import Optional, Union
+from .ui_elements import UIElementStore
+
+# 各匹配等级的基础分
+SCORE_EXACT = 4.0
+SCORE_PREFIX = 3.0
+SCORE_SUBSTRING = 2.0
+SCORE_PINYIN = 1.5
+SCORE_EDIT = 1.0
+
+# 兜底匹配的等级：只说明「可能是」，不能据此直接点击
+FUZZY_KINDS = frozenset({"pinyin", "edit"})
+
+# 字段加权：文本最可信，其次是无障碍描述，资源 ID 最弱
+_FIELD_BONUS = (0.2, 0.1, 0.0)
+
+
+@dataclass
+class MatchCandidate:
+    """一个匹配到的元素"""
+    index: int
+    element: dict
+    score: float
+    kind: str
+    keyword: str
+    hits: int = 1
+
+    @property
+    def fuzzy(self) -> bool:
+        """是否为拼音 / 编辑距离兜底命中（低置信度）"""
+        return self.kind in FUZZY_KINDS
+
+
+def _grams(text: str) -> set[str]:
+    """单字与二元组"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein 距离，超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _to_pinyin(text: str) -> Optional[str]:
+    """转为无声调拼音，未安装 pypinyin 时返回 None"""
+    try:
+        from pypinyin import lazy_pinyin
+    except ImportError:
+        return None
+    return "".join(lazy_pinyin(text))
+
+
+class ElementMatcher:
+    """单个 UI 快照上的元素匹配器"""
+
+    def __init__(self, elements: Union[list[dict], UIElementStore]):
+        """
+        Args:
+            elements: UI 树元素列表或紧凑元素存储，元素序号即其在其中的位置
+        """
+        self._elements = elements
+        # 字段表：(元素序号, 字段序号, 小写字段值)
+        self._fields: list[tuple[int, int, str]] = []
+        self._postings: dict[str, set[int]] = {}
+        self._pinyin: Optional[list[Optional[str]]] = None
+        self._vocabulary: Optional[frozenset[str]] = None
+
+        for i, values in enumerate(self._iter_fields(elements)):
+            for slot, value in enumerate(values):
+                if not value:
+                    continue
+                field_id = len(self._fields)
+                self._fields.append((i, slot, value.lower()))
+                for gram in _grams(value.lower()):
+                    self._postings.setdefault(gram, set()).add(field_id)
+
+    @classmethod
+    def for_elements(cls, elements: Union[list[dict], UIElementStore]) -> "ElementMatcher":
+        """获取元素集合的匹配器，UIElementStore 上的索引会被缓存复用"""
+        if isinstance(elements, UIElementStore):
+            if elements._matcher is None:
+                elements._matcher = cls(elements)
+            return elements._matcher
+        return cls(elements)
+
+    @property
+    def vocabulary(self) -> frozenset[str]:
+        """屏幕上的文本与描述（小写），用作指令分词词典"""
+        if self._vocabulary is None:
+            self._vocabulary = frozenset(value for _, slot, value in self._fields if slot < 2)
+        return self._vocabulary
+
+    @staticmethod
+    def _iter_fields(elements: Union[list[dict], UIElementStore]):
+        if isinstance(elements, UIElementStore):
+            return zip(elements.texts, elements.descs, elements.searchable_ids)
+        return (
+            (e.get("text", ""), e.get("content_desc", ""), e.get("resource_id", ""))
+            for e in elements
+        )
+
+    def _element(self, i: int) -> dict:
+        if isinstance(self._elements, UIElementStore):
+            return self._elements.element(i)
+        return self._elements[i]
+
+    def _lookup(self, query: str) -> set[int]:
+        """包含查询全部单字和二元组的字段"""
+        grams = sorted(_grams(query), key=lambda g: len(self._postings.get(g, ())))
+        if not grams or grams[0] not in self._postings:
+            return set()
+        result = set(self._postings[grams[0]])
+        for gram in grams[1:]:
+            result &= self._postings.get(gram, set())
+            if not result:
+                break
+        return result
+
+    def _fuzzy(self, query: str) -> dict[int, tuple[float, str]]:
+        """没有直接命中时的兜底：拼音相同或编辑距离相近的字段"""
+        scores: dict[int, tuple[float, str]] = {}
+        limit = 1 if len(query) <= 4 else 2
+        if len(query) < 2:
+            return scores
+
+        # 只考察与查询至少共享一个字的字段
+        shared: set[int] = set()
+        for char in set(query):
+            shared |= self._postings.get(char, set())
+
+        query_pinyin = _to_pinyin(query)
+        for field_id in shared:
+            value = self._fields[field_id][2]
+            if query_pinyin is not None:
+                if self._pinyin is None:
+                    self._pinyin = [None] * len(self._fields)
+                if self._pinyin[field_id] is None:
+                    self._pinyin[field_id] = _to_pinyin(value)
+                if self._pinyin[field_id] == query_pinyin:
+                    scores[field_id] = (SCORE_PINYIN, "pinyin")
+                    continue
+            distance = _edit_distance(query, value, limit)
+            if distance <= limit:
+                scores[field_id] = (SCORE_EDIT - 0.1 * distance, "edit")
+        return scores
+
+    def _score_keyword(self, query: str) -> dict[int, tuple[float, str]]:
+        """单个关键词命中的字段及其分数"""
+        scores = {}
+        for field_id in self._lookup(query):
+            value = self._fields[field_id][2]
+            if value == query:
+                scores[field_id] = (SCORE_EXACT, "exact")
+            elif value.startswith(query):
+                scores[field_id] = (SCORE_PREFIX, "prefix")
+            elif query in value:
+                scores[field_id] = (SCORE_SUBSTRING, "substring")
+        return scores or self._fuzzy(query)
+
+    def match(self, keywords: list[str], limit: Optional[int] = None) -> list[MatchCandidate]:
+        """
+        一次匹配全部关键词
+
+        Args:
+            keywords: 关键词列表
+            limit: 最多返回的候选数
+
+        Returns:
+            按元素去重、分数从高到低排列的候选；同分按文档顺序
+        """
+        best: dict[int, MatchCandidate] = {}
+        for keyword in dict.fromkeys(k.lower() for k in keywords if k):
+            keyword_best: dict[int, tuple[float, str]] = {}
+            for field_id, (score, kind) in self._score_keyword(keyword).items():
+                i, slot, _ = self._fields[field_id]
+                score += _FIELD_BONUS[slot]
+                if i not in keyword_best or score > keyword_best[i][0]:
+                    keyword_best[i] = (score, kind)
+
+            for i, (score, kind) in keyword_best.items():
+                candidate = best.get(i)
+                if candidate is None:
+                    best[i] = MatchCandidate(i, None, score, kind, keyword)
+                else:
+                    candidate.hits += 1
+                    if score > candidate.score:
+                        candidate.score, candidate.kind, candidate.keyword = score, kind, keyword
+
+        ranked = sorted(best.values(), key=lambda c: (-c.score, -c.hits, c.index))
+        if limit is not None:
+            ranked = ranked[:limit]
+        for candidate in ranked:
+            candidate.element = self._element(candidate.index)
+        return ranked
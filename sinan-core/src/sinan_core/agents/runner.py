@@ -1,18 +1,69 @@
 # sinan-core/src/sinan_core/agents/runner.py
 """用例执行引擎"""
 import asyncio
-import base64
-from io import BytesIO
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional, Union
+from PIL import Image
+from ..drivers.async_base import AsyncBaseDevice, SyncDeviceAdapter, as_async_device
 from ..drivers.base import BaseDevice
+from ..drivers.frame_encoder import PREVIEW, EncodeFormat, frame_encoder
+from ..drivers.frame_source import FrameSource
 from ..models.case import TestCase, TestStep
+from .stability import ScreenStabilityDetector
 
 
 class CaseRunner:
     """用例执行器"""
 
-    def __init__(self, device: BaseDevice):
-        self.device = device
+    def __init__(
+        self,
+        device: Union[BaseDevice, AsyncBaseDevice],
+        frame_source: Optional[FrameSource] = None,
+        stability: Optional[ScreenStabilityDetector] = None,
+        screenshot_format: EncodeFormat = PREVIEW
+    ):
+        """
+        Args:
+            device: 设备驱动，同步驱动会被包装为异步接口
+            frame_source: 可选的持续帧源，提供时优先从中取图而不是单独截图
+            stability: 屏幕稳定检测器，默认按帧指纹检测
+            screenshot_format: 结果截图的编码格式
+        """
+        self.device = as_async_device(device)
+        # 由本执行器包装出的适配器需要在结束时关闭其线程池
+        self._owned_adapter = self.device if self.device is not device else None
+        self.frame_source = frame_source
+        self.stability = stability or ScreenStabilityDetector(self.device, frame_source=frame_source)
+        self.screenshot_format = screenshot_format
+
+    async def __aenter__(self) -> "CaseRunner":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """释放执行器为同步驱动创建的适配器；传入的异步设备由调用方管理"""
+        if isinstance(self._owned_adapter, SyncDeviceAdapter):
+            self._owned_adapter.close()
+        self._owned_adapter = None
+
+    def _frame_seq(self) -> int:
+        """当前帧源的最新帧序号"""
+        if not self.frame_source:
+            return 0
+        frame = self.frame_source.latest_frame()
+        return frame.seq if frame else 0
+
+    async def _capture(self, seq_before_action: int) -> Image.Image:
+        """获取动作之后的屏幕画面"""
+        if self.frame_source and self.frame_source.is_running():
+            # 动作发生时可能有一帧正在采集，需跳过它才能保证画面在动作之后
+            frame = await asyncio.to_thread(
+                self.frame_source.wait_for_frame, seq_before_action + 1
+            )
+            if frame:
+                return frame.image
+        return await self.device.screenshot()
 
     async def run_step(self, step: TestStep) -> dict:
         """执行单个步骤"""
@@ -21,35 +72,38 @@ class CaseRunner:
             "action": step.action,
             "success": False,
             "screenshot": None,
+            "screenshot_format": self.screenshot_format.name,
+            "settle_time": None,
             "error": None,
         }
 
         try:
+            frame_seq = self._frame_seq()
+
             if step.action == "tap":
                 x, y = step.coordinates[0], step.coordinates[1]
-                success = self.device.tap(x, y)
+                success = await self.device.tap(x, y)
                 result["success"] = success
 
             elif step.action == "swipe":
                 coords = step.coordinates
-                success = self.device.swipe(coords[0], coords[1], coords[2], coords[3])
+                success = await self.device.swipe(coords[0], coords[1], coords[2], coords[3])
                 result["success"] = success
 
             elif step.action == "input":
-                success = self.device.input_text(step.target_desc)
+                success = await self.device.input_text(step.target_desc)
                 result["success"] = success
 
             elif step.action == "wait":
                 await asyncio.sleep(step.duration_ms / 1000)
                 result["success"] = True
 
-            # 截图
-            await asyncio.sleep(0.5)  # 等待 UI 更新
-            img = self.device.screenshot()
+            # 等待 UI 稳定，稳定检测的最后一帧即为结果截图
+            settle = await self.stability.wait()
+            result["settle_time"] = round(settle.settle_time, 3)
+            img = settle.image or await self._capture(frame_seq)
             if img:
-                buffer = BytesIO()
-                img.save(buffer, format="PNG")
-                result["screenshot"] = base64.b64encode(buffer.getvalue()).decode()
+                result["screenshot"] = await frame_encoder.encode_base64_async(img, self.screenshot_format)
 
         except Exception as e:
             result["error"] = str(e)
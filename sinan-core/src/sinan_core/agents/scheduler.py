@@ -0,0 +1,169 @@
+"""多设备并行用例调度器"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Optional, Union
+from ..drivers.async_base import AsyncBaseDevice
+from ..drivers.base import BaseDevice
+from ..drivers.manager import DeviceManager
+from ..models.case import TestCase
+from .runner import CaseRunner
+
+
+@dataclass
+class DeviceSlot:
+    """调度器中的一台设备及其待执行队列"""
+    serial: str
+    device_type: str
+    device: Union[BaseDevice, AsyncBaseDevice]
+    queue: deque[TestCase] = field(default_factory=deque)
+
+    def accepts(self, case: TestCase) -> bool:
+        """设备类型是否满足用例的亲和性要求"""
+        return case.device_type is None or case.device_type == self.device_type
+
+
+@dataclass
+class SchedulerStats:
+    """一次调度的统计信息"""
+    cases: int = 0
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    stolen: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """每秒完成的用例数"""
+        return self.cases / self.elapsed if self.elapsed else 0.0
+
+
+class CaseScheduler:
+    """多设备并行用例调度器
+
+    每台设备一个执行队列，同一时刻每台设备只运行一个用例。用例按设备类型
+    亲和性分配到负载最小的设备；设备队列为空时，从其他兼容设备队列的
+    尾部窃取用例，避免快设备空闲、慢设备积压。
+    """
+
+    def __init__(self, devices: list[DeviceSlot]):
+        self.slots = devices
+        self.stats = SchedulerStats()
+
+    @classmethod
+    async def from_manager(
+        cls,
+        device_manager: DeviceManager,
+        serials: Optional[list[str]] = None
+    ) -> "CaseScheduler":
+        """
+        从设备管理器构建设备池
+
+        Args:
+            device_manager: 设备管理器
+            serials: 限定使用的设备序列号，默认使用全部在线设备
+        """
+        devices = await asyncio.to_thread(device_manager.cached_devices)
+        slots = []
+        for d in devices:
+            if serials is not None and d["serial"] not in serials:
+                continue
+            device = await device_manager.get_async_device(d["serial"])
+            if device:
+                slots.append(DeviceSlot(serial=d["serial"], device_type=d["type"], device=device))
+        return cls(slots)
+
+    def _distribute(self, cases: list[TestCase]) -> list[TestCase]:
+        """将用例分配到设备队列，返回没有兼容设备的用例"""
+        unassigned = []
+        for case in cases:
+            candidates = [slot for slot in self.slots if slot.accepts(case)]
+            if not candidates:
+                unassigned.append(case)
+                continue
+            min(candidates, key=lambda slot: len(slot.queue)).queue.append(case)
+        return unassigned
+
+    def _steal(self, thief: DeviceSlot) -> Optional[TestCase]:
+        """从积压最多的兼容队列尾部窃取一个用例"""
+        victims = sorted(
+            (slot for slot in self.slots if slot is not thief and slot.queue),
+            key=lambda slot: len(slot.queue),
+            reverse=True,
+        )
+        for victim in victims:
+            for i in range(len(victim.queue) - 1, -1, -1):
+                case = victim.queue[i]
+                if thief.accepts(case):
+                    del victim.queue[i]
+                    self.stats.stolen += 1
+                    return case
+        return None
+
+    async def _worker(self, slot: DeviceSlot, results: asyncio.Queue):
+        """设备工作协程：先消费自己的队列，空了再窃取"""
+        runner = CaseRunner(slot.device)
+        try:
+            while True:
+                case = slot.queue.popleft() if slot.queue else self._steal(slot)
+                if case is None:
+                    return
+
+                start = time.perf_counter()
+                steps = []
+                async for step_result in runner.run_case(case):
+                    steps.append(step_result)
+                await results.put({
+                    "case_id": case.case_id,
+                    "case_name": case.case_name,
+                    "device": slot.serial,
+                    "status": case.status,
+                    "steps": steps,
+                    "duration": time.perf_counter() - start,
+                })
+        finally:
+            runner.close()
+            await results.put(None)
+
+    async def run(self, cases: list[TestCase]) -> AsyncGenerator[dict, None]:
+        """并行执行用例，每完成一个用例就产出其结果"""
+        self.stats = SchedulerStats()
+        start = time.perf_counter()
+
+        for case in self._distribute(cases):
+            case.status = "skipped"
+            self.stats.cases += 1
+            self.stats.skipped += 1
+            yield {
+                "case_id": case.case_id,
+                "case_name": case.case_name,
+                "device": None,
+                "status": "skipped",
+                "steps": [],
+                "duration": 0.0,
+                "error": f"没有可用的 {case.device_type} 设备",
+            }
+
+        results: asyncio.Queue = asyncio.Queue()
+        workers = [asyncio.create_task(self._worker(slot, results)) for slot in self.slots]
+        finished = 0
+        try:
+            while finished < len(workers):
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                    continue
+                self.stats.cases += 1
+                if result["status"] == "passed":
+                    self.stats.passed += 1
+                else:
+                    self.stats.failed += 1
+                self.stats.elapsed = time.perf_counter() - start
+                yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.stats.elapsed = time.perf_counter() - start
@@ -0,0 +1,124 @@
+"""屏幕稳定检测
+
+动作执行后不再固定等待 0.5 秒，而是连续采集低成本的屏幕指纹
+（缩小后的灰度帧或 UI 树结构哈希），当画面在 stable_window 内
+保持不变时立即返回，最长等待 timeout。
+
+动作刚执行时应用可能还没开始转场，旧画面同样「稳定」。因此只有在
+观察到画面变化并重新稳定后才提前返回；始终没有变化时至少等待
+min_settle，避免下一步匹配到过期的界面。
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+import numpy as np
+from PIL import Image
+from ..drivers.async_base import AsyncBaseDevice
+from ..drivers.frame_source import FrameSource
+from .ui_diff import UITreeDiffer
+
+# 帧指纹的缩略图尺寸（宽, 高），接近手机竖屏比例
+_THUMB_SIZE = (18, 40)
+
+
+def frame_fingerprint(image: Image.Image) -> np.ndarray:
+    """缩小为灰度缩略图作为帧指纹"""
+    thumb = image.convert("L").resize(_THUMB_SIZE, Image.Resampling.BILINEAR)
+    return np.asarray(thumb, dtype=np.int16)
+
+
+@dataclass
+class SettleResult:
+    """一次等待稳定的结果"""
+    stable: bool
+    settle_time: float
+    samples: int
+    image: Optional[Image.Image] = None
+
+
+class ScreenStabilityDetector:
+    """屏幕稳定检测器"""
+
+    def __init__(
+        self,
+        device: AsyncBaseDevice,
+        mode: str = "frame",
+        stable_window: float = 0.3,
+        poll_interval: float = 0.1,
+        timeout: float = 3.0,
+        tolerance: float = 2.0,
+        frame_source: Optional[FrameSource] = None,
+        min_settle: float = 0.5,
+        differ: Optional[UITreeDiffer] = None,
+    ):
+        """
+        Args:
+            device: 异步设备
+            mode: frame 比较缩略图，tree 比较 UI 树结构哈希
+            stable_window: 画面保持不变多久视为稳定（秒）
+            poll_interval: 两次采样的最小间隔（秒）
+            timeout: 最长等待时间（秒），超时返回当前画面
+            tolerance: frame 模式下允许的平均灰度差，过滤时钟、光标等细微变化
+            frame_source: 可选的持续帧源，frame 模式下优先从中取帧
+            min_settle: 画面始终未变化时的最短等待（秒），给应用开始转场留出时间
+            differ: tree 模式使用的 UI 树增量对比器，传入执行流程的同一实例即可复用其快照
+        """
+        if mode not in ("frame", "tree"):
+            raise ValueError(f"未知的稳定检测模式: {mode}")
+        self.device = device
+        self.mode = mode
+        self.stable_window = stable_window
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.tolerance = tolerance
+        self.frame_source = frame_source
+        self.min_settle = min_settle
+        self.differ = differ or UITreeDiffer()
+
+    async def _sample(self) -> tuple[Any, Optional[Image.Image]]:
+        """采集一次指纹，frame 模式同时返回画面"""
+        if self.mode == "tree":
+            tree = await self.device.get_ui_tree()
+            snapshot = await asyncio.to_thread(self.differ.snapshot_tree, tree)
+            return snapshot.fingerprint, None
+
+        image = None
+        if self.frame_source and self.frame_source.is_running():
+            frame = await asyncio.to_thread(self.frame_source.fresh_frame, self.poll_interval)
+            image = frame.image if frame else None
+        if image is None:
+            image = await self.device.screenshot()
+        return await asyncio.to_thread(frame_fingerprint, image), image
+
+    def _same(self, a: Any, b: Any) -> bool:
+        if self.mode == "tree":
+            return a == b
+        return a.shape == b.shape and float(np.abs(a - b).mean()) <= self.tolerance
+
+    async def wait(self) -> SettleResult:
+        """等待屏幕稳定"""
+        start = time.monotonic()
+        fingerprint, image = await self._sample()
+        samples = 1
+        last_change = time.monotonic()
+        changed = False
+
+        while True:
+            now = time.monotonic()
+            if now - last_change >= self.stable_window and samples > 1:
+                if changed:
+                    return SettleResult(True, last_change - start, samples, image)
+                if now - start >= self.min_settle:
+                    # 动作没有引起画面变化
+                    return SettleResult(True, now - start, samples, image)
+            if now - start >= self.timeout:
+                return SettleResult(False, now - start, samples, image)
+
+            await asyncio.sleep(self.poll_interval)
+            current, image = await self._sample()
+            samples += 1
+            if not self._same(fingerprint, current):
+                fingerprint = current
+                last_change = time.monotonic()
+                changed = True
@@ -0,0 +1,110 @@
+"""指令分词
+
+中文指令没有空格，按空白切分会把「点击蔬菜水果」整句当成一个关键词，
+导致 UI 树匹配失败而走昂贵的视觉模型。这里使用正向最大匹配分词：
+词典由动作动词、虚词和当前屏幕上的元素文本组成，动词和虚词被丢弃，
+屏幕文本作为整词保留，未登录的连续字符合并为一个关键词。
+
+分词结果按 (指令, 屏幕词表) 缓存在 LRU 中，同一屏幕上重复的指令不再重复分词。
+"""
+import re
+from collections import OrderedDict
+from typing import Iterable
+
+# 动作动词，分词后丢弃
+ACTION_VERBS = frozenset([
+    "点击", "单击", "双击", "长按", "轻触", "点按", "点", "按", "选择", "选中",
+    "打开", "进入", "找到", "查看", "切换到", "tap", "click", "press", "open",
+])
+
+# 无实际含义的虚词
+STOP_WORDS = frozenset([
+    "请", "一下", "的", "这个", "那个", "一个", "按钮", "the", "on",
+])
+
+# 分隔符：空白与常见标点（不含 . _ - : / 以免切断 resource-id）
+_SEPARATORS = re.compile(r"[\s,，。、!！?？：;；\"“”'‘’()（）《》【】\[\]]+")
+# ASCII 单词整体处理，不在其内部做最大匹配
+_RUNS = re.compile(r"[A-Za-z0-9_.:/\-]+|[^A-Za-z0-9_.:/\-]+")
+
+# 参与最大匹配的最长词长
+_MAX_WORD_LEN = 16
+
+
+class InstructionTokenizer:
+    """指令分词器（正向最大匹配 + LRU 缓存）"""
+
+    def __init__(self, cache_size: int = 512):
+        """
+        Args:
+            cache_size: 分词结果缓存的最大条目数
+        """
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, frozenset], list[str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tokenize(self, instruction: str, vocabulary: Iterable[str] = ()) -> list[str]:
+        """
+        提取指令中的关键词
+
+        Args:
+            instruction: 自然语言指令
+            vocabulary: 屏幕上的元素文本，作为分词词典
+
+        Returns:
+            关键词列表；没有提取到时返回原始指令
+        """
+        if not isinstance(vocabulary, frozenset):
+            vocabulary = frozenset(w.lower() for w in vocabulary if w)
+        key = (instruction, vocabulary)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return list(cached)
+
+        self.misses += 1
+        keywords = self._segment(instruction, vocabulary) or [instruction]
+        self._cache[key] = keywords
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return list(keywords)
+
+    def _segment(self, instruction: str, vocabulary: frozenset) -> list[str]:
+        keywords: list[str] = []
+        for chunk in _SEPARATORS.split(instruction):
+            for run in _RUNS.findall(chunk):
+                if run[0].isascii() and (run[0].isalnum() or run[0] in "_.:/-"):
+                    if run.lower() not in ACTION_VERBS and run.lower() not in STOP_WORDS:
+                        keywords.append(run)
+                else:
+                    keywords.extend(self._max_match(run, vocabulary))
+        return list(dict.fromkeys(keywords))
+
+    def _max_match(self, text: str, vocabulary: frozenset) -> list[str]:
+        """正向最大匹配，屏幕词优先于动词和虚词"""
+        words = []
+        unknown = []
+        i = 0
+        while i < len(text):
+            for length in range(min(_MAX_WORD_LEN, len(text) - i), 0, -1):
+                word = text[i:i + length]
+                lower = word.lower()
+                if lower in vocabulary or lower in ACTION_VERBS or lower in STOP_WORDS:
+                    break
+            else:
+                unknown.append(text[i])
+                i += 1
+                continue
+
+            if unknown:
+                words.append("".join(unknown))
+                unknown = []
+            if lower in vocabulary:
+                words.append(word)
+            i += length
+
+        if unknown:
+            words.append("".join(unknown))
+        return words
@@ -0,0 +1,265 @@
+"""UI 树增量对比
+
+为每个节点计算两种指纹：
+- own_hash：节点自身属性的哈希
+- subtree_hash：自身属性 + 全部子树哈希的结构哈希
+
+构建新快照时，属性未变的节点直接复用上一快照中已解析的元素字典；
+对比两个快照时自顶向下比较 subtree_hash，相同的子树整体跳过，
+对比开销只与发生变化的部分成正比。
+
+节点路径按 resource-id（鸿蒙为 id）、content-desc、text 为子节点取键，
+都没有时才按同名兄弟中的位置取键，列表前部插入节点不会让后面的兄弟
+全部被当作变化。同一父节点下新旧两侧都没有对应的子节点按类名依次配对，
+文本变化的节点仍报告为属性变化。
+
+快照和差异中的元素字典在前后快照之间共享，调用方不能原地修改，
+需要修改时先复制。执行流程和屏幕稳定检测共用同一设备的 UITreeDiffer，
+任一方构建的快照都是另一方下次解析时复用元素的基准。
+"""
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from .ui_parser import UITreeParser
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def _segment(name: str, key: Optional[str], seen: dict) -> str:
+    """子节点的路径段：有键时为 name[@键]，否则为同名无键兄弟中的序号 name[n]
+
+    同一父节点下重复的键追加出现次数，保证路径唯一。
+    """
+    n = seen.get((name, key), 0)
+    seen[(name, key)] = n + 1
+    if key:
+        return f"{name}[@{key}]" if n == 0 else f"{name}[@{key}#{n}]"
+    return f"{name}[{n}]"
+
+
+@dataclass
+class UINode:
+    """快照中的一个节点"""
+    own_hash: bytes
+    name: str = ""
+    subtree_hash: bytes = b""
+    children: list[str] = field(default_factory=list)
+    element: Optional[dict] = None
+
+
+@dataclass
+class UISnapshot:
+    """一次 UI dump 的指纹化快照"""
+    platform: str
+    nodes: dict[str, UINode]
+    root: Optional[str]
+    order: list[str]
+    reused: int = 0
+
+    @property
+    def fingerprint(self) -> str:
+        """整棵树的结构哈希（十六进制），树完全相同则相同"""
+        if self.root is None:
+            return ""
+        return self.nodes[self.root].subtree_hash.hex()
+
+    def elements(self) -> list[dict]:
+        """元素列表，与 parse_android / parse_harmony 输出一致（只读，与其他快照共享）"""
+        return [self.nodes[path].element for path in self.order]
+
+
+@dataclass
+class UITreeDiff:
+    """两个快照之间的差异，键为节点路径，元素字典只读"""
+    added: dict[str, dict] = field(default_factory=dict)
+    removed: dict[str, dict] = field(default_factory=dict)
+    changed: dict[str, tuple[dict, dict]] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        """元素层面是否没有任何变化"""
+        return not (self.added or self.removed or self.changed)
+
+
+class UITreeDiffer:
+    """维护上一快照并计算增量"""
+
+    def __init__(self, parser: Optional[UITreeParser] = None):
+        self.parser = parser or UITreeParser()
+        self.previous: Optional[UISnapshot] = None
+
+    def snapshot_android(self, xml_content: str) -> UISnapshot:
+        """构建 Android dump 的快照"""
+        return self._build("android", self._android_events(xml_content))
+
+    def snapshot_harmony(self, json_content: dict) -> UISnapshot:
+        """构建鸿蒙 dumpLayout 的快照"""
+        return self._build("harmony", self._harmony_events(json_content))
+
+    def snapshot_tree(self, ui_tree: dict) -> UISnapshot:
+        """
+        按设备 get_ui_tree() 的返回构建快照，并将其作为下次复用的基准
+
+        Args:
+            ui_tree: 含 raw_xml 的为 Android dump，否则为鸿蒙 dumpLayout JSON
+
+        Returns:
+            快照，Android XML 格式错误时为空快照
+        """
+        if "raw_xml" in ui_tree:
+            try:
+                snapshot = self.snapshot_android(ui_tree["raw_xml"])
+            except ET.ParseError:
+                snapshot = UISnapshot(platform="android", nodes={}, root=None, order=[])
+        else:
+            snapshot = self.snapshot_harmony(ui_tree)
+        self.previous = snapshot
+        return snapshot
+
+    def update(self, snapshot: UISnapshot) -> UITreeDiff:
+        """与上一快照对比并将其替换为新快照"""
+        previous = self.previous
+        self.previous = snapshot
+        if previous is None or previous.platform != snapshot.platform:
+            return UITreeDiff(added={p: snapshot.nodes[p].element for p in snapshot.order})
+        return self.diff(previous, snapshot)
+
+    def diff(self, old: UISnapshot, new: UISnapshot) -> UITreeDiff:
+        """自顶向下对比两个快照，跳过结构哈希相同的子树"""
+        result = UITreeDiff()
+        stack = []
+        if old.root is not None or new.root is not None:
+            stack.append((old.root, new.root))
+
+        while stack:
+            old_path, new_path = stack.pop()
+            old_node = old.nodes.get(old_path) if old_path else None
+            new_node = new.nodes.get(new_path) if new_path else None
+
+            if old_node and new_node:
+                if old_node.subtree_hash == new_node.subtree_hash:
+                    continue
+                if old_node.own_hash != new_node.own_hash:
+                    if old_node.element and new_node.element:
+                        result.changed[new_path] = (old_node.element, new_node.element)
+                    elif new_node.element:
+                        result.added[new_path] = new_node.element
+                    elif old_node.element:
+                        result.removed[old_path] = old_node.element
+                stack.extend(self._pair_children(old, old_node, new, new_node))
+                continue
+
+            # 整棵子树新增或删除
+            if new_node:
+                self._collect(new, new_path, result.added)
+            if old_node:
+                self._collect(old, old_path, result.removed)
+
+        return result
+
+    @staticmethod
+    def _pair_children(old: UISnapshot, old_node: UINode, new: UISnapshot, new_node: UINode) -> list:
+        """配对两侧的子节点：路径相同的直接配对，其余按类名依次配对"""
+        old_children = set(old_node.children)
+        new_children = set(new_node.children)
+        pairs = [(child, child) for child in new_node.children if child in old_children]
+
+        unmatched_old: dict[str, list[str]] = {}
+        for child in old_node.children:
+            if child not in new_children:
+                unmatched_old.setdefault(old.nodes[child].name, []).append(child)
+        for child in new_node.children:
+            if child not in old_children:
+                candidates = unmatched_old.get(new.nodes[child].name)
+                pairs.append((candidates.pop(0) if candidates else None, child))
+        for candidates in unmatched_old.values():
+            pairs.extend((child, None) for child in candidates)
+        return pairs
+
+    def _collect(self, snapshot: UISnapshot, path: str, into: dict[str, dict]):
+        """收集子树内的全部元素"""
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            node = snapshot.nodes[current]
+            if node.element:
+                into[current] = node.element
+            stack.extend(node.children)
+
+    def _build(self, platform: str, events: Iterator[tuple]) -> UISnapshot:
+        """由 start/end 事件流构建快照（显式栈，后序计算子树哈希）"""
+        previous = self.previous if self.previous and self.previous.platform == platform else None
+        # 上一快照中按自身属性哈希索引的元素，用于复用
+        reusable = {}
+        if previous:
+            reusable = {
+                node.own_hash: node.element
+                for node in previous.nodes.values() if node.element
+            }
+
+        nodes: dict[str, UINode] = {}
+        order: list[str] = []
+        # (路径, 节点, 子节点哈希, 子节点键的出现次数)
+        stack: list[tuple[str, UINode, list[bytes], dict]] = []
+        root = None
+        reused = 0
+
+        for event, name, key, payload, make_element in events:
+            if event == "start":
+                if stack:
+                    parent_path, parent, _, seen = stack[-1]
+                    path = f"{parent_path}/{_segment(name, key, seen)}"
+                    parent.children.append(path)
+                else:
+                    path = root = f"/{name}"
+                node = UINode(own_hash=_digest(payload), name=name)
+                element = reusable.get(node.own_hash)
+                if element is not None:
+                    reused += 1
+                else:
+                    element = make_element()
+                node.element = element
+                if element is not None:
+                    order.append(path)
+                nodes[path] = node
+                stack.append((path, node, [], {}))
+            else:
+                path, node, child_hashes, _ = stack.pop()
+                node.subtree_hash = _digest(node.own_hash + b"".join(child_hashes))
+                if stack:
+                    stack[-1][2].append(node.subtree_hash)
+
+        return UISnapshot(platform=platform, nodes=nodes, root=root, order=order, reused=reused)
+
+    def _android_events(self, xml_content: str) -> Iterator[tuple]:
+        """Android 事件流：(事件, 节点名, 子节点键, 属性字节, 元素构建函数)"""
+        for event, attrib in self.parser._iter_android_events(xml_content):
+            if event == "start":
+                payload = "\x1f".join(f"{k}={v}" for k, v in attrib.items()).encode()
+                key = attrib.get("resource-id") or attrib.get("content-desc") or attrib.get("text")
+                yield ("start", attrib.get("class", "node"), key, payload,
+                       lambda attrib=attrib: self.parser._android_element(attrib))
+            else:
+                yield ("end", None, None, None, None)
+
+    def _harmony_events(self, json_content: dict) -> Iterator[tuple]:
+        """鸿蒙事件流，显式栈遍历 JSON 树"""
+        if not isinstance(json_content, dict):
+            return
+        stack = [(json_content, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                yield ("end", None, None, None, None)
+                continue
+            attrs = {k: v for k, v in node.items() if k != "children"}
+            payload = json.dumps(attrs, sort_keys=True, ensure_ascii=False).encode()
+            yield ("start", node.get("type", "node"), node.get("id") or node.get("text"), payload,
+                   lambda node=node: self.parser._harmony_element(node))
+            stack.append((node, True))
+            for child in reversed(node.get("children", [])):
+                stack.append((child, False))
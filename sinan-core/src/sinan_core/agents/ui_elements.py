@@ -0,0 +1,161 @@
+"""紧凑的 UI 元素存储
+
+按列存放元素属性：字符串列使用驻留（intern）字符串，bounds 存为 (N, 4) int32
+数组。检索通过预建的索引完成，不再逐个扫描字典；to_dicts() 提供与旧版
+解析结果一致的字典视图。
+"""
+import sys
+from bisect import bisect_right
+from typing import Optional
+import numpy as np
+from .bounds import BoundsBatch, compute_geometry
+
+# 各平台字典视图中的字段名
+_DICT_KEYS = {
+    "android": ("text", "class", "content_desc", "resource_id"),
+    "harmony": ("text", "type", None, "id"),
+}
+
+# 拼接检索语料时的字段分隔符，不会出现在查询中
+_SEP = "\x00"
+
+
+class UIElementStore:
+    """UI 元素的列式存储"""
+
+    __slots__ = (
+        "platform", "texts", "classes", "descs", "resource_ids", "bounds",
+        "_geometry", "_exact_index", "_corpus", "_corpus_offsets", "_matcher",
+    )
+
+    def __init__(
+        self,
+        platform: str,
+        texts: list[str],
+        classes: list[str],
+        descs: list[str],
+        resource_ids: list[str],
+        bounds: np.ndarray,
+    ):
+        """
+        Args:
+            platform: android 或 harmony，决定字典视图的字段名
+            texts: 文本
+            classes: 控件类名（鸿蒙为 type）
+            descs: content-desc（鸿蒙为空）
+            resource_ids: resource-id（鸿蒙为 id）
+            bounds: (N, 4) int32 数组，[x1, y1, x2, y2]
+        """
+        self.platform = platform
+        self.texts = texts
+        self.classes = [sys.intern(c) for c in classes]
+        self.descs = descs
+        self.resource_ids = [sys.intern(r) for r in resource_ids]
+        self.bounds = np.asarray(bounds, dtype=np.int32).reshape(-1, 4)
+        self._geometry: Optional[BoundsBatch] = None
+        self._exact_index: Optional[dict[str, list[int]]] = None
+        self._corpus: Optional[str] = None
+        self._corpus_offsets: Optional[list[int]] = None
+        # 由 ElementMatcher.for_elements 按需创建并缓存
+        self._matcher = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def geometry(self) -> BoundsBatch:
+        """批量计算的中心点、面积和可见性"""
+        if self._geometry is None:
+            self._geometry = compute_geometry(self.bounds)
+        return self._geometry
+
+    @property
+    def centers(self) -> np.ndarray:
+        """(N, 2) 中心点数组"""
+        return self.geometry.centers
+
+    @property
+    def areas(self) -> np.ndarray:
+        """(N,) 面积数组，不可见元素为 0"""
+        return self.geometry.areas
+
+    @property
+    def visible(self) -> np.ndarray:
+        """(N,) 是否有非零面积"""
+        return self.geometry.visible
+
+    @property
+    def searchable_ids(self) -> list[str]:
+        """参与文本检索的 ID 列：Android 的 resource-id，鸿蒙的 id 不参与匹配"""
+        if self.platform == "android":
+            return self.resource_ids
+        return [""] * len(self)
+
+    def element(self, i: int) -> dict:
+        """第 i 个元素的字典视图"""
+        return self._element(i, self.bounds[i].tolist(), self.centers[i].tolist())
+
+    def _element(self, i: int, bounds: list[int], center: list[int]) -> dict:
+        text_key, class_key, desc_key, res_key = _DICT_KEYS[self.platform]
+        element = {text_key: self.texts[i], class_key: self.classes[i]}
+        if desc_key:
+            element[desc_key] = self.descs[i]
+        element[res_key] = self.resource_ids[i]
+        element["bounds"] = bounds
+        element["center"] = center
+        return element
+
+    def to_dicts(self) -> list[dict]:
+        """全部元素的字典视图，与旧版解析结果格式一致"""
+        # 整列一次性转换，避免逐行访问 numpy 数组
+        bounds = self.bounds.tolist()
+        centers = self.centers.tolist()
+        return [self._element(i, bounds[i], centers[i]) for i in range(len(self))]
+
+    def _build_index(self):
+        """构建精确匹配索引和子串检索语料"""
+        exact: dict[str, list[int]] = {}
+        ids = self.searchable_ids
+        parts = []
+        offsets = []
+        pos = 0
+        for i in range(len(self)):
+            fields = {
+                f.lower() for f in (self.texts[i], self.descs[i], ids[i]) if f
+            }
+            for f in fields:
+                exact.setdefault(f, []).append(i)
+            # 每个元素占一段，字段之间用分隔符隔开，保证查询不会跨字段命中
+            segment = _SEP + _SEP.join(fields) + _SEP
+            offsets.append(pos)
+            parts.append(segment)
+            pos += len(segment)
+        self._exact_index = exact
+        self._corpus = "".join(parts)
+        self._corpus_offsets = offsets
+
+    def find_exact(self, query: str) -> list[int]:
+        """字段值与查询完全相同（忽略大小写）的元素序号"""
+        if self._exact_index is None:
+            self._build_index()
+        return list(self._exact_index.get(query.lower(), []))
+
+    def find(self, query: str) -> list[int]:
+        """text / desc / resource_id 包含查询（忽略大小写）的元素序号，按文档顺序"""
+        if self._corpus is None:
+            self._build_index()
+        query = query.lower()
+        if not query:
+            return list(range(len(self)))
+
+        hits = []
+        corpus = self._corpus
+        offsets = self._corpus_offsets
+        start = corpus.find(query)
+        while start >= 0:
+            i = bisect_right(offsets, start) - 1
+            hits.append(i)
+            # 同一元素只记一次，直接跳到下一个元素的起点
+            next_start = offsets[i + 1] if i + 1 < len(offsets) else len(corpus)
+            start = corpus.find(query, next_start)
+        return hits
@@ -1,8 +1,9 @@
 # sinan-core/src/sinan_core/agents/ui_parser.py
 """UI 树解析器"""
-import re
 import xml.etree.ElementTree as ET
-from typing import Optional
+from typing import Callable, Iterator, Optional, Union
+from .bounds import decode_bounds, decode_bounds_dicts, parse_bounds
+from .ui_elements import UIElementStore
 
 
 class UITreeParser:
@@ -10,75 +11,162 @@ class UITreeParser:
 
     def parse_android(self, xml_content: str) -> list[dict]:
         """解析 Android uiautomator dump 输出"""
-        elements = []
+        return self.parse_android_store(xml_content).to_dicts()
+
+    def parse_android_store(self, xml_content: str) -> UIElementStore:
+        """解析 Android uiautomator dump 输出为紧凑元素存储"""
+        texts, classes, descs, resource_ids, bounds = [], [], [], [], []
         try:
-            root = ET.fromstring(xml_content)
-            self._traverse_android(root, elements)
+            for attrib in self._iter_android_nodes(xml_content):
+                text = attrib.get("text", "")
+                desc = attrib.get("content-desc", "")
+                res_id = attrib.get("resource-id", "")
+                if text or desc or res_id:
+                    texts.append(text)
+                    classes.append(attrib.get("class", ""))
+                    descs.append(desc)
+                    resource_ids.append(res_id)
+                    bounds.append(attrib.get("bounds", "[0,0][0,0]"))
         except ET.ParseError:
-            pass
-        return elements
-
-    def _traverse_android(self, node: ET.Element, elements: list):
-        """递归遍历 Android UI 树"""
-        bounds_str = node.get("bounds", "[0,0][0,0]")
-        bounds = self._parse_bounds(bounds_str)
-
-        element = {
-            "text": node.get("text", ""),
-            "class": node.get("class", ""),
-            "content_desc": node.get("content-desc", ""),
-            "resource_id": node.get("resource-id", ""),
+            return UIElementStore("android", [], [], [], [], decode_bounds([]))
+        # 全部 bounds 收集完后一次性批量解码
+        return UIElementStore("android", texts, classes, descs, resource_ids, decode_bounds(bounds))
+
+    def iter_android(
+        self,
+        xml_content: str,
+        predicate: Optional[Callable[[dict], bool]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        流式解析 Android UI 树，按文档顺序逐个产出元素
+
+        Args:
+            xml_content: uiautomator dump 的 XML
+            predicate: 过滤条件，只产出满足条件的元素
+            limit: 产出数量上限，达到后立即停止解析
+
+        Raises:
+            ET.ParseError: XML 格式错误（已产出的元素不受影响）
+        """
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        for attrib in self._iter_android_nodes(xml_content):
+            element = self._android_element(attrib)
+            if element is None:
+                continue
+            if predicate is None or predicate(element):
+                yield element
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def _android_element(self, attrib: dict) -> Optional[dict]:
+        """由节点属性构建元素字典，无文本、描述和 ID 的节点返回 None"""
+        text = attrib.get("text", "")
+        desc = attrib.get("content-desc", "")
+        res_id = attrib.get("resource-id", "")
+        if not (text or desc or res_id):
+            return None
+
+        bounds = self._parse_bounds(attrib.get("bounds", "[0,0][0,0]"))
+        return {
+            "text": text,
+            "class": attrib.get("class", ""),
+            "content_desc": desc,
+            "resource_id": res_id,
             "bounds": bounds,
             "center": [(bounds[0] + bounds[2]) // 2, (bounds[1] + bounds[3]) // 2],
         }
 
-        if element["text"] or element["content_desc"] or element["resource_id"]:
-            elements.append(element)
-
-        for child in node:
-            self._traverse_android(child, elements)
+    def _iter_android_nodes(self, xml_content: str) -> Iterator[dict]:
+        """按先序产出每个节点的属性"""
+        for event, attrib in self._iter_android_events(xml_content):
+            if event == "start":
+                yield attrib
+
+    def _iter_android_events(
+        self,
+        xml_content: str,
+        chunk_size: int = 64 * 1024
+    ) -> Iterator[tuple[str, Optional[dict]]]:
+        """增量解析 XML，产出 ("start", 属性) / ("end", None) 事件
+
+        使用显式栈跟踪当前路径，不递归，任意深度的树都不会栈溢出；
+        节点结束后立即从父节点移除，内存占用只与树深度相关。
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        stack: list[ET.Element] = []
+        for offset in range(0, len(xml_content), chunk_size):
+            parser.feed(xml_content[offset:offset + chunk_size])
+            for event, node in parser.read_events():
+                if event == "start":
+                    stack.append(node)
+                    yield "start", node.attrib
+                else:
+                    stack.pop()
+                    if stack:
+                        stack[-1].remove(node)
+                    yield "end", None
+        parser.close()
+        for event, node in parser.read_events():
+            yield event, node.attrib if event == "start" else None
 
     def _parse_bounds(self, bounds_str: str) -> list[int]:
         """解析 bounds 字符串 [x1,y1][x2,y2]"""
-        match = re.findall(r'\d+', bounds_str)
-        if len(match) == 4:
-            return [int(x) for x in match]
-        return [0, 0, 0, 0]
+        return parse_bounds(bounds_str)
 
     def parse_harmony(self, json_content: dict) -> list[dict]:
         """解析鸿蒙 uitest dumpLayout 输出"""
-        elements = []
+        return self.parse_harmony_store(json_content).to_dicts()
+
+    def parse_harmony_store(self, json_content: dict) -> UIElementStore:
+        """解析鸿蒙 uitest dumpLayout 输出为紧凑元素存储"""
+        texts, types, ids, bounds = [], [], [], []
         if isinstance(json_content, dict):
-            self._traverse_harmony(json_content, elements)
-        return elements
-
-    def _traverse_harmony(self, node: dict, elements: list):
-        """递归遍历鸿蒙 UI 树"""
-        bounds = node.get("bounds", {})
-        element = {
-            "text": node.get("text", ""),
+            # 显式栈先序遍历，避免深层嵌套导致递归溢出
+            stack = [json_content]
+            while stack:
+                node = stack.pop()
+                text = node.get("text", "")
+                node_id = node.get("id", "")
+
+                if text or node_id:
+                    texts.append(text)
+                    types.append(node.get("type", ""))
+                    ids.append(node_id)
+                    bounds.append(node.get("bounds", {}))
+
+                stack.extend(reversed(node.get("children", [])))
+        return UIElementStore("harmony", texts, types, [""] * len(texts), ids, decode_bounds_dicts(bounds))
+
+    def _harmony_element(self, node: dict) -> Optional[dict]:
+        """由鸿蒙节点构建元素字典，无文本和 ID 的节点返回 None"""
+        text = node.get("text", "")
+        node_id = node.get("id", "")
+        if not (text or node_id):
+            return None
+
+        b = node.get("bounds", {})
+        bounds = [b.get("left", 0), b.get("top", 0), b.get("right", 0), b.get("bottom", 0)]
+        return {
+            "text": text,
             "type": node.get("type", ""),
-            "id": node.get("id", ""),
-            "bounds": [
-                bounds.get("left", 0),
-                bounds.get("top", 0),
-                bounds.get("right", 0),
-                bounds.get("bottom", 0),
-            ],
+            "id": node_id,
+            "bounds": bounds,
+            "center": [(bounds[0] + bounds[2]) // 2, (bounds[1] + bounds[3]) // 2],
         }
 
-        if element["text"] or element["id"]:
-            element["center"] = [
-                (element["bounds"][0] + element["bounds"][2]) // 2,
-                (element["bounds"][1] + element["bounds"][3]) // 2,
-            ]
-            elements.append(element)
-
-        for child in node.get("children", []):
-            self._traverse_harmony(child, elements)
+    def fuzzy_match(
+        self,
+        query: str,
+        elements: Union[list[dict], UIElementStore]
+    ) -> list[dict]:
+        """模糊匹配元素，传入 UIElementStore 时走索引检索"""
+        if isinstance(elements, UIElementStore):
+            return [elements.element(i) for i in elements.find(query)]
 
-    def fuzzy_match(self, query: str, elements: list[dict]) -> list[dict]:
-        """模糊匹配元素"""
         matches = []
         query_lower = query.lower()
 
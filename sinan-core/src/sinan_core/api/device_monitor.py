@@ -1,53 +1,187 @@
 # sinan-core/src/sinan_core/api/device_monitor.py
 """设备状态监控服务"""
 import asyncio
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+from ..drivers.manager import parse_adb_devices, parse_hdc_targets
 
 if TYPE_CHECKING:
     from .websocket import ConnectionManager
     from ..drivers.manager import DeviceManager
 
 
+class AdaptiveInterval:
+    """自适应轮询间隔：无变化时指数退避，有变化时回到最小间隔"""
+
+    def __init__(self, minimum: float, maximum: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.current = minimum
+
+    def next(self, changed: bool) -> float:
+        """根据本轮是否有变化返回下一次等待时间"""
+        if changed:
+            self.current = self.minimum
+        else:
+            self.current = min(self.current * 2, self.maximum)
+        return self.current
+
+
 class DeviceMonitor:
-    """设备监控器，定期检测设备变化并通过 WebSocket 推送"""
+    """设备监控器，检测设备变化并通过 WebSocket 推送
+
+    Android 设备通过常驻的 `adb track-devices` 流实时获取连接/断开事件，
+    流不可用时退化为自适应间隔轮询；鸿蒙设备使用自适应间隔轮询
+    `hdc list targets`。
+    """
 
-    def __init__(self, device_manager: "DeviceManager", ws_manager: "ConnectionManager"):
+    def __init__(
+        self,
+        device_manager: "DeviceManager",
+        ws_manager: "ConnectionManager",
+        adb_cmd: tuple[str, ...] = ("adb",),
+        hdc_cmd: tuple[str, ...] = ("hdc",),
+        max_interval: float = 4.0,
+    ):
+        """
+        Args:
+            device_manager: 设备管理器，设备变化时同步刷新其注册表缓存
+            ws_manager: WebSocket 连接管理器
+            adb_cmd: adb 可执行命令
+            hdc_cmd: hdc 可执行命令
+            max_interval: 轮询退避的最大间隔（秒）
+        """
         self._device_manager = device_manager
         self._ws_manager = ws_manager
+        self._adb_cmd = tuple(adb_cmd)
+        self._hdc_cmd = tuple(hdc_cmd)
+        self._max_interval = max_interval
         self._last_devices: set[str] = set()
+        self._android: set[str] = set()
+        self._harmony: set[str] = set()
+        self._tracker: Optional[asyncio.subprocess.Process] = None
         self._running = False
 
-    async def start(self, interval: float = 2.0):
+    async def start(self, interval: float = 1.0):
         """启动设备监控
 
         Args:
-            interval: 检测间隔（秒）
+            interval: 轮询的最小间隔（秒）
         """
         self._running = True
         # 初始化设备列表
-        self._last_devices = {d["serial"] for d in self._device_manager.list_devices()}
+        devices = await asyncio.to_thread(self._device_manager.list_devices)
+        self._android = {d["serial"] for d in devices if d["type"] == "android"}
+        self._harmony = {d["serial"] for d in devices if d["type"] == "harmony"}
+        self._last_devices = self._android | self._harmony
 
-        while self._running:
-            await self._check_devices()
-            await asyncio.sleep(interval)
+        await asyncio.gather(
+            self._track_android(interval),
+            self._poll_harmony(interval),
+        )
 
     def stop(self):
         """停止设备监控"""
         self._running = False
+        if self._tracker and self._tracker.returncode is None:
+            self._tracker.kill()
 
-    async def _check_devices(self):
+    async def _track_android(self, interval: float):
+        """跟踪 Android 设备，优先使用 track-devices 流"""
+        backoff = AdaptiveInterval(interval, self._max_interval)
+        while self._running:
+            streamed = await self._stream_adb_devices()
+            if not self._running:
+                break
+            # 流不可用或中断：轮询一次后退避，再尝试重新建立流
+            changed = await self._update("android", await self._scan(self._adb_cmd + ("devices",)))
+            await asyncio.sleep(backoff.minimum if streamed else backoff.next(changed))
+
+    async def _stream_adb_devices(self) -> bool:
+        """读取 `adb track-devices` 流直到其结束，返回是否收到过数据
+
+        每条消息为 4 位十六进制长度前缀 + 设备列表。
+        """
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self._adb_cmd, "track-devices",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+
+        self._tracker = proc
+        received = False
+        try:
+            while self._running:
+                header = await proc.stdout.readexactly(4)
+                length = int(header, 16)
+                payload = await proc.stdout.readexactly(length) if length else b""
+                received = True
+                await self._update("android", set(parse_adb_devices(payload.decode(errors="replace"))))
+        except (asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            self._tracker = None
+        return received
+
+    async def _poll_harmony(self, interval: float):
+        """以自适应间隔轮询鸿蒙设备"""
+        backoff = AdaptiveInterval(interval, self._max_interval)
+        while self._running:
+            serials = await self._scan(self._hdc_cmd + ("list", "targets"), harmony=True)
+            changed = await self._update("harmony", serials)
+            await asyncio.sleep(backoff.next(changed))
+
+    async def _scan(self, cmd: tuple[str, ...], harmony: bool = False) -> set[str]:
+        """执行一次设备列表命令"""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            stdout, _ = await proc.communicate()
+        except OSError:
+            return set()
+        output = stdout.decode(errors="replace")
+        return set(parse_hdc_targets(output) if harmony else parse_adb_devices(output))
+
+    async def _update(self, device_type: str, serials: set[str]) -> bool:
+        """更新某类设备的当前集合，返回是否发生变化"""
+        if device_type == "android":
+            self._android = serials
+        else:
+            self._harmony = serials
+        return await self._check_devices()
+
+    async def _check_devices(self) -> bool:
         """检测设备变化并推送"""
-        current_devices = self._device_manager.list_devices()
-        current_serials = {d["serial"] for d in current_devices}
+        current_devices = (
+            [{"serial": s, "type": "android"} for s in sorted(self._android)]
+            + [{"serial": s, "type": "harmony"} for s in sorted(self._harmony)]
+        )
+        current_serials = self._android | self._harmony
+        # 保持设备管理器注册表为最新
+        self._device_manager.update_devices(current_devices)
 
         # 检测新连接的设备
         connected = current_serials - self._last_devices
         # 检测断开的设备
         disconnected = self._last_devices - current_serials
 
+        if disconnected:
+            # 释放驱动可能等待设备上的命令，放到线程中执行
+            await asyncio.to_thread(self._device_manager.invalidate, disconnected)
+
         if connected or disconnected:
             await self._broadcast_device_change(current_devices, connected, disconnected)
             self._last_devices = current_serials
+            return True
+        return False
 
     async def _broadcast_device_change(
         self,
@@ -64,4 +198,5 @@ class DeviceMonitor:
                 "disconnected": list(disconnected)
             }
         }
-        await self._ws_manager.broadcast(message)
+        # 消息携带完整设备列表，慢客户端只需收到最新一条
+        await self._ws_manager.broadcast(message, key="device_change")
@@ -0,0 +1,172 @@
+"""WebSocket 二进制截图帧
+
+控制消息仍走 JSON，截图以二进制帧单独发送，避免 base64 膨胀和
+大字符串的 JSON 序列化。客户端连接后发送
+``{"type": "hello", "payload": {"binaryFrames": true}}`` 协商，
+未协商的旧客户端继续在 JSON 中收到 base64 截图。
+
+帧格式（大端序，共 16 字节头部）::
+
+    magic    2s  b"SN"
+    version  B   协议版本
+    format   B   图像格式编码，见 FORMAT_CODES
+    msg_id   I   消息 id，与 JSON 消息中的 screenshotFrame 对应
+    step_id  I   步骤 id
+    width    H   图像宽度
+    height   H   图像高度
+
+头部之后是编码后的图像字节。
+
+实时画面帧（live view）只携带变化区域，头部 18 字节::
+
+    magic    2s  b"SL"
+    version  B   协议版本
+    format   B   区域图像格式编码
+    stream   I   订阅 id，与 live_subscribed 消息中的 streamId 对应
+    seq      I   帧序号，客户端用 live_ack 确认
+    width    H   整帧宽度
+    height   H   整帧高度
+    count    H   区域数
+
+之后依次是每个区域：x(H) y(H) 长度(I) 及编码后的区域图像。客户端按
+坐标把区域绘制到上一帧画面上；关键帧是一个覆盖整帧的区域。
+"""
+import struct
+from dataclasses import dataclass
+from ..drivers.frame_encoder import EncodeFormat
+
+MAGIC = b"SN"
+LIVE_MAGIC = b"SL"
+VERSION = 1
+
+# 图像格式编码
+FORMAT_CODES = {"png": 1, "jpeg": 2, "webp": 3}
+FORMAT_NAMES = {code: name for name, code in FORMAT_CODES.items()}
+
+_HEADER = struct.Struct("!2sBBIIHH")
+HEADER_SIZE = _HEADER.size
+_LIVE_HEADER = struct.Struct("!2sBBIIHHH")
+_REGION = struct.Struct("!HHI")
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    """二进制帧头部"""
+    msg_id: int
+    step_id: int
+    format: str
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class LiveHeader:
+    """实时画面帧头部"""
+    stream_id: int
+    seq: int
+    format: str
+    width: int
+    height: int
+
+
+def pack_frame(msg_id: int, step_id: int, fmt: EncodeFormat,
+               size: tuple[int, int], data: bytes) -> bytes:
+    """
+    打包二进制截图帧
+
+    Args:
+        msg_id: 消息 id
+        step_id: 步骤 id
+        fmt: 图像编码格式
+        size: 图像尺寸 (宽, 高)
+        data: 编码后的图像字节
+
+    Returns:
+        头部 + 图像字节
+    """
+    width, height = size
+    header = _HEADER.pack(MAGIC, VERSION, FORMAT_CODES[fmt.name], msg_id, step_id, width, height)
+    return header + data
+
+
+def unpack_frame(frame: bytes) -> tuple[FrameHeader, bytes]:
+    """
+    解析二进制截图帧
+
+    Args:
+        frame: 收到的二进制帧
+
+    Returns:
+        (头部, 图像字节)
+
+    Raises:
+        ValueError: 帧过短、magic 或版本不匹配、格式未知
+    """
+    if len(frame) < HEADER_SIZE:
+        raise ValueError("帧长度不足")
+    magic, version, code, msg_id, step_id, width, height = _HEADER.unpack_from(frame)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("不支持的帧头")
+    if code not in FORMAT_NAMES:
+        raise ValueError(f"未知图像格式: {code}")
+    header = FrameHeader(msg_id, step_id, FORMAT_NAMES[code], width, height)
+    return header, frame[HEADER_SIZE:]
+
+
+def pack_live_frame(stream_id: int, seq: int, fmt: EncodeFormat, size: tuple[int, int],
+                    regions: list[tuple[int, int, bytes]]) -> bytes:
+    """
+    打包实时画面帧
+
+    Args:
+        stream_id: 订阅 id
+        seq: 帧序号
+        fmt: 区域图像编码格式
+        size: 整帧尺寸 (宽, 高)
+        regions: 变化区域 (x, y, 编码后的图像字节)
+
+    Returns:
+        头部 + 各区域
+    """
+    width, height = size
+    parts = [_LIVE_HEADER.pack(LIVE_MAGIC, VERSION, FORMAT_CODES[fmt.name],
+                               stream_id, seq, width, height, len(regions))]
+    for x, y, data in regions:
+        parts.append(_REGION.pack(x, y, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def unpack_live_frame(frame: bytes) -> tuple[LiveHeader, list[tuple[int, int, bytes]]]:
+    """
+    解析实时画面帧
+
+    Args:
+        frame: 收到的二进制帧
+
+    Returns:
+        (头部, [(x, y, 区域图像字节)])
+
+    Raises:
+        ValueError: 帧不完整、magic 或版本不匹配、格式未知
+    """
+    if len(frame) < _LIVE_HEADER.size:
+        raise ValueError("帧长度不足")
+    magic, version, code, stream_id, seq, width, height, count = _LIVE_HEADER.unpack_from(frame)
+    if magic != LIVE_MAGIC or version != VERSION:
+        raise ValueError("不支持的帧头")
+    if code not in FORMAT_NAMES:
+        raise ValueError(f"未知图像格式: {code}")
+
+    regions = []
+    offset = _LIVE_HEADER.size
+    for _ in range(count):
+        if offset + _REGION.size > len(frame):
+            raise ValueError("帧长度不足")
+        x, y, length = _REGION.unpack_from(frame, offset)
+        offset += _REGION.size
+        if offset + length > len(frame):
+            raise ValueError("帧长度不足")
+        regions.append((x, y, frame[offset:offset + length]))
+        offset += length
+    return LiveHeader(stream_id, seq, FORMAT_NAMES[code], width, height), regions
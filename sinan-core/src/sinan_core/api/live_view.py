@@ -0,0 +1,293 @@
+"""实时画面推送
+
+客户端在 /ws 上订阅设备后，服务端持续截图并只推送变化区域（见
+frames.pack_live_frame），用于在前端近实时地镜像多台设备：
+
+- 变化检测：TileDiffer 按瓦片哈希比较，画面静止时不编码也不发送
+- 自适应帧率：有变化时按最高帧率采集，静止时间隔指数退避
+- 客户端背压：客户端绘制后回复 live_ack，未确认的帧达到上限时暂停推送，
+  慢客户端不会在服务端堆积帧
+- 带宽预算：所有订阅共享总带宽，按上一帧体积推迟下一次推送
+- 同一设备被多个客户端订阅时共享截图，并与执行流程共用设备的持续帧源
+"""
+import asyncio
+import itertools
+import time
+from io import BytesIO
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from fastapi import WebSocket
+from PIL import Image
+from ..drivers.async_base import AsyncBaseDevice
+from ..drivers.frame_encoder import PREVIEW, EncodeFormat
+from ..drivers.frame_source import FrameSource
+from ..drivers.tile_diff import TileDelta, TileDiffer
+from .device_monitor import AdaptiveInterval
+from .frames import pack_live_frame
+
+if TYPE_CHECKING:
+    from ..drivers.manager import DeviceManager
+
+
+# 客户端可请求的最高帧率上限
+MAX_FPS_LIMIT = 30.0
+
+
+def parse_max_fps(value) -> float:
+    """
+    校验客户端请求的最高帧率
+
+    Args:
+        value: 客户端传入的 maxFps
+
+    Returns:
+        限制在 (0, MAX_FPS_LIMIT] 内的帧率
+
+    Raises:
+        ValueError: 不是正数
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"无效的帧率: {value!r}")
+    if not value > 0:
+        # 同时排除 NaN
+        raise ValueError(f"无效的帧率: {value!r}")
+    return min(float(value), MAX_FPS_LIMIT)
+
+
+class SharedCapture:
+    """同一设备的共享截图，帧龄小于 max_age 时直接复用
+
+    提供持续帧源时从帧源取帧，否则自行截图。
+    """
+
+    def __init__(self, device: AsyncBaseDevice, max_age: float, frame_source: Optional[FrameSource] = None):
+        self.device = device
+        self.max_age = max_age
+        self.frame_source = frame_source
+        self._image: Optional[Image.Image] = None
+        self._taken = 0.0
+        self._lock = asyncio.Lock()
+
+    async def grab(self) -> Image.Image:
+        if self.frame_source and self.frame_source.is_running():
+            frame = await asyncio.to_thread(self.frame_source.fresh_frame, self.max_age)
+            if frame:
+                return frame.image
+        async with self._lock:
+            if self._image is None or time.monotonic() - self._taken >= self.max_age:
+                self._image = await self.device.screenshot()
+                self._taken = time.monotonic()
+            return self._image
+
+
+class LiveStream:
+    """一个客户端对一台设备的实时画面订阅"""
+
+    def __init__(
+        self,
+        stream_id: int,
+        capture: SharedCapture,
+        send: Callable[[bytes], Awaitable[None]],
+        bandwidth: Callable[[], float],
+        max_fps: float = 10.0,
+        max_interval: float = 2.0,
+        max_unacked: int = 2,
+        tile_size: int = 128,
+        fmt: EncodeFormat = PREVIEW,
+    ):
+        """
+        Args:
+            stream_id: 订阅 id
+            capture: 设备的共享截图
+            send: 发送二进制帧的协程函数
+            bandwidth: 返回本订阅当前可用带宽（字节/秒），0 表示不限
+            max_fps: 画面变化时的最高帧率
+            max_interval: 画面静止时的最长采集间隔（秒）
+            max_unacked: 允许未确认的帧数
+            tile_size: 差异比较的瓦片边长
+            fmt: 区域图像编码格式
+        """
+        if not max_fps > 0:
+            raise ValueError(f"无效的帧率: {max_fps!r}")
+        self.stream_id = stream_id
+        self.capture = capture
+        self.max_unacked = max_unacked
+        self.fmt = fmt
+        self.seq = 0
+        self.acked = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.skipped = 0
+        self._send = send
+        self._bandwidth = bandwidth
+        self._interval = AdaptiveInterval(1 / max_fps, max_interval)
+        self._differ = TileDiffer(tile_size)
+        self._window = asyncio.Event()
+        self._window.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def ack(self, seq: int):
+        """客户端确认已处理到 seq（累计确认）"""
+        self.acked = max(self.acked, min(seq, self.seq))
+        if self.seq - self.acked < self.max_unacked:
+            self._window.set()
+
+    def keyframe(self):
+        """下一帧发送整帧，用于客户端丢失画面后恢复"""
+        self._differ.reset()
+
+    async def _run(self):
+        while True:
+            # 未确认帧达到上限时等待客户端追上
+            if not self._window.is_set():
+                self.skipped += 1
+                await self._window.wait()
+
+            try:
+                image = await self.capture.grab()
+            except Exception:
+                # 设备暂时不可用，按最长间隔重试
+                await asyncio.sleep(self._interval.maximum)
+                continue
+
+            delta, data = await asyncio.to_thread(self._encode, image)
+            wait = self._interval.next(not delta.empty)
+            if data is not None:
+                try:
+                    await self._send(data)
+                except Exception:
+                    # 连接已断开，结束推送
+                    return
+                self.frames_sent += 1
+                self.bytes_sent += len(data)
+                if self.seq - self.acked >= self.max_unacked:
+                    self._window.clear()
+                budget = self._bandwidth()
+                if budget:
+                    wait = max(wait, len(data) / budget)
+            await asyncio.sleep(wait)
+
+    def _encode(self, image: Image.Image) -> tuple[TileDelta, Optional[bytes]]:
+        """计算差异并打包变化区域，无变化时返回 None"""
+        delta = self._differ.diff(image)
+        if delta.empty:
+            return delta, None
+        regions = [(x, y, _encode_region(region, self.fmt)) for x, y, region in delta.regions]
+        self.seq += 1
+        return delta, pack_live_frame(self.stream_id, self.seq, self.fmt, delta.size, regions)
+
+
+def _encode_region(image: Image.Image, fmt: EncodeFormat) -> bytes:
+    buffer = BytesIO()
+    if fmt.format == "PNG":
+        image.save(buffer, format="PNG")
+    else:
+        image.save(buffer, format=fmt.format, quality=fmt.quality)
+    return buffer.getvalue()
+
+
+class LiveViewManager:
+    """管理所有连接的实时画面订阅"""
+
+    def __init__(
+        self,
+        max_bandwidth: float = 4 * 1024 * 1024,
+        frame_sources: Optional["DeviceManager"] = None,
+        **stream_options,
+    ):
+        """
+        Args:
+            max_bandwidth: 所有订阅共享的总带宽（字节/秒），0 表示不限
+            frame_sources: 提供设备共享帧源的设备管理器，为 None 时各设备自行截图
+            stream_options: 传给 LiveStream 的默认参数
+        """
+        self.max_bandwidth = max_bandwidth
+        self.frame_sources = frame_sources
+        self.stream_options = stream_options
+        self._streams: dict[WebSocket, dict[int, LiveStream]] = {}
+        # 设备序列号 -> (共享截图, 订阅数)
+        self._captures: dict[str, list] = {}
+        self._serials: dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def stream_count(self) -> int:
+        return sum(len(streams) for streams in self._streams.values())
+
+    def _share(self) -> float:
+        count = self.stream_count
+        return self.max_bandwidth / count if self.max_bandwidth and count else 0
+
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        serial: str,
+        device: AsyncBaseDevice,
+        send: Optional[Callable[[bytes], Awaitable[None]]] = None,
+        **options,
+    ) -> LiveStream:
+        """
+        订阅设备画面
+
+        Args:
+            websocket: 客户端连接
+            serial: 设备序列号
+            device: 异步设备
+            send: 发送二进制帧的协程函数，默认 websocket.send_bytes
+            options: 覆盖默认的 LiveStream 参数
+
+        Returns:
+            已启动的订阅
+        """
+        options = {**self.stream_options, **options}
+        max_fps = options.get("max_fps", 10.0)
+        entry = self._captures.get(serial)
+        if entry is None:
+            source = self.frame_sources.acquire_frame_source(serial) if self.frame_sources else None
+            entry = self._captures[serial] = [SharedCapture(device, 1 / max_fps, source), 0]
+        entry[1] += 1
+
+        stream_id = next(self._ids)
+        stream = LiveStream(stream_id, entry[0], send or websocket.send_bytes, self._share, **options)
+        self._streams.setdefault(websocket, {})[stream_id] = stream
+        self._serials[stream_id] = serial
+        stream.start()
+        return stream
+
+    def get(self, websocket: WebSocket, stream_id: int) -> Optional[LiveStream]:
+        return self._streams.get(websocket, {}).get(stream_id)
+
+    async def unsubscribe(self, websocket: WebSocket, stream_id: int) -> bool:
+        """取消订阅，返回是否存在该订阅"""
+        streams = self._streams.get(websocket, {})
+        stream = streams.pop(stream_id, None)
+        if stream is None:
+            return False
+        if not streams:
+            self._streams.pop(websocket, None)
+        await stream.stop()
+        serial = self._serials.pop(stream_id)
+        entry = self._captures[serial]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._captures[serial]
+            if entry[0].frame_source:
+                await asyncio.to_thread(self.frame_sources.release_frame_source, serial)
+        return True
+
+    async def close(self, websocket: WebSocket):
+        """连接断开时取消其全部订阅"""
+        for stream_id in list(self._streams.get(websocket, {})):
+            await self.unsubscribe(websocket, stream_id)
@@ -4,7 +4,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import devices, cases
-from .websocket import websocket_endpoint, manager, device_manager
+from .websocket import execution_agent, websocket_endpoint, manager
+from ..drivers.manager import device_manager
 from .device_monitor import DeviceMonitor
 
 # 创建设备监控器
@@ -14,16 +15,18 @@ device_monitor = DeviceMonitor(device_manager, manager)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    # 启动时：启动设备监控
+    # 启动时：启动设备监控和决策缓存的定期保存
     monitor_task = asyncio.create_task(device_monitor.start())
+    flush_task = asyncio.create_task(execution_agent.decision_cache.run_flusher())
     yield
-    # 关闭时：停止设备监控
+    # 关闭时：停止设备监控，保存决策缓存
     device_monitor.stop()
-    monitor_task.cancel()
-    try:
-        await monitor_task
-    except asyncio.CancelledError:
-        pass
+    for task in (monitor_task, flush_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
 
 app = FastAPI(title="Sinan Core API", version="0.1.0", lifespan=lifespan)
@@ -0,0 +1,169 @@
+"""WebSocket 连接的发送队列
+
+每个连接一个有界发送队列和独立的写协程：调用方只负责入队，
+实际发送由写协程完成，一个慢客户端不会拖住其他连接或调用方。
+
+队列满时的策略：
+- 可丢弃消息（广播通知）：丢弃队列中最旧的可丢弃消息
+- 带合并键的消息：队列中尚未发送的同键消息直接被新消息替换
+- 不可丢弃消息（请求的响应、截图帧）：没有可丢弃的消息可让位时，
+  认为客户端已跟不上，关闭该连接
+
+发送失败或超时的连接同样被关闭，并通过 on_close 回调通知管理器移除。
+"""
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+from fastapi import WebSocket
+
+
+def dumps(message: dict) -> str:
+    """与 WebSocket.send_json 相同的序列化方式"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass
+class _Item:
+    data: Union[str, bytes]
+    droppable: bool
+    key: Optional[str] = None
+
+
+class Outbox:
+    """单个连接的发送队列"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int = 256,
+        send_timeout: float = 5.0,
+        on_close: Optional[Callable[["Outbox"], None]] = None,
+    ):
+        """
+        Args:
+            websocket: 客户端连接
+            max_size: 队列上限（条）
+            send_timeout: 单条消息的发送超时（秒），超时视为连接失效
+            on_close: 连接因失败被关闭时的回调
+        """
+        self.websocket = websocket
+        self.max_size = max_size
+        self.send_timeout = send_timeout
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._on_close = on_close
+        self._queue: deque[_Item] = deque()
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._writer())
+
+    def put(self, data: Union[str, bytes], droppable: bool = False, key: Optional[str] = None) -> bool:
+        """
+        消息入队，不等待发送
+
+        Args:
+            data: 文本（已序列化的 JSON）或二进制帧
+            droppable: 队列满时是否允许丢弃
+            key: 合并键，队列中尚未发送的同键消息会被替换
+
+        Returns:
+            是否入队成功；连接已关闭或因跟不上被关闭时返回 False
+        """
+        if self.closed:
+            return False
+        if key is not None:
+            for item in self._queue:
+                if item.key == key:
+                    item.data = data
+                    self.coalesced += 1
+                    return True
+
+        if len(self._queue) >= self.max_size and not self._make_room():
+            if not droppable:
+                self._fail()
+                return False
+            self.dropped += 1
+            return False
+
+        self._queue.append(_Item(data, droppable, key))
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def join(self):
+        """等待队列中的消息全部发送完"""
+        await self._idle.wait()
+
+    async def close(self):
+        """停止写协程，丢弃未发送的消息"""
+        self.closed = True
+        self._queue.clear()
+        self._idle.set()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _make_room(self) -> bool:
+        """丢弃最旧的一条可丢弃消息"""
+        for index, item in enumerate(self._queue):
+            if item.droppable:
+                del self._queue[index]
+                self.dropped += 1
+                return True
+        return False
+
+    def _fail(self):
+        """客户端跟不上或发送失败：关闭连接并通知管理器"""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._idle.set()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        asyncio.ensure_future(self._close_socket())
+        if self._on_close:
+            self._on_close(self)
+
+    async def _close_socket(self):
+        try:
+            await asyncio.wait_for(self.websocket.close(), self.send_timeout)
+        except Exception:
+            pass
+
+    async def _writer(self):
+        while not self.closed:
+            if not self._queue:
+                self._idle.set()
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            item = self._queue.popleft()
+            try:
+                if isinstance(item.data, bytes):
+                    send = self.websocket.send_bytes(item.data)
+                else:
+                    send = self.websocket.send_text(item.data)
+                await asyncio.wait_for(send, self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._fail()
+                return
+            self.sent += 1
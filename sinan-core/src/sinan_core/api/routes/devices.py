@@ -1,43 +1,51 @@
 """设备相关 API 路由"""
-import base64
-from io import BytesIO
+import asyncio
 from fastapi import APIRouter, HTTPException
-from sinan_core.drivers.manager import DeviceManager
+from sinan_core.drivers.manager import device_manager
+from sinan_core.drivers.frame_encoder import PNG, PREVIEW, WEBP, frame_encoder
+from sinan_core.drivers.frame_source import FRESH_FRAME_AGE
 
 router = APIRouter(tags=["devices"])
-device_manager = DeviceManager()
+
+# 截图接口支持的编码格式
+SCREENSHOT_FORMATS = {"png": PNG, "jpeg": PREVIEW, "webp": WEBP}
 
 
 @router.get("/devices")
 async def list_devices():
     """获取设备列表"""
-    return device_manager.list_devices()
+    return await asyncio.to_thread(device_manager.cached_devices)
 
 
 @router.post("/devices/{serial}/tap")
 async def tap(serial: str, x: int, y: int):
     """点击操作"""
-    device = device_manager.get_device(serial)
+    device = await device_manager.get_async_device(serial)
     if not device:
         raise HTTPException(status_code=404, detail="设备未找到")
 
-    success = device.tap(x, y)
+    success = await device.tap(x, y)
     return {"success": success}
 
 
 @router.get("/devices/{serial}/screenshot")
-async def screenshot(serial: str):
-    """获取截图"""
-    device = device_manager.get_device(serial)
+async def screenshot(serial: str, format: str = "png"):
+    """获取截图，format 可选 png / jpeg / webp"""
+    fmt = SCREENSHOT_FORMATS.get(format.lower())
+    if fmt is None:
+        raise HTTPException(status_code=400, detail=f"不支持的格式: {format}")
+
+    device = await device_manager.get_async_device(serial)
     if not device:
         raise HTTPException(status_code=404, detail="设备未找到")
 
     try:
-        img = device.screenshot()
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        screenshot_b64 = base64.b64encode(buffer.getvalue()).decode()
-        return {"screenshot": screenshot_b64}
+        # 设备正在被执行或实时画面采集时直接取帧源的最新帧
+        source = device_manager.frame_source(serial)
+        frame = source.latest_frame(max_age=FRESH_FRAME_AGE) if source else None
+        img = frame.image if frame else await device.screenshot()
+        screenshot_b64 = await frame_encoder.encode_base64_async(img, fmt)
+        return {"screenshot": screenshot_b64, "format": fmt.name}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -45,8 +53,8 @@ async def screenshot(serial: str):
 @router.get("/devices/{serial}/ui-tree")
 async def get_ui_tree(serial: str):
     """获取 UI 树"""
-    device = device_manager.get_device(serial)
+    device = await device_manager.get_async_device(serial)
     if not device:
         raise HTTPException(status_code=404, detail="设备未找到")
 
-    return device.get_ui_tree()
+    return await device.get_ui_tree()
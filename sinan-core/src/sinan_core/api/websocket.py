@@ -1,61 +1,300 @@
 # sinan-core/src/sinan_core/api/websocket.py
 """WebSocket 处理器"""
 import asyncio
-import base64
-from io import BytesIO
+import itertools
+import os
+from pathlib import Path
+from typing import Optional
 from fastapi import WebSocket, WebSocketDisconnect
-from ..drivers.manager import DeviceManager
+from PIL import Image
+from ..drivers.async_base import AsyncBaseDevice
+from ..drivers.frame_encoder import PREVIEW, EncodeFormat, frame_encoder
+from ..drivers.frame_source import FRESH_FRAME_AGE, FrameSource
+from ..drivers.manager import device_manager
+from ..agents.decision_cache import DecisionCache
 from ..agents.executor import ExecutionAgent, ExecutionStrategy
+from ..agents.stability import ScreenStabilityDetector
+from ..agents.ui_diff import UITreeDiffer
 from ..agents.ui_parser import UITreeParser
+from .frames import VERSION as FRAME_VERSION, pack_frame
+from .live_view import LiveViewManager, parse_max_fps
+from .outbox import Outbox, dumps
 
 
-device_manager = DeviceManager()
+# 决策缓存的持久化文件，回归用例再次运行时屏幕未变化即可跳过匹配；
+# 可通过环境变量 SINAN_DECISION_CACHE 指定
+DECISION_CACHE_PATH = Path(
+    os.environ.get("SINAN_DECISION_CACHE", Path.home() / ".cache" / "sinan" / "decisions.json")
+)
+
 ui_parser = UITreeParser()
-execution_agent = ExecutionAgent()
+execution_agent = ExecutionAgent(decision_cache=DecisionCache(path=DECISION_CACHE_PATH))
 
 
 class ConnectionManager:
-    """WebSocket 连接管理器"""
-
-    def __init__(self):
+    """WebSocket 连接管理器
+
+    每个连接有独立的有界发送队列和写协程（见 outbox.Outbox），send / broadcast
+    只负责入队：广播只序列化一次，各连接并发写出，慢客户端只会丢弃自己的
+    旧通知，发送失败或跟不上的连接自动移除。
+    """
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 5.0):
+        """
+        Args:
+            max_queue: 每个连接的发送队列上限（条）
+            send_timeout: 单条消息的发送超时（秒）
+        """
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
         self.active_connections: list[WebSocket] = []
+        # 协商了二进制截图帧的连接
+        self.binary_clients: set[WebSocket] = set()
+        self._outboxes: dict[WebSocket, Outbox] = {}
+        self._msg_ids = itertools.count(1)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        outbox = Outbox(websocket, self.max_queue, self.send_timeout, on_close=self._prune)
+        self._outboxes[websocket] = outbox
+        outbox.start()
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.binary_clients.discard(websocket)
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox and not outbox.closed:
+            asyncio.ensure_future(outbox.close())
+
+    def _prune(self, outbox: Outbox):
+        """发送失败或跟不上的连接从管理器移除"""
+        self.disconnect(outbox.websocket)
+
+    def outbox(self, websocket: WebSocket) -> Optional[Outbox]:
+        return self._outboxes.get(websocket)
+
+    def negotiate(self, websocket: WebSocket, payload: dict) -> dict:
+        """
+        处理客户端 hello 消息，记录连接能力
+
+        Args:
+            websocket: 客户端连接
+            payload: hello 消息内容
+
+        Returns:
+            服务端确认的能力
+        """
+        binary = bool(payload.get("binaryFrames"))
+        if binary:
+            self.binary_clients.add(websocket)
+        else:
+            self.binary_clients.discard(websocket)
+        return {"binaryFrames": binary, "frameVersion": FRAME_VERSION if binary else None}
 
     async def send(self, websocket: WebSocket, message: dict):
-        await websocket.send_json(message)
-
-    async def broadcast(self, message: dict):
-        """向所有连接广播消息"""
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                # 连接可能已断开，忽略错误
-                pass
+        """向单个连接发送消息（入队即返回，保持顺序）"""
+        await self._put(websocket, dumps(message))
+
+    async def send_bytes(self, websocket: WebSocket, data: bytes):
+        """向单个连接发送二进制帧"""
+        await self._put(websocket, data)
+
+    async def _put(self, websocket: WebSocket, data):
+        outbox = self._outboxes.get(websocket)
+        if outbox is None:
+            # 未经 connect 注册的连接直接发送
+            if isinstance(data, bytes):
+                await websocket.send_bytes(data)
+            else:
+                await websocket.send_text(data)
+        elif not outbox.put(data):
+            raise WebSocketDisconnect(code=1011)
+
+    async def send_with_screenshot(
+        self,
+        websocket: WebSocket,
+        message: dict,
+        image: Image.Image,
+        step_id: int,
+        fmt: EncodeFormat = PREVIEW,
+    ):
+        """
+        发送带截图的消息
+
+        协商了二进制帧的连接先收到 JSON 消息（payload.screenshotFrame 为帧的
+        消息 id），紧接着收到二进制截图帧；其他连接在 payload.screenshot 中
+        收到 base64 截图。
+
+        Args:
+            websocket: 客户端连接
+            message: 控制消息，截图字段会写入其 payload
+            image: 截图
+            step_id: 步骤 id，写入帧头
+            fmt: 截图编码格式
+        """
+        payload = message.setdefault("payload", {})
+        payload["screenshotFormat"] = fmt.name
+        if websocket in self.binary_clients:
+            data = await frame_encoder.encode_async(image, fmt)
+            msg_id = next(self._msg_ids)
+            payload["screenshotFrame"] = msg_id
+            await self.send(websocket, message)
+            await self.send_bytes(websocket, pack_frame(msg_id, step_id, fmt, image.size, data))
+        else:
+            payload["screenshot"] = await frame_encoder.encode_base64_async(image, fmt)
+            await self.send(websocket, message)
+
+    async def broadcast(self, message: dict, key: Optional[str] = None):
+        """
+        向所有连接广播消息
+
+        Args:
+            message: 消息
+            key: 合并键，慢客户端队列中尚未发送的同键消息被新消息替换，
+                 适用于携带完整状态的通知
+        """
+        data = dumps(message)
+        for outbox in list(self._outboxes.values()):
+            outbox.put(data, droppable=True, key=key)
 
 
 manager = ConnectionManager()
+live_view = LiveViewManager(frame_sources=device_manager)
+
+
+def _int_field(payload: dict, key: str) -> Optional[int]:
+    """读取客户端传入的整数字段，类型不对时返回 None"""
+    value = payload.get(key)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+async def _grab_screen(device: AsyncBaseDevice, frame_source: Optional[FrameSource]) -> Image.Image:
+    """优先从设备的持续帧源取当前画面，帧源不可用时直接截图"""
+    if frame_source and frame_source.is_running():
+        frame = await asyncio.to_thread(frame_source.fresh_frame, FRESH_FRAME_AGE)
+        if frame:
+            return frame.image
+    return await device.screenshot()
+
+
+async def _execute_instruction(
+    websocket: WebSocket,
+    instruction: str,
+    device: AsyncBaseDevice,
+    detector: ScreenStabilityDetector,
+    frame_source: Optional[FrameSource],
+):
+    """解析界面、决策并执行一条自然语言指令，画面优先取自设备的持续帧源"""
+    # 获取 UI 树并增量解析：属性未变的节点复用上一快照（含稳定检测采集的快照）中的元素
+    ui_tree = await device.get_ui_tree()
+    snapshot = await asyncio.to_thread(detector.differ.snapshot_tree, ui_tree)
+
+    # 决策执行策略，快照的结构哈希直接作为决策缓存的屏幕指纹
+    strategy, target = execution_agent.decide_strategy(
+        instruction, snapshot.elements(), snapshot.fingerprint or None
+    )
+
+    if strategy == ExecutionStrategy.UI_TREE and target:
+        # 直接执行
+        x, y = target["center"]
+        await manager.send(websocket, {
+            "type": "step_start",
+            "payload": {"stepId": 1, "action": "tap", "target": target.get("text", "")}
+        })
+
+        success = await device.tap(x, y)
+
+        # 等待 UI 稳定后截图
+        settle = await detector.wait()
+        img = settle.image or await _grab_screen(device, frame_source)
+
+        await manager.send_with_screenshot(websocket, {
+            "type": "step_done",
+            "payload": {
+                "stepId": 1,
+                "success": success,
+                "settleTime": round(settle.settle_time, 3)
+            }
+        }, img, step_id=1)
+
+        await manager.send(websocket, {
+            "type": "case_done",
+            "payload": {"result": "pass" if success else "fail"}
+        })
+    else:
+        # 使用视觉模型；多个候选时只在候选所在区域内识别
+        roi = None
+        if strategy == ExecutionStrategy.LLM_SELECT:
+            roi = execution_agent.candidate_region(target)
+        await manager.send(websocket, {
+            "type": "step_start",
+            "payload": {"stepId": 1, "action": "vision_detect", "target": instruction}
+        })
+
+        # 截图并使用视觉模型检测
+        screenshot = await _grab_screen(device, frame_source)
+        vision_result = await execution_agent.execute_vision_strategy_async(
+            instruction, screenshot, roi
+        )
+
+        if vision_result and vision_result.get("center"):
+            x, y = vision_result["center"]
+            success = await device.tap(x, y)
+
+            # 等待 UI 稳定后再次截图
+            settle = await detector.wait()
+            img = settle.image or await _grab_screen(device, frame_source)
+
+            await manager.send_with_screenshot(websocket, {
+                "type": "step_done",
+                "payload": {
+                    "stepId": 1,
+                    "success": success,
+                    "method": "vision",
+                    "bbox": vision_result.get("bbox"),
+                    "settleTime": round(settle.settle_time, 3)
+                }
+            }, img, step_id=1)
+
+            await manager.send(websocket, {
+                "type": "case_done",
+                "payload": {"result": "pass" if success else "fail"}
+            })
+        else:
+            await manager.send(websocket, {
+                "type": "error",
+                "payload": {"message": "视觉模型无法识别目标元素"}
+            })
 
 
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket 端点处理"""
     await manager.connect(websocket)
+    # 本连接上每台设备复用一个稳定检测器及其 UI 树增量对比器
+    detectors: dict[str, ScreenStabilityDetector] = {}
     try:
         while True:
             data = await websocket.receive_json()
+            if not isinstance(data, dict):
+                continue
             msg_type = data.get("type")
-            payload = data.get("payload", {})
+            payload = data.get("payload")
+            if not isinstance(payload, dict):
+                payload = {}
 
             if msg_type == "ping":
                 await manager.send(websocket, {"type": "pong"})
 
+            elif msg_type == "hello":
+                await manager.send(websocket, {
+                    "type": "hello",
+                    "payload": manager.negotiate(websocket, payload)
+                })
+
             elif msg_type == "execute":
                 instruction = payload.get("instruction", "")
                 device_serial = payload.get("device")
@@ -67,107 +306,78 @@ async def websocket_endpoint(websocket: WebSocket):
                     })
                     continue
 
-                device = device_manager.get_device(device_serial)
+                device = await device_manager.get_async_device(device_serial)
                 if not device:
                     await manager.send(websocket, {
                         "type": "error",
                         "payload": {"message": "设备连接失败"}
                     })
                     continue
-
-                # 获取 UI 树并解析
-                ui_tree = device.get_ui_tree()
-                device_type = device_manager._detect_device_type(device_serial)
-
-                if device_type == "android":
-                    ui_elements = ui_parser.parse_android(ui_tree.get("raw_xml", ""))
-                elif device_type == "harmony":
-                    ui_elements = ui_parser.parse_harmony(ui_tree)
-                else:
-                    ui_elements = []
-
-                # 决策执行策略
-                strategy, target = execution_agent.decide_strategy(instruction, ui_elements)
-
-                if strategy == ExecutionStrategy.UI_TREE and target:
-                    # 直接执行
-                    x, y = target["center"]
+                detector = detectors.get(device_serial)
+                if detector is None or detector.device is not device:
+                    detector = detectors[device_serial] = ScreenStabilityDetector(
+                        device, differ=UITreeDiffer(ui_parser)
+                    )
+
+                # 执行期间持有设备帧源，稳定检测和截图直接取帧，与实时画面共用采集
+                frame_source = device_manager.acquire_frame_source(device_serial)
+                detector.frame_source = frame_source
+                try:
+                    await _execute_instruction(
+                        websocket, instruction, device, detector, frame_source
+                    )
+                finally:
+                    if frame_source:
+                        await asyncio.to_thread(device_manager.release_frame_source, device_serial)
+
+            elif msg_type == "live_subscribe":
+                device_serial = payload.get("device")
+                options = {}
+                if payload.get("maxFps") is not None:
+                    try:
+                        options["max_fps"] = parse_max_fps(payload["maxFps"])
+                    except ValueError:
+                        await manager.send(websocket, {
+                            "type": "error",
+                            "payload": {"message": "maxFps 必须为正数"}
+                        })
+                        continue
+                device = None
+                if isinstance(device_serial, str) and device_serial:
+                    device = await device_manager.get_async_device(device_serial)
+                if not device:
                     await manager.send(websocket, {
-                        "type": "step_start",
-                        "payload": {"stepId": 1, "action": "tap", "target": target.get("text", "")}
+                        "type": "error",
+                        "payload": {"message": "设备连接失败"}
                     })
+                    continue
+                stream = live_view.subscribe(
+                    websocket, device_serial, device,
+                    send=lambda data, ws=websocket: manager.send_bytes(ws, data), **options
+                )
+                await manager.send(websocket, {
+                    "type": "live_subscribed",
+                    "payload": {"device": device_serial, "streamId": stream.stream_id}
+                })
 
-                    success = device.tap(x, y)
-                    await asyncio.sleep(0.5)
-
-                    # 截图
-                    img = device.screenshot()
-                    buffer = BytesIO()
-                    img.save(buffer, format="PNG")
-                    screenshot_b64 = base64.b64encode(buffer.getvalue()).decode()
+            elif msg_type == "live_ack":
+                stream = live_view.get(websocket, _int_field(payload, "streamId"))
+                seq = _int_field(payload, "seq")
+                if stream and seq is not None:
+                    stream.ack(seq)
 
-                    await manager.send(websocket, {
-                        "type": "step_done",
-                        "payload": {
-                            "stepId": 1,
-                            "success": success,
-                            "screenshot": screenshot_b64
-                        }
-                    })
+            elif msg_type == "live_keyframe":
+                stream = live_view.get(websocket, _int_field(payload, "streamId"))
+                if stream:
+                    stream.keyframe()
 
+            elif msg_type == "live_unsubscribe":
+                stream_id = _int_field(payload, "streamId")
+                if await live_view.unsubscribe(websocket, stream_id):
                     await manager.send(websocket, {
-                        "type": "case_done",
-                        "payload": {"result": "pass" if success else "fail"}
+                        "type": "live_unsubscribed",
+                        "payload": {"streamId": stream_id}
                     })
-                else:
-                    # 使用视觉模型
-                    if strategy == ExecutionStrategy.VISION:
-                        await manager.send(websocket, {
-                            "type": "step_start",
-                            "payload": {"stepId": 1, "action": "vision_detect", "target": instruction}
-                        })
-
-                        # 截图并使用视觉模型检测
-                        screenshot = device.screenshot()
-                        vision_result = execution_agent.execute_vision_strategy(instruction, screenshot)
-
-                        if vision_result and vision_result.get("center"):
-                            x, y = vision_result["center"]
-                            success = device.tap(x, y)
-                            await asyncio.sleep(0.5)
-
-                            # 再次截图
-                            img = device.screenshot()
-                            buffer = BytesIO()
-                            img.save(buffer, format="PNG")
-                            screenshot_b64 = base64.b64encode(buffer.getvalue()).decode()
-
-                            await manager.send(websocket, {
-                                "type": "step_done",
-                                "payload": {
-                                    "stepId": 1,
-                                    "success": success,
-                                    "screenshot": screenshot_b64,
-                                    "method": "vision",
-                                    "bbox": vision_result.get("bbox")
-                                }
-                            })
-
-                            await manager.send(websocket, {
-                                "type": "case_done",
-                                "payload": {"result": "pass" if success else "fail"}
-                            })
-                        else:
-                            await manager.send(websocket, {
-                                "type": "error",
-                                "payload": {"message": "视觉模型无法识别目标元素"}
-                            })
-                    else:
-                        # LLM_SELECT 策略暂不实现
-                        await manager.send(websocket, {
-                            "type": "error",
-                            "payload": {"message": "多个候选元素，需要 LLM 辅助选择（暂未实现）"}
-                        })
 
             elif msg_type == "stop":
                 await manager.send(websocket, {
@@ -176,4 +386,8 @@ async def websocket_endpoint(websocket: WebSocket):
                 })
 
     except WebSocketDisconnect:
+        pass
+    finally:
+        # 无论连接如何结束都释放其发送队列和实时画面订阅
         manager.disconnect(websocket)
+        await live_view.close(websocket)
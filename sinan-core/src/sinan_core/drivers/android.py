@@ -1,23 +1,62 @@
 """Android 设备驱动实现"""
 import subprocess
 import tempfile
+from io import BytesIO
 from pathlib import Path
+from typing import Optional
 from PIL import Image
 from .base import BaseDevice
+from .framebuffer import decode_framebuffer
+from .shell_session import ShellSession, ShellSessionPool
+
+# 每台设备共享一个常驻 adb shell 会话
+_shell_pool = ShellSessionPool(lambda serial: ShellSession(["adb", "-s", serial, "shell"]))
 
 
 class AndroidDevice(BaseDevice):
     """Android 设备驱动，基于 ADB 实现"""
 
-    def __init__(self, serial: str):
+    supports_raw_screenshot = True
+
+    def __init__(self, serial: str, use_shell_session: bool = True):
+        """
+        Args:
+            serial: 设备序列号
+            use_shell_session: 是否通过常驻 adb shell 会话执行 shell 命令
+        """
         self.serial = serial
+        self.use_shell_session = use_shell_session
         self._connected = False
+        # exec-out 截图是否可用，None 表示尚未探测
+        self._exec_out_supported: Optional[bool] = None
 
     def _adb(self, *args: str) -> subprocess.CompletedProcess:
         """执行 adb 命令"""
         cmd = ["adb", "-s", self.serial] + list(args)
         return subprocess.run(cmd, capture_output=True, text=True)
 
+    def _adb_bytes(self, *args: str) -> subprocess.CompletedProcess:
+        """执行 adb 命令，stdout 以原始字节返回"""
+        cmd = ["adb", "-s", self.serial] + list(args)
+        return subprocess.run(cmd, capture_output=True)
+
+    def _shell(self, *args: str) -> subprocess.CompletedProcess:
+        """执行设备 shell 命令，优先复用常驻会话"""
+        return self._shell_many([" ".join(args)])[0]
+
+    def _shell_many(self, commands: list[str]) -> list[subprocess.CompletedProcess]:
+        """流水线执行多条 shell 命令"""
+        if self.use_shell_session:
+            try:
+                return _shell_pool.get(self.serial).run_many(commands)
+            except (OSError, EOFError, subprocess.TimeoutExpired):
+                # 会话无法建立（如 adb 不可用）或已卡死，丢弃后回退到单次进程调用
+                _shell_pool.close(self.serial)
+            except ValueError:
+                # 含换行的命令无法按行分帧，会话本身仍可用，仅本次回退
+                pass
+        return [self._adb("shell", command) for command in commands]
+
     def connect(self) -> bool:
         """连接设备"""
         result = self._adb("get-state")
@@ -27,41 +66,100 @@ class AndroidDevice(BaseDevice):
     def disconnect(self) -> None:
         """断开连接"""
         self._connected = False
+        _shell_pool.close(self.serial)
 
     def tap(self, x: int, y: int) -> bool:
         """点击坐标"""
-        result = self._adb("shell", "input", "tap", str(x), str(y))
+        result = self._shell("input", "tap", str(x), str(y))
         return result.returncode == 0
 
     def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> bool:
         """滑动操作"""
-        result = self._adb("shell", "input", "swipe",
-                          str(x1), str(y1), str(x2), str(y2), str(duration_ms))
+        result = self._shell("input", "swipe",
+                             str(x1), str(y1), str(x2), str(y2), str(duration_ms))
         return result.returncode == 0
 
-    def screenshot(self) -> Image.Image:
-        """截取屏幕"""
+    def screenshot(self, raw: bool = False) -> Image.Image:
+        """截取屏幕，优先通过 exec-out 直接读取到内存
+
+        Args:
+            raw: 读取未压缩帧缓冲，省去设备端 PNG 编码
+        """
+        if raw:
+            img = self._screenshot_raw()
+            if img is not None:
+                return img
+
+        if self._exec_out_supported is not False:
+            img = self._screenshot_exec_out()
+            if img is not None:
+                self._exec_out_supported = True
+                return img
+        return self._screenshot_pull()
+
+    def _screenshot_exec_out(self) -> Optional[Image.Image]:
+        """通过 exec-out 从 stdout 读取 PNG，不落盘
+
+        仅当命令成功执行却没有返回有效 PNG 时才认定 exec-out 不可用，
+        命令本身失败（设备离线、adb 重启等）属于临时错误，下次仍会重试。
+        """
+        result = self._adb_bytes("exec-out", "screencap", "-p")
+        if result.returncode != 0:
+            return None
+        try:
+            if result.stdout:
+                return _decode_png(result.stdout)
+        except (OSError, SyntaxError):
+            # 旧版本 adb 可能对输出做换行转换导致 PNG 损坏
+            pass
+        self._exec_out_supported = False
+        return None
+
+    def _screenshot_raw(self) -> Optional[Image.Image]:
+        """通过 exec-out 读取原始帧缓冲并解码"""
+        result = self._adb_bytes("exec-out", "screencap")
+        if result.returncode != 0 or not result.stdout:
+            return None
+        try:
+            return decode_framebuffer(result.stdout)
+        except ValueError:
+            return None
+
+    def _screenshot_pull(self) -> Image.Image:
+        """截图到设备后 pull 到本地临时文件"""
         with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
             temp_path = f.name
 
         # 使用 pull 方式更可靠
-        self._adb("shell", "screencap", "-p", "/sdcard/screen.png")
+        self._shell("screencap", "-p", "/sdcard/screen.png")
         self._adb("pull", "/sdcard/screen.png", temp_path)
 
         img = Image.open(temp_path)
+        img.load()
         Path(temp_path).unlink()
         return img
 
     def get_ui_tree(self) -> dict:
         """获取 UI 树"""
-        self._adb("shell", "uiautomator", "dump", "/sdcard/ui.xml")
-        result = self._adb("shell", "cat", "/sdcard/ui.xml")
+        _, result = self._shell_many([
+            "uiautomator dump /sdcard/ui.xml",
+            "cat /sdcard/ui.xml",
+        ])
         # TODO: 解析 XML 为 dict
         return {"raw_xml": result.stdout}
 
     def input_text(self, text: str) -> bool:
         """输入文本"""
-        # 转义特殊字符
-        escaped = text.replace(" ", "%s").replace("'", "\\'")
-        result = self._adb("shell", "input", "text", escaped)
+        result = self._shell("input", "text", _escape_input_text(text))
         return result.returncode == 0
+
+
+def _escape_input_text(text: str) -> str:
+    """转义 input text 的特殊字符"""
+    return text.replace(" ", "%s").replace("'", "\\'")
+
+
+def _decode_png(data: bytes) -> Image.Image:
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
@@ -0,0 +1,118 @@
+"""异步设备驱动抽象基类
+
+FastAPI 路由、WebSocket 和执行引擎都运行在事件循环中，直接调用同步驱动
+会在每次截图、dump 期间冻结整个服务。AsyncBaseDevice 提供与 BaseDevice
+一一对应的异步接口；SyncDeviceAdapter 将现有同步驱动放入每台设备独立的
+有界线程池执行，一台设备响应慢不会拖住其他连接。
+"""
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from PIL import Image
+from .base import BaseDevice
+
+
+class AsyncBaseDevice(ABC):
+    """异步设备驱动抽象基类"""
+
+    # 是否支持 screenshot(raw=True) 读取未压缩帧缓冲
+    supports_raw_screenshot: bool = False
+
+    @abstractmethod
+    async def connect(self) -> bool:
+        """连接设备，返回是否成功"""
+        pass
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        """断开设备连接"""
+        pass
+
+    @abstractmethod
+    async def tap(self, x: int, y: int) -> bool:
+        """点击指定坐标"""
+        pass
+
+    @abstractmethod
+    async def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> bool:
+        """滑动操作"""
+        pass
+
+    @abstractmethod
+    async def screenshot(self) -> Image.Image:
+        """截取屏幕，返回 PIL Image"""
+        pass
+
+    @abstractmethod
+    async def get_ui_tree(self) -> dict:
+        """获取 UI 树结构"""
+        pass
+
+    @abstractmethod
+    async def input_text(self, text: str) -> bool:
+        """输入文本"""
+        pass
+
+
+class SyncDeviceAdapter(AsyncBaseDevice):
+    """将同步驱动包装为异步接口
+
+    默认每台设备一个单线程执行器：同一设备的命令按顺序执行，
+    不同设备之间互不阻塞，事件循环也不会被阻塞。
+    """
+
+    def __init__(self, device: BaseDevice, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Args:
+            device: 同步设备驱动
+            executor: 自定义执行器，默认创建单线程执行器
+        """
+        self.device = device
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"device-{getattr(device, 'serial', 'unknown')}",
+        )
+
+    @property
+    def supports_raw_screenshot(self) -> bool:
+        return self.device.supports_raw_screenshot
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def connect(self) -> bool:
+        return await self._call(self.device.connect)
+
+    async def disconnect(self) -> None:
+        await self._call(self.device.disconnect)
+
+    async def tap(self, x: int, y: int) -> bool:
+        return await self._call(self.device.tap, x, y)
+
+    async def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> bool:
+        return await self._call(self.device.swipe, x1, y1, x2, y2, duration_ms)
+
+    async def screenshot(self, raw: bool = False) -> Image.Image:
+        if raw:
+            return await self._call(self.device.screenshot, raw=True)
+        return await self._call(self.device.screenshot)
+
+    async def get_ui_tree(self) -> dict:
+        return await self._call(self.device.get_ui_tree)
+
+    async def input_text(self, text: str) -> bool:
+        return await self._call(self.device.input_text, text)
+
+    def close(self) -> None:
+        """关闭执行器"""
+        self._executor.shutdown(wait=False)
+
+
+def as_async_device(device: Union[BaseDevice, AsyncBaseDevice]) -> AsyncBaseDevice:
+    """返回设备的异步接口，同步驱动会被包装为 SyncDeviceAdapter"""
+    if isinstance(device, AsyncBaseDevice):
+        return device
+    return SyncDeviceAdapter(device)
@@ -6,6 +6,9 @@ from PIL import Image
 class BaseDevice(ABC):
     """设备驱动抽象基类，定义统一的设备操作接口"""
 
+    # 是否支持 screenshot(raw=True) 读取未压缩帧缓冲
+    supports_raw_screenshot: bool = False
+
     @abstractmethod
     def connect(self) -> bool:
         """连接设备，返回是否成功"""
@@ -0,0 +1,245 @@
+"""截图编码服务
+
+同一帧截图在一个步骤里会被多处编码（执行结果、WebSocket 推送、
+截图接口、视觉模型请求）。编码服务按「帧 + 格式」记忆编码结果，
+同一张图同一格式只压缩一次；并发请求同一编码时只有一个线程真正编码，
+其他调用方等待其结果。异步接口在专用线程池中编码，不阻塞事件循环。
+
+记忆以图像对象为单位，调用方不应在编码后原地修改图像。帧被回收后
+其记忆随之释放；记忆总量同时受帧数和字节数限制。
+"""
+import asyncio
+import base64
+import threading
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class EncodeFormat:
+    """编码格式与质量"""
+    format: str = "PNG"
+    quality: int = 85
+
+    @property
+    def mime(self) -> str:
+        return f"image/{self.format.lower()}"
+
+    @property
+    def name(self) -> str:
+        """前端使用的格式名：png / jpeg / webp"""
+        return self.format.lower()
+
+
+# 各使用方的默认格式
+PNG = EncodeFormat("PNG")
+# 预览截图：前端展示用，有损压缩体积约为 PNG 的几分之一
+PREVIEW = EncodeFormat("JPEG", quality=80)
+WEBP = EncodeFormat("WEBP", quality=80)
+
+# 各格式能直接保存的图像模式
+_SAVE_MODES = {
+    "JPEG": ("RGB", "L"),
+    "WEBP": ("RGB", "RGBA"),
+}
+
+
+class _Entry:
+    """一帧的记忆：帧的弱引用和各格式的编码结果"""
+
+    __slots__ = ("ref", "futures", "nbytes")
+
+    def __init__(self, ref: weakref.ref):
+        self.ref = ref
+        # (格式, 是否 base64) -> Future
+        self.futures: dict[tuple[EncodeFormat, bool], Future] = {}
+        self.nbytes = 0
+
+
+class FrameEncoder:
+    """带记忆的截图编码器"""
+
+    def __init__(self, max_frames: int = 32, max_bytes: int = 64 * 1024 * 1024, max_workers: int = 2):
+        """
+        Args:
+            max_frames: 最多记忆的帧数，超过时淘汰最久未用的帧
+            max_bytes: 记忆的编码结果总字节数上限，超过时淘汰最久未用的帧
+            max_workers: 异步编码线程池大小
+        """
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.encodes = 0
+        self.hits = 0
+        self.nbytes = 0
+        # id(帧) -> 记忆
+        self._memo: OrderedDict[int, _Entry] = OrderedDict()
+        # 回收回调未能立即清理的帧，下次访问时清理
+        self._dead: deque[tuple[int, weakref.ref]] = deque()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def encode(self, image: Image.Image, fmt: EncodeFormat = PNG) -> bytes:
+        """编码为指定格式的字节"""
+        return self._memoized(image, fmt, False)
+
+    def encode_base64(self, image: Image.Image, fmt: EncodeFormat = PNG) -> str:
+        """编码为 base64 字符串"""
+        return self._memoized(image, fmt, True)
+
+    def data_url(self, image: Image.Image, fmt: EncodeFormat = PNG) -> str:
+        """编码为 data URL"""
+        return f"data:{fmt.mime};base64,{self.encode_base64(image, fmt)}"
+
+    async def encode_async(self, image: Image.Image, fmt: EncodeFormat = PNG) -> bytes:
+        """在线程池中编码为字节"""
+        return await self._run_async(image, fmt, False)
+
+    async def encode_base64_async(self, image: Image.Image, fmt: EncodeFormat = PNG) -> str:
+        """在线程池中编码为 base64 字符串"""
+        return await self._run_async(image, fmt, True)
+
+    def shutdown(self):
+        """关闭线程池并清空记忆"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            self._memo.clear()
+            self._dead.clear()
+            self.nbytes = 0
+
+    async def _run_async(self, image: Image.Image, fmt: EncodeFormat, as_base64: bool):
+        done = self._peek(image, fmt, as_base64)
+        if done is not None:
+            return done
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="frame-encoder"
+                    )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._memoized, image, fmt, as_base64)
+
+    def _entry(self, image: Image.Image) -> _Entry:
+        """帧对应的记忆（调用方需持有锁）"""
+        self._purge()
+        key = id(image)
+        entry = self._memo.get(key)
+        # id 可能被已回收对象的新对象复用，需确认弱引用指向同一对象
+        if entry is None or entry.ref() is not image:
+            if entry is not None:
+                self._remove(key)
+            entry = _Entry(weakref.ref(image, lambda ref, key=key: self._on_collected(key, ref)))
+            self._memo[key] = entry
+            self._evict()
+        else:
+            self._memo.move_to_end(key)
+        return entry
+
+    def _on_collected(self, key: int, ref: weakref.ref):
+        """帧被回收：释放其记忆
+
+        回收可能发生在任意线程、包括持有锁的线程中，拿不到锁时
+        记下待清理，由下次访问清理。
+        """
+        if self._lock.acquire(blocking=False):
+            try:
+                self._drop(key, ref)
+            finally:
+                self._lock.release()
+        else:
+            self._dead.append((key, ref))
+
+    def _purge(self):
+        """清理回调中未能立即释放的帧（调用方需持有锁）"""
+        while self._dead:
+            self._drop(*self._dead.popleft())
+
+    def _drop(self, key: int, ref: weakref.ref):
+        entry = self._memo.get(key)
+        # 同一 id 可能已被新帧复用
+        if entry is not None and entry.ref is ref:
+            self._remove(key)
+
+    def _remove(self, key: int):
+        entry = self._memo.pop(key)
+        self.nbytes -= entry.nbytes
+
+    def _evict(self):
+        """按帧数和字节数上限淘汰最久未用的帧，至少保留最近的一帧（调用方需持有锁）"""
+        while len(self._memo) > 1 and (len(self._memo) > self.max_frames or self.nbytes > self.max_bytes):
+            self._remove(next(iter(self._memo)))
+
+    def _account(self, key: int, entry: _Entry, result):
+        """记入编码结果的大小（调用方需持有锁）"""
+        # 编码期间帧可能已被淘汰，此时结果不再占用记忆
+        if self._memo.get(key) is entry:
+            entry.nbytes += len(result)
+            self.nbytes += len(result)
+            self._evict()
+
+    def _peek(self, image: Image.Image, fmt: EncodeFormat, as_base64: bool):
+        """已完成的编码结果，没有时返回 None"""
+        with self._lock:
+            entry = self._memo.get(id(image))
+            if entry is None or entry.ref() is not image:
+                return None
+            future = entry.futures.get((fmt, as_base64))
+        if future is not None and future.done() and future.exception() is None:
+            self.hits += 1
+            return future.result()
+        return None
+
+    def _memoized(self, image: Image.Image, fmt: EncodeFormat, as_base64: bool):
+        key = (fmt, as_base64)
+        with self._lock:
+            entry = self._entry(image)
+            future = entry.futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                entry.futures[key] = future
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                if as_base64:
+                    result = base64.b64encode(self._memoized(image, fmt, False)).decode()
+                else:
+                    result = self._encode(image, fmt)
+                future.set_result(result)
+                with self._lock:
+                    self._account(id(image), entry, result)
+            except Exception as e:
+                future.set_exception(e)
+                # 失败的编码不记忆，下次重试
+                with self._lock:
+                    entry.futures.pop(key, None)
+        return future.result()
+
+    def _encode(self, image: Image.Image, fmt: EncodeFormat) -> bytes:
+        self.encodes += 1
+        modes = _SAVE_MODES.get(fmt.format)
+        if modes and image.mode not in modes:
+            image = image.convert("RGBA" if "A" in image.mode and "RGBA" in modes else "RGB")
+        buffer = BytesIO()
+        if fmt.format == "PNG":
+            image.save(buffer, format="PNG")
+        else:
+            image.save(buffer, format=fmt.format, quality=fmt.quality)
+        return buffer.getvalue()
+
+
+# 进程内共享的编码器
+frame_encoder = FrameEncoder()
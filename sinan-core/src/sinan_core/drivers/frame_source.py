@@ -0,0 +1,186 @@
+"""持续帧源
+
+为设备维护一个后台采集线程，将最新画面写入环形缓冲区，
+调用方通过 latest_frame() 即可拿到当前屏幕，无需再发起一次截图。
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import cycle
+from pathlib import Path
+from typing import Optional, Union
+from PIL import Image
+from .base import BaseDevice
+
+# 取「当前画面」时可直接复用的最大帧龄（秒），更旧的帧应等待下一帧
+FRESH_FRAME_AGE = 0.5
+
+
+@dataclass
+class Frame:
+    """一帧画面"""
+    image: Image.Image
+    seq: int
+    timestamp: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        """距采集时刻的秒数"""
+        return time.monotonic() - self.timestamp
+
+
+class FrameSource(ABC):
+    """帧源基类，子类只需实现 _next_frame 产出下一帧"""
+
+    def __init__(self, buffer_size: int = 4):
+        self._frames: deque[Frame] = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+
+    @abstractmethod
+    def _next_frame(self) -> Optional[Image.Image]:
+        """阻塞产出下一帧，暂时无帧时返回 None"""
+        pass
+
+    def start(self) -> None:
+        """启动后台采集线程"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """停止后台采集线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        """采集线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            image = self._next_frame()
+            if image is None:
+                continue
+            with self._cond:
+                self._seq += 1
+                self._frames.append(Frame(image=image, seq=self._seq))
+                self._cond.notify_all()
+
+    def latest_frame(self, max_age: Optional[float] = None) -> Optional[Frame]:
+        """
+        获取最新一帧
+
+        Args:
+            max_age: 允许的最大帧龄（秒），超过则视为过期返回 None
+        """
+        with self._cond:
+            if not self._frames:
+                return None
+            frame = self._frames[-1]
+        if max_age is not None and frame.age > max_age:
+            return None
+        return frame
+
+    def wait_for_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[Frame]:
+        """等待序号大于 after_seq 的新帧"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._frames and self._frames[-1].seq > after_seq,
+                timeout=timeout,
+            )
+            if self._frames and self._frames[-1].seq > after_seq:
+                return self._frames[-1]
+        return None
+
+
+    def fresh_frame(self, max_age: float, timeout: float = 1.0) -> Optional[Frame]:
+        """
+        获取帧龄不超过 max_age 的帧，当前帧已过期时等待下一帧
+
+        Args:
+            max_age: 允许的最大帧龄（秒）
+            timeout: 等待新帧的超时（秒）
+        """
+        frame = self.latest_frame()
+        if frame is not None and frame.age <= max_age:
+            return frame
+        return self.wait_for_frame(frame.seq if frame else 0, timeout)
+
+
+class CaptureFrameSource(FrameSource):
+    """基于设备截图的连续帧源
+
+    后台线程连续调用 screenshot()，支持时使用原始帧缓冲以降低单帧延迟。
+    """
+
+    def __init__(self, device: BaseDevice, interval: float = 0.0, buffer_size: int = 4):
+        """
+        Args:
+            device: 设备驱动
+            interval: 两次采集之间的间隔（秒）
+            buffer_size: 环形缓冲区大小
+        """
+        super().__init__(buffer_size)
+        self.device = device
+        self.interval = interval
+
+    def _next_frame(self) -> Optional[Image.Image]:
+        try:
+            if self.device.supports_raw_screenshot:
+                image = self.device.screenshot(raw=True)
+            else:
+                image = self.device.screenshot()
+        except Exception:
+            # 设备暂时不可用，稍后重试
+            self._stop_event.wait(0.5)
+            return None
+        if self.interval:
+            self._stop_event.wait(self.interval)
+        return image
+
+
+class FileFrameSource(FrameSource):
+    """基于本地图片文件的帧源，用于本地测试替代真实设备流"""
+
+    def __init__(
+        self,
+        source: Union[str, Path, list[Union[str, Path]]],
+        fps: float = 30.0,
+        loop: bool = True,
+        buffer_size: int = 4,
+    ):
+        """
+        Args:
+            source: 图片目录或图片路径列表
+            fps: 回放帧率
+            loop: 播放结束后是否循环
+            buffer_size: 环形缓冲区大小
+        """
+        super().__init__(buffer_size)
+        if isinstance(source, (str, Path)):
+            paths = sorted(p for p in Path(source).iterdir() if p.is_file())
+        else:
+            paths = [Path(p) for p in source]
+        if not paths:
+            raise ValueError("帧源没有可用的图片")
+
+        self._images = [Image.open(p).convert("RGB") for p in paths]
+        self._iter = cycle(self._images) if loop else iter(self._images)
+        self.fps = fps
+
+    def _next_frame(self) -> Optional[Image.Image]:
+        self._stop_event.wait(1 / self.fps)
+        image = next(self._iter, None)
+        if image is None:
+            # 非循环模式播放完毕
+            self._stop_event.set()
+        return image
@@ -0,0 +1,61 @@
+"""screencap 原始帧缓冲解码
+
+`screencap` 不带 `-p` 时输出未压缩的帧缓冲：
+    width(u32) height(u32) format(u32) [colorspace(u32)] + 像素数据
+Android 8 之后的版本多了 4 字节 colorspace 字段，通过总长度区分两种头部。
+"""
+import struct
+import numpy as np
+from PIL import Image
+
+# android.graphics.PixelFormat
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_RGB_565 = 4
+
+_BYTES_PER_PIXEL = {
+    PIXEL_FORMAT_RGBA_8888: 4,
+    PIXEL_FORMAT_RGBX_8888: 4,
+    PIXEL_FORMAT_RGB_565: 2,
+}
+
+
+def parse_header(data: bytes) -> tuple[int, int, int, int]:
+    """解析帧缓冲头部
+
+    Returns:
+        (宽, 高, 像素格式, 像素数据偏移)
+    """
+    if len(data) < 12:
+        raise ValueError("帧缓冲数据过短")
+
+    width, height, fmt = struct.unpack_from("<III", data, 0)
+    bpp = _BYTES_PER_PIXEL.get(fmt)
+    if bpp is None:
+        raise ValueError(f"不支持的像素格式: {fmt}")
+
+    pixels = width * height * bpp
+    for offset in (16, 12):
+        if len(data) - offset == pixels:
+            return width, height, fmt, offset
+    raise ValueError("帧缓冲长度与头部不符")
+
+
+def decode_framebuffer(data: bytes) -> Image.Image:
+    """将 screencap 原始输出解码为 PIL Image"""
+    width, height, fmt, offset = parse_header(data)
+
+    if fmt in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888):
+        # 零拷贝：Image 直接引用 numpy 视图所指向的缓冲区
+        pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * 4, offset=offset)
+        img = Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+        return img.convert("RGB") if fmt == PIXEL_FORMAT_RGBX_8888 else img
+
+    # RGB_565：小端 16 位，R5 G6 B5，扩展到 8 位
+    packed = np.frombuffer(data, dtype="<u2", count=width * height, offset=offset)
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    packed = packed.reshape(height, width)
+    rgb[..., 0] = ((packed >> 11) & 0x1F) * 255 // 31
+    rgb[..., 1] = ((packed >> 5) & 0x3F) * 255 // 63
+    rgb[..., 2] = (packed & 0x1F) * 255 // 31
+    return Image.fromarray(rgb)
@@ -5,13 +5,23 @@ import json
 from pathlib import Path
 from PIL import Image
 from .base import BaseDevice
+from .shell_session import ShellSession, ShellSessionPool
+
+# 每台设备共享一个常驻 hdc shell 会话
+_shell_pool = ShellSessionPool(lambda serial: ShellSession(["hdc", "-t", serial, "shell"]))
 
 
 class HarmonyDevice(BaseDevice):
     """鸿蒙设备驱动，基于 HDC 实现"""
 
-    def __init__(self, serial: str):
+    def __init__(self, serial: str, use_shell_session: bool = True):
+        """
+        Args:
+            serial: 设备序列号
+            use_shell_session: 是否通过常驻 hdc shell 会话执行 shell 命令
+        """
         self.serial = serial
+        self.use_shell_session = use_shell_session
         self._connected = False
 
     def _hdc(self, *args: str) -> subprocess.CompletedProcess:
@@ -19,6 +29,27 @@ class HarmonyDevice(BaseDevice):
         cmd = ["hdc", "-t", self.serial] + list(args)
         return subprocess.run(cmd, capture_output=True, text=True)
 
+    def _shell(self, *args: str) -> subprocess.CompletedProcess:
+        """执行设备 shell 命令，优先复用常驻会话"""
+        return self._shell_many([" ".join(args)])[0]
+
+    def _shell_many(self, commands: list[str]) -> list[subprocess.CompletedProcess]:
+        """流水线执行多条 shell 命令"""
+        if self.use_shell_session:
+            try:
+                return _shell_pool.get(self.serial).run_many(commands)
+            except (OSError, EOFError, subprocess.TimeoutExpired):
+                # 会话无法建立（如 hdc 不可用）或已卡死，丢弃后回退到单次进程调用
+                _shell_pool.close(self.serial)
+            except ValueError:
+                # 含换行的命令无法按行分帧，会话本身仍可用，仅本次回退
+                pass
+        return [self._hdc("shell", command) for command in commands]
+
+    def batch(self) -> "HarmonyActionBatch":
+        """创建批量操作，多个 uiInput 操作一次往返发送"""
+        return HarmonyActionBatch(self)
+
     def connect(self) -> bool:
         """连接设备"""
         result = self._hdc("shell", "echo", "ok")
@@ -28,18 +59,16 @@ class HarmonyDevice(BaseDevice):
     def disconnect(self) -> None:
         """断开连接"""
         self._connected = False
+        _shell_pool.close(self.serial)
 
     def tap(self, x: int, y: int) -> bool:
         """点击坐标 - 使用 uitest"""
-        result = self._hdc("shell", "uitest", "uiInput", "click", str(x), str(y))
+        result = self._shell(*_click_args(x, y))
         return result.returncode == 0
 
     def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> bool:
         """滑动操作"""
-        result = self._hdc(
-            "shell", "uitest", "uiInput", "swipe",
-            str(x1), str(y1), str(x2), str(y2), str(duration_ms)
-        )
+        result = self._shell(*_swipe_args(x1, y1, x2, y2, duration_ms))
         return result.returncode == 0
 
     def screenshot(self) -> Image.Image:
@@ -51,28 +80,24 @@ class HarmonyDevice(BaseDevice):
         remote_path = "/data/local/tmp/screen.jpeg"
 
         # 截图到设备
-        result1 = self._hdc("shell", "snapshot_display", "-f", remote_path)
+        result1 = self._shell("snapshot_display", "-f", remote_path)
         if result1.returncode != 0:
-            raise RuntimeError(f"截图失败: {result1.stderr}")
+            raise RuntimeError(f"截图失败: {_failure_detail(result1)}")
 
         # 传输到本地
         result2 = self._hdc("file", "recv", remote_path, temp_path)
         if result2.returncode != 0:
-            raise RuntimeError(f"传输截图失败: {result2.stderr}")
-
-        # 检查文件是否存在且有内容
-        if not Path(temp_path).exists() or Path(temp_path).stat().st_size == 0:
-            raise RuntimeError("截图文件为空或不存在")
+            raise RuntimeError(f"传输截图失败: {_failure_detail(result2)}")
 
-        img = Image.open(temp_path)
-        Path(temp_path).unlink()
-        return img
+        return _load_image(temp_path)
 
     def get_ui_tree(self) -> dict:
         """获取 UI 树 - 使用 uitest dumpLayout"""
         remote_path = "/data/local/tmp/layout.json"
-        self._hdc("shell", "uitest", "dumpLayout", "-p", remote_path)
-        result = self._hdc("shell", "cat", remote_path)
+        _, result = self._shell_many([
+            f"uitest dumpLayout -p {remote_path}",
+            f"cat {remote_path}",
+        ])
 
         try:
             return json.loads(result.stdout)
@@ -81,5 +106,72 @@ class HarmonyDevice(BaseDevice):
 
     def input_text(self, text: str) -> bool:
         """输入文本"""
-        result = self._hdc("shell", "uitest", "uiInput", "inputText", text)
+        result = self._shell(*_input_text_args(text))
         return result.returncode == 0
+
+
+def _failure_detail(result: subprocess.CompletedProcess) -> str:
+    """失败原因：会话执行的命令没有单独的 stderr，此时使用 stdout"""
+    output = (result.stderr or result.stdout or "").strip()
+    return f"{output} (退出码 {result.returncode})" if output else f"退出码 {result.returncode}"
+
+
+def _click_args(x: int, y: int) -> tuple[str, ...]:
+    return ("uitest", "uiInput", "click", str(x), str(y))
+
+
+def _swipe_args(x1: int, y1: int, x2: int, y2: int, duration_ms: int) -> tuple[str, ...]:
+    return ("uitest", "uiInput", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms))
+
+
+def _input_text_args(text: str) -> tuple[str, ...]:
+    return ("uitest", "uiInput", "inputText", text)
+
+
+def _load_image(path: str) -> Image.Image:
+    """读取本地图片并删除文件"""
+    if not Path(path).exists() or Path(path).stat().st_size == 0:
+        raise RuntimeError("截图文件为空或不存在")
+    img = Image.open(path)
+    img.load()
+    Path(path).unlink()
+    return img
+
+
+class HarmonyActionBatch:
+    """批量 uiInput 操作
+
+    用法::
+
+        results = device.batch().tap(100, 200).input_text("草莓").swipe(0, 800, 0, 200).execute()
+    """
+
+    def __init__(self, device: HarmonyDevice):
+        self._device = device
+        self._commands: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def tap(self, x: int, y: int) -> "HarmonyActionBatch":
+        """追加点击操作"""
+        self._commands.append(" ".join(_click_args(x, y)))
+        return self
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> "HarmonyActionBatch":
+        """追加滑动操作"""
+        self._commands.append(" ".join(_swipe_args(x1, y1, x2, y2, duration_ms)))
+        return self
+
+    def input_text(self, text: str) -> "HarmonyActionBatch":
+        """追加文本输入操作"""
+        self._commands.append(" ".join(_input_text_args(text)))
+        return self
+
+    def execute(self) -> list[bool]:
+        """一次往返执行全部操作，返回每个操作是否成功"""
+        if not self._commands:
+            return []
+        results = self._device._shell_many(self._commands)
+        self._commands = []
+        return [r.returncode == 0 for r in results]
@@ -1,49 +1,204 @@
 """设备管理器"""
+import asyncio
 import subprocess
-from typing import Optional
+import threading
+import time
+from typing import Iterable, Optional
+from .async_base import AsyncBaseDevice, SyncDeviceAdapter
 from .base import BaseDevice
+from .frame_source import CaptureFrameSource
 from .android import AndroidDevice
 from .harmony import HarmonyDevice
 
 
+def parse_adb_devices(output: str) -> list[str]:
+    """解析 `adb devices` / `adb track-devices` 输出中处于 device 状态的序列号"""
+    serials = []
+    for line in output.strip().split("\n"):
+        if "\tdevice" in line:
+            serials.append(line.split("\t")[0])
+    return serials
+
+
+def parse_hdc_targets(output: str) -> list[str]:
+    """解析 `hdc list targets` 输出"""
+    return [
+        line.strip() for line in output.strip().split("\n")
+        if line.strip() and not line.startswith("[")
+    ]
+
+
 class DeviceManager:
     """设备管理器，负责设备发现和管理"""
 
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 5.0, frame_interval: float = 0.1):
+        """
+        Args:
+            cache_ttl: 设备列表缓存有效期（秒）
+            frame_interval: 设备帧源两次采集之间的间隔（秒）
+        """
+        self.cache_ttl = cache_ttl
+        self.frame_interval = frame_interval
         self._devices: dict[str, BaseDevice] = {}
+        self._async_devices: dict[str, AsyncBaseDevice] = {}
+        # 设备序列号 -> [共享帧源, 引用数]
+        self._frame_sources: dict[str, list] = {}
+        # 设备注册表缓存：序列号 -> 设备类型
+        self._type_index: dict[str, str] = {}
+        self._cached_list: list[dict] = []
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
 
     def list_devices(self) -> list[dict]:
-        """列出所有可用设备"""
+        """扫描所有可用设备，并刷新注册表缓存"""
+        devices = self._scan_devices()
+        self.update_devices(devices)
+        return devices
+
+    def cached_devices(self) -> list[dict]:
+        """返回缓存的设备列表，缓存过期时重新扫描"""
+        if self._is_stale():
+            return self.list_devices()
+        with self._lock:
+            return list(self._cached_list)
+
+    def update_devices(self, devices: list[dict]) -> None:
+        """用最新的设备列表替换注册表缓存（供 DeviceMonitor 推送）"""
+        with self._lock:
+            self._cached_list = list(devices)
+            self._type_index = {d["serial"]: d["type"] for d in devices}
+            self._refreshed_at = time.monotonic()
+
+    def invalidate(self, serials: Optional[Iterable[str]] = None) -> None:
+        """
+        使缓存失效
+
+        已断开设备的驱动会被释放：关闭其常驻 shell 会话和异步适配器的线程池。
+        关闭会话可能等待设备上正在执行的命令，调用方不应在事件循环中直接调用。
+
+        Args:
+            serials: 已断开的设备序列号，为 None 时使整个注册表过期
+        """
+        released = []
+        sources = []
+        with self._lock:
+            if serials is None:
+                self._refreshed_at = None
+                return
+            for serial in serials:
+                self._type_index.pop(serial, None)
+                released.append((self._devices.pop(serial, None), self._async_devices.pop(serial, None)))
+                entry = self._frame_sources.pop(serial, None)
+                if entry:
+                    sources.append(entry[0])
+            self._cached_list = [
+                d for d in self._cached_list if d["serial"] in self._type_index
+            ]
+
+        for source in sources:
+            source.stop()
+        for device, async_device in released:
+            self._release(device, async_device)
+
+    def acquire_frame_source(self, serial: str) -> Optional[CaptureFrameSource]:
+        """
+        获取设备共享的持续帧源并增加引用，首个引用启动采集线程
+
+        执行、稳定检测和实时画面共用同一个帧源，同一台设备不会被重复截图。
+        用完必须调用 release_frame_source。
+
+        Args:
+            serial: 设备序列号，设备须已通过 get_device 连接
+
+        Returns:
+            已启动的帧源，设备未连接时返回 None
+        """
+        with self._lock:
+            device = self._devices.get(serial)
+            if device is None:
+                return None
+            entry = self._frame_sources.get(serial)
+            if entry is None:
+                entry = self._frame_sources[serial] = [
+                    CaptureFrameSource(device, interval=self.frame_interval), 0
+                ]
+            entry[1] += 1
+            entry[0].start()
+            return entry[0]
+
+    def release_frame_source(self, serial: str) -> None:
+        """
+        释放一次帧源引用，最后一个引用释放时停止采集线程
+
+        停止时会等待正在进行的截图，调用方不应在事件循环中直接调用。
+        """
+        with self._lock:
+            entry = self._frame_sources.get(serial)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._frame_sources[serial]
+        entry[0].stop()
+
+    def frame_source(self, serial: str) -> Optional[CaptureFrameSource]:
+        """返回设备正在运行的帧源，不增加引用；没有订阅方时返回 None"""
+        with self._lock:
+            entry = self._frame_sources.get(serial)
+        if entry is None or not entry[0].is_running():
+            return None
+        return entry[0]
+
+    @staticmethod
+    def _release(device: Optional[BaseDevice], async_device: Optional[AsyncBaseDevice]) -> None:
+        """断开驱动并关闭适配器"""
+        if device is None and isinstance(async_device, SyncDeviceAdapter):
+            device = async_device.device
+        if device is not None:
+            try:
+                device.disconnect()
+            except Exception:
+                # 设备已拔出，断开失败不影响释放
+                pass
+        if isinstance(async_device, SyncDeviceAdapter):
+            async_device.close()
+
+    def _is_stale(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at > self.cache_ttl
+        )
+
+    def _scan_devices(self) -> list[dict]:
+        """调用 adb / hdc 扫描设备"""
         devices = []
 
         # 检测 Android 设备
         try:
             result = subprocess.run(["adb", "devices"], capture_output=True, text=True)
-            for line in result.stdout.strip().split("\n")[1:]:
-                if "\tdevice" in line:
-                    serial = line.split("\t")[0]
-                    devices.append({"serial": serial, "type": "android"})
+            for serial in parse_adb_devices(result.stdout):
+                devices.append({"serial": serial, "type": "android"})
         except FileNotFoundError:
             pass
 
         # 检测鸿蒙设备
         try:
             result = subprocess.run(["hdc", "list", "targets"], capture_output=True, text=True)
-            for line in result.stdout.strip().split("\n"):
-                if line and not line.startswith("["):
-                    devices.append({"serial": line.strip(), "type": "harmony"})
+            for serial in parse_hdc_targets(result.stdout):
+                devices.append({"serial": serial, "type": "harmony"})
         except FileNotFoundError:
             pass
 
         return devices
 
     def _detect_device_type(self, serial: str) -> Optional[str]:
-        """检测设备类型"""
-        devices = self.list_devices()
-        for d in devices:
-            if d["serial"] == serial:
-                return d["type"]
-        return None
+        """检测设备类型，优先命中注册表索引，未命中且缓存过期时才重新扫描"""
+        device_type = self._type_index.get(serial)
+        if device_type is None and self._is_stale():
+            self.list_devices()
+            device_type = self._type_index.get(serial)
+        return device_type
 
     def get_device(self, serial: str) -> Optional[BaseDevice]:
         """获取设备实例"""
@@ -63,3 +218,22 @@ class DeviceManager:
             self._devices[serial] = device
             return device
         return None
+
+    async def get_async_device(self, serial: str) -> Optional[AsyncBaseDevice]:
+        """获取设备的异步接口，设备命令在每台设备独立的线程中执行"""
+        if serial in self._async_devices:
+            return self._async_devices[serial]
+
+        device = await asyncio.to_thread(self.get_device, serial)
+        if device is None:
+            return None
+
+        async_device = self._async_devices.get(serial)
+        if async_device is None:
+            async_device = SyncDeviceAdapter(device)
+            self._async_devices[serial] = async_device
+        return async_device
+
+
+# 进程内共享的设备管理器，API 路由、WebSocket 和设备监控共用同一份注册表
+device_manager = DeviceManager()
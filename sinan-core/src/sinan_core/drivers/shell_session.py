@@ -0,0 +1,204 @@
+"""常驻 shell 会话
+
+为 adb / hdc 维护一个长连接的 shell 进程，命令通过 stdin 流水线发送，
+每条命令结束后输出带序号的哨兵行（sentinel）来切分响应，避免每次操作都
+重新 fork/exec 并与设备握手。
+"""
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+
+class ShellSession:
+    """基于哨兵分帧的常驻 shell 会话
+
+    每条命令会被包装为
+    ``printf '%s%s-\\n' "<marker>" "<seq>"; <cmd> </dev/null; printf '%s%s:%d\\n' "<marker>" "<seq>" $?``，
+    起始哨兵之前的内容（如 PTY 回显的命令行）全部丢弃，之后读取到结束哨兵为止，
+    即可得到该命令的输出和退出码。哨兵由 printf 拼接而成，不会原样出现在命令中，
+    回显输入的 shell 也不会误判。
+    会话进程意外退出时会自动重连一次并重试。
+    """
+
+    def __init__(self, base_cmd: list[str], timeout: float = 30.0):
+        """
+        Args:
+            base_cmd: 启动 shell 的命令，例如 ["adb", "-s", serial, "shell"]
+            timeout: 等待单条命令响应的超时（秒），超时后关闭会话
+        """
+        self.base_cmd = list(base_cmd)
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        # 读线程逐行放入的 stdout，None 表示已读到 EOF
+        self._lines: Optional[queue.Queue] = None
+        self._marker = f"__SINAN_{uuid.uuid4().hex[:8]}__"
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def is_alive(self) -> bool:
+        """会话进程是否存活"""
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """启动 shell 进程"""
+        self._proc = subprocess.Popen(
+            self.base_cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # pipe 的 readline 无法设置超时，由读线程转发到队列
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self._proc.stdout, self._lines), daemon=True
+        ).start()
+
+    @staticmethod
+    def _pump(stdout, lines: queue.Queue) -> None:
+        try:
+            for line in iter(stdout.readline, b""):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            stdout.close()
+            lines.put(None)
+
+    def close(self) -> None:
+        """关闭 shell 进程"""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+        except OSError:
+            pass
+        if proc.poll() is None:
+            proc.kill()
+        # stdout 由读线程在读到 EOF 后关闭
+        proc.wait()
+
+    def run(self, command: str) -> subprocess.CompletedProcess:
+        """执行单条命令"""
+        return self.run_many([command])[0]
+
+    def run_many(self, commands: list[str]) -> list[subprocess.CompletedProcess]:
+        """流水线执行多条命令
+
+        所有命令一次性写入 stdin，再按顺序读取各自的响应，
+        只需一次往返即可完成多步操作。
+
+        Raises:
+            ValueError: 命令包含换行，会破坏按行分帧
+            subprocess.TimeoutExpired: 等待响应超时，会话已被关闭
+        """
+        for command in commands:
+            if "\n" in command or "\r" in command:
+                raise ValueError(f"命令不能包含换行: {command!r}")
+        with self._lock:
+            try:
+                return self._exchange(commands)
+            except (OSError, EOFError):
+                # 通道已断开，重连后重试一次
+                self._close()
+                return self._exchange(commands)
+
+    def _exchange(self, commands: list[str]) -> list[subprocess.CompletedProcess]:
+        if not self.is_alive():
+            self._close()
+            self.start()
+
+        seqs = []
+        payload = []
+        for command in commands:
+            self._seq += 1
+            seqs.append(self._seq)
+            tag = f"\"{self._marker}\" \"{self._seq}\""
+            payload.append(
+                f"printf '%s%s-\\n' {tag}; {command} </dev/null; printf '%s%s:%d\\n' {tag} $?\n"
+            )
+
+        self._proc.stdin.write("".join(payload).encode())
+        self._proc.stdin.flush()
+
+        try:
+            return [
+                self._read_response(command, seq)
+                for command, seq in zip(commands, seqs)
+            ]
+        except subprocess.TimeoutExpired:
+            # 剩余输出无法再与命令对应，丢弃整个会话
+            self._close()
+            raise
+
+    def _read_response(self, command: str, seq: int) -> subprocess.CompletedProcess:
+        """丢弃起始哨兵之前的回显，读取直到结束哨兵，返回该命令的输出"""
+        begin = f"{self._marker}{seq}-".encode()
+        sentinel = f"{self._marker}{seq}:".encode()
+        started = False
+        chunks = []
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command, self.timeout) from None
+            if line is None:
+                raise EOFError("shell 会话已断开")
+            if not started:
+                started = begin in line
+                continue
+            idx = line.find(sentinel)
+            if idx < 0:
+                chunks.append(line)
+                continue
+            # 命令输出末尾可能没有换行，哨兵会与其处于同一行
+            chunks.append(line[:idx])
+            code = line[idx + len(sentinel):].strip()
+            returncode = int(code) if code.lstrip(b"-").isdigit() else -1
+            stdout = b"".join(chunks).decode(errors="replace")
+            return subprocess.CompletedProcess(command, returncode, stdout=stdout, stderr="")
+
+
+class ShellSessionPool:
+    """按设备序列号复用 shell 会话
+
+    同一台设备在多个驱动实例之间共享同一个会话进程。
+    """
+
+    def __init__(self, factory: Callable[[str], ShellSession]):
+        self._factory = factory
+        self._sessions: dict[str, ShellSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, serial: str) -> ShellSession:
+        """获取（必要时创建）设备对应的会话"""
+        with self._lock:
+            session = self._sessions.get(serial)
+            if session is None:
+                session = self._factory(serial)
+                self._sessions[serial] = session
+            return session
+
+    def close(self, serial: str) -> None:
+        """关闭并移除设备会话"""
+        with self._lock:
+            session = self._sessions.pop(serial, None)
+        if session:
+            session.close()
+
+    def close_all(self) -> None:
+        """关闭全部会话"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
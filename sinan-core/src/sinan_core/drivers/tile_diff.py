@@ -0,0 +1,107 @@
+"""瓦片级画面差异
+
+把画面切成固定大小的瓦片，对每块像素计算 CRC32，与上一帧比较后只返回
+发生变化的区域。同一行相邻的变化瓦片合并为一个区域，减少小图编码
+开销；首帧、尺寸变化或变化面积过大时返回整帧（关键帧）。
+"""
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from PIL import Image
+
+
+@dataclass
+class TileDelta:
+    """一帧相对上一帧的变化"""
+    keyframe: bool
+    size: tuple[int, int]
+    # (x, y, 区域图像)
+    regions: list[tuple[int, int, Image.Image]] = field(default_factory=list)
+    changed: int = 0
+    total: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not self.regions
+
+
+class TileDiffer:
+    """基于瓦片哈希的帧差异计算"""
+
+    def __init__(self, tile_size: int = 128, keyframe_ratio: float = 0.6):
+        """
+        Args:
+            tile_size: 瓦片边长（像素）
+            keyframe_ratio: 变化瓦片占比超过该值时直接发送整帧
+        """
+        self.tile_size = tile_size
+        self.keyframe_ratio = keyframe_ratio
+        self._hashes: Optional[np.ndarray] = None
+        self._size: Optional[tuple[int, int]] = None
+
+    def reset(self):
+        """丢弃基准帧，下一帧作为关键帧"""
+        self._hashes = None
+        self._size = None
+
+    def diff(self, image: Image.Image) -> TileDelta:
+        """
+        计算相对上一帧的变化，并以本帧作为新的基准
+
+        Args:
+            image: 当前帧
+
+        Returns:
+            变化区域，无变化时 regions 为空
+        """
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        hashes = self._tile_hashes(np.asarray(image))
+        previous, size = self._hashes, self._size
+        self._hashes, self._size = hashes, image.size
+        total = hashes.size
+
+        if previous is None or size != image.size:
+            return TileDelta(True, image.size, [(0, 0, image)], total, total)
+
+        changed = hashes != previous
+        count = int(changed.sum())
+        if count > total * self.keyframe_ratio:
+            return TileDelta(True, image.size, [(0, 0, image)], count, total)
+
+        regions = []
+        t = self.tile_size
+        for row, col_start, col_end in _runs(changed):
+            box = (col_start * t, row * t, min(col_end * t, image.width), min((row + 1) * t, image.height))
+            regions.append((box[0], box[1], image.crop(box)))
+        return TileDelta(False, image.size, regions, count, total)
+
+    def _tile_hashes(self, pixels: np.ndarray) -> np.ndarray:
+        t = self.tile_size
+        height, width = pixels.shape[:2]
+        rows, cols = -(-height // t), -(-width // t)
+        # 补齐到瓦片整数倍后重排为 (行, 列, 瓦片像素)，每块瓦片内存连续，
+        # 整帧只拷贝一次，逐块 CRC 无需再切片拷贝
+        padded = np.zeros((rows * t, cols * t, 3), dtype=np.uint8)
+        padded[:height, :width] = pixels
+        tiles = np.ascontiguousarray(padded.reshape(rows, t, cols, t * 3).swapaxes(1, 2))
+        hashes = np.empty((rows, cols), dtype=np.uint32)
+        for r in range(rows):
+            for c in range(cols):
+                hashes[r, c] = zlib.crc32(tiles[r, c])
+        return hashes
+
+
+def _runs(mask: np.ndarray):
+    """逐行产出连续为 True 的列区间 (行, 起始列, 结束列)"""
+    for row, line in enumerate(mask):
+        start = None
+        for col, flag in enumerate(line):
+            if flag and start is None:
+                start = col
+            elif not flag and start is not None:
+                yield row, start, col
+                start = None
+        if start is not None:
+            yield row, start, len(line)
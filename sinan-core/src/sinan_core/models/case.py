@@ -29,6 +29,7 @@ class TestCase:
     steps: list[TestStep] = field(default_factory=list)
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     status: str = "pending"  # pending, running, passed, failed
+    device_type: Optional[str] = None  # android, harmony, None 表示不限
 
     def add_step(self, step: TestStep):
         """添加步骤"""
@@ -41,6 +42,7 @@ class TestCase:
             "steps": [s.to_dict() for s in self.steps],
             "created_at": self.created_at,
             "status": self.status,
+            "device_type": self.device_type,
         }
 
     def to_json(self) -> str:
@@ -57,6 +59,7 @@ class TestCase:
             steps=steps,
             created_at=data.get("created_at", datetime.now().isoformat()),
             status=data.get("status", "pending"),
+            device_type=data.get("device_type"),
         )
 
     @classmethod
@@ -1,8 +1,23 @@
 # sinan-core/src/sinan_core/vision/agent.py
 """VisionAgent - 视觉模型代理"""
+import asyncio
 import platform
-from typing import Optional
+from typing import Optional, Sequence
 from PIL import Image
+from .batching import MicroBatcher
+from .cache import VisionResultCache
+from .preprocess import ImagePreprocessor
+
+# MAI-UI 基于 Qwen3-VL：patch 大小（16）× 合并窗口（2）
+QWEN3_VL_FACTOR = 32
+
+# 各后端默认送入模型的像素预算：本地推理（MLX / transformers）算力和
+# 显存有限，预算较小；vLLM 服务端预算较大
+BACKEND_MAX_PIXELS = {
+    "mlx": 1024 * 1024,
+    "vllm": 1920 * 1080,
+    "transformers": 1024 * 1024,
+}
 
 
 class VisionAgent:
@@ -24,7 +39,13 @@ class VisionAgent:
         prefer_vllm: bool = True,
         vllm_url: str = "http://127.0.0.1:8001/v1",
         prefer_mlx: bool = True,
-        mlx_model: str = "mlx-community/MAI-UI-2B-bf16"
+        mlx_model: str = "mlx-community/MAI-UI-2B-bf16",
+        result_cache: Optional[VisionResultCache] = None,
+        enable_cache: bool = True,
+        max_batch: int = 8,
+        batch_window: float = 0.01,
+        max_pixels: Optional[int] = None,
+        preprocessor: Optional[ImagePreprocessor] = None
     ):
         """
         初始化 VisionAgent
@@ -34,6 +55,13 @@ class VisionAgent:
             vllm_url: vLLM 服务地址
             prefer_mlx: Mac Apple Silicon 上是否优先使用 MLX 后端
             mlx_model: MLX 模型名称
+            result_cache: 推理结果缓存，默认使用仅内存的缓存
+            enable_cache: 是否缓存推理结果
+            max_batch: 微批处理的最大批次大小
+            batch_window: 合并并发请求的等待窗口（秒），为 0 时不做批处理
+            max_pixels: 送入模型的最大像素数，超过时等比缩小；默认按所选后端取
+                BACKEND_MAX_PIXELS，为 0 时保持原尺寸
+            preprocessor: 自定义预处理器，提供时忽略 max_pixels
         """
         self.prefer_vllm = prefer_vllm
         self.vllm_url = vllm_url
@@ -41,6 +69,13 @@ class VisionAgent:
         self.mlx_model = mlx_model
         self._backend = None
         self._backend_name = None
+        self.cache = (result_cache or VisionResultCache()) if enable_cache else None
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._batcher: Optional[MicroBatcher] = None
+        # 未指定预算和预处理器时，初始化后按后端设置预算
+        self._auto_preprocess = preprocessor is None and max_pixels is None
+        self.preprocessor = preprocessor or ImagePreprocessor(max_pixels=max_pixels)
 
     @property
     def backend_name(self) -> Optional[str]:
@@ -67,8 +102,7 @@ class VisionAgent:
                 from .mlx_backend import MLXBackend
                 backend = MLXBackend(model_name=self.mlx_model)
                 if backend.initialize():
-                    self._backend = backend
-                    self._backend_name = "mlx"
+                    self._use_backend(backend, "mlx")
                     return True
             except ImportError:
                 pass
@@ -76,11 +110,10 @@ class VisionAgent:
         # 2. 尝试 vLLM 后端
         if self.prefer_vllm:
             try:
-                from .vllm_backend import VLLMBackend
-                backend = VLLMBackend(base_url=self.vllm_url)
+                from .vllm_backend import AsyncVLLMBackend
+                backend = AsyncVLLMBackend(base_url=self.vllm_url)
                 if backend.initialize():
-                    self._backend = backend
-                    self._backend_name = "vllm"
+                    self._use_backend(backend, "vllm")
                     return True
             except ImportError:
                 pass
@@ -90,14 +123,22 @@ class VisionAgent:
             from .transformers_backend import TransformersBackend
             backend = TransformersBackend()
             if backend.initialize():
-                self._backend = backend
-                self._backend_name = "transformers"
+                self._use_backend(backend, "transformers")
                 return True
         except ImportError:
             pass
 
         return False
 
+    def _use_backend(self, backend, name: str):
+        """启用后端，并按后端设置默认的像素预算"""
+        self._backend = backend
+        self._backend_name = name
+        if self._auto_preprocess:
+            self.preprocessor = ImagePreprocessor(
+                max_pixels=BACKEND_MAX_PIXELS.get(name), factor=QWEN3_VL_FACTOR
+            )
+
     def is_initialized(self) -> bool:
         """检查是否已初始化"""
         return self._backend is not None
@@ -105,7 +146,8 @@ class VisionAgent:
     def detect_element(
         self,
         image: Image.Image,
-        instruction: str
+        instruction: str,
+        roi: Optional[Sequence[int]] = None
     ) -> Optional[dict]:
         """
         检测元素位置
@@ -113,13 +155,141 @@ class VisionAgent:
         Args:
             image: PIL 图像对象
             instruction: 自然语言指令
+            roi: 可选的感兴趣区域 [x1, y1, x2, y2]，只把该区域送入模型
+
+        Returns:
+            包含 bbox 和 center 的字典（设备坐标），或 None
+        """
+        if not self._backend:
+            return None
+
+        key = self._cache_key(instruction, roi)
+        if self.cache is not None:
+            cached = self.cache.get(image, key)
+            if cached is not None:
+                return cached
+
+        prepared = self.preprocessor.prepare(image, roi)
+        if self.batch_window > 0:
+            # 与其他线程的并发请求合并为一个批次
+            result = self._get_batcher().submit(prepared.image, instruction).result()
+        else:
+            result = self._backend.detect_element(prepared.image, instruction)
+        result = prepared.to_device(result)
+        self._remember(image, key, result)
+        return result
+
+    async def detect_element_async(
+        self,
+        image: Image.Image,
+        instruction: str,
+        roi: Optional[Sequence[int]] = None
+    ) -> Optional[dict]:
+        """
+        异步检测元素位置
+
+        原生异步后端（vLLM）直接在事件循环中发送请求；其他后端的并发请求
+        会被合并为一个批次在线程中推理。
+
+        Args:
+            image: PIL 图像对象
+            instruction: 自然语言指令
+            roi: 可选的感兴趣区域 [x1, y1, x2, y2]，只把该区域送入模型
 
         Returns:
-            包含 bbox 和 center 的字典，或 None
+            包含 bbox 和 center 的字典（设备坐标），或 None
         """
         if not self._backend:
             return None
-        return self._backend.detect_element(image, instruction)
+
+        key = self._cache_key(instruction, roi)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, image, key)
+            if cached is not None:
+                return cached
+
+        prepared = await asyncio.to_thread(self.preprocessor.prepare, image, roi)
+        if hasattr(self._backend, "detect_element_async"):
+            # 原生异步后端，并发请求由服务端批处理
+            result = await self._backend.detect_element_async(prepared.image, instruction)
+        elif self.batch_window > 0:
+            result = await asyncio.wrap_future(self._get_batcher().submit(prepared.image, instruction))
+        else:
+            result = await asyncio.to_thread(self._backend.detect_element, prepared.image, instruction)
+        result = prepared.to_device(result)
+        await asyncio.to_thread(self._remember, image, key, result)
+        return result
+
+    def detect_elements_batch(
+        self,
+        requests: list[tuple[Image.Image, str]]
+    ) -> list[Optional[dict]]:
+        """
+        批量检测元素位置，命中缓存的请求不送入模型
+
+        Args:
+            requests: (图像, 指令) 列表
+
+        Returns:
+            与请求顺序一致的检测结果列表
+        """
+        if not self._backend:
+            return [None] * len(requests)
+
+        results: list[Optional[dict]] = [None] * len(requests)
+        pending = []
+        for i, (image, instruction) in enumerate(requests):
+            cached = self.cache.get(image, instruction) if self.cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        if pending:
+            prepared = [self.preprocessor.prepare(requests[i][0]) for i in pending]
+            batch_results = self._run_batch([
+                (p.image, requests[i][1]) for p, i in zip(prepared, pending)
+            ])
+            for p, i, result in zip(prepared, pending, batch_results):
+                results[i] = p.to_device(result)
+                self._remember(*requests[i], results[i])
+        return results
+
+    def close(self):
+        """停止微批处理线程"""
+        if self._batcher:
+            self._batcher.close()
+            self._batcher = None
+
+    async def aclose(self):
+        """停止微批处理线程并关闭异步后端的连接池"""
+        await asyncio.to_thread(self.close)
+        if hasattr(self._backend, "aclose"):
+            await self._backend.aclose()
+
+    def _get_batcher(self) -> MicroBatcher:
+        if self._batcher is None:
+            self._batcher = MicroBatcher(self._run_batch, self.max_batch, self.batch_window)
+        return self._batcher
+
+    def _run_batch(self, requests: list[tuple[Image.Image, str]]) -> list[Optional[dict]]:
+        """调用后端批量推理，后端不支持时逐个推理"""
+        batch_fn = getattr(self._backend, "detect_elements_batch", None)
+        if batch_fn is not None:
+            return batch_fn(requests)
+        return [self._backend.detect_element(image, instruction) for image, instruction in requests]
+
+    @staticmethod
+    def _cache_key(instruction: str, roi: Optional[Sequence[int]]) -> str:
+        """缓存键：不同的感兴趣区域分别缓存"""
+        if roi is None:
+            return instruction
+        return f"{instruction} @{[int(v) for v in roi]}"
+
+    def _remember(self, image: Image.Image, instruction: str, result: Optional[dict]):
+        """只缓存成功的结果，失败时下次仍调用模型"""
+        if result and self.cache is not None:
+            self.cache.put(image, instruction, result)
 
     def get_click_point(
         self,
@@ -0,0 +1,109 @@
+"""视觉推理微批处理
+
+多设备并行执行时，各设备的检测请求几乎同时到达。微批处理队列把
+一小段时间窗口内的并发请求合并为一个批次交给后端的
+detect_elements_batch，每个请求通过各自的 Future 单独返回结果。
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+from PIL import Image
+
+# 批处理函数：[(图像, 指令), ...] -> [结果, ...]，顺序与输入一致
+BatchFn = Callable[[list[tuple[Image.Image, str]]], list[Optional[dict]]]
+
+
+class MicroBatcher:
+    """收集并发请求并按批执行"""
+
+    def __init__(self, batch_fn: BatchFn, max_batch: int = 8, window: float = 0.01):
+        """
+        Args:
+            batch_fn: 批量推理函数
+            max_batch: 单个批次的最大请求数
+            window: 第一个请求到达后等待更多请求的时间（秒）
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.window = window
+        self.batches = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, image: Image.Image, instruction: str) -> Future:
+        """
+        提交一个检测请求
+
+        Returns:
+            结果为检测字典或 None 的 Future
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher 已关闭")
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((image, instruction, future))
+        return future
+
+    def close(self):
+        """停止后台线程，已提交的请求执行完毕后退出"""
+        self._closed = True
+        with self._lock:
+            thread = self._thread
+        if thread:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _collect(self, first) -> tuple[list, bool]:
+        """从第一个请求开始，在时间窗口内收集一个批次，返回 (批次, 是否收到关闭信号)"""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: list):
+        # 已被取消的请求不再送入模型
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self.batches += 1
+        try:
+            results = list(self.batch_fn([(image, instruction) for image, instruction, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"批处理返回 {len(results)} 个结果，期望 {len(batch)} 个")
+        except Exception as e:
+            # 异常必须传给每个请求，否则调用方会一直等待
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,206 @@
+"""视觉推理结果缓存
+
+一次 VLM 调用需要数秒，而用例经常在像素相同或几乎相同的屏幕上
+重复查找同一个元素。缓存以 (图像尺寸, 规范化指令) 分组，组内按截图的
+感知哈希（dHash）查找，汉明距离不超过容差即视为同一屏幕。
+
+分两级存储：
+- 内存：按条目数 LRU 淘汰
+- 磁盘（可选）：每条结果一个 JSON 文件，总大小超限时淘汰最久未访问的文件
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from PIL import Image
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = 16) -> int:
+    """
+    差值感知哈希（dHash）
+
+    Args:
+        image: PIL 图像对象
+        hash_size: 每行比较的像素数，哈希共 hash_size * hash_size 位
+
+    Returns:
+        哈希整数
+    """
+    thumb = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(thumb, dtype=np.int16)
+    bits = np.packbits((pixels[:, 1:] > pixels[:, :-1]).flatten())
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def normalize_instruction(instruction: str) -> str:
+    """规范化指令：全半角统一、小写、合并空白"""
+    text = unicodedata.normalize("NFKC", instruction).lower()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class VisionResultCache:
+    """视觉推理结果的两级缓存"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        tolerance: int = 4,
+        hash_size: int = 16,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 16 * 1024 * 1024,
+    ):
+        """
+        Args:
+            max_entries: 内存中最多缓存的结果数
+            tolerance: 视为同一屏幕的最大汉明距离（位）
+            hash_size: 感知哈希边长，哈希共 hash_size² 位
+            cache_dir: 磁盘缓存目录，为 None 时只使用内存
+            max_disk_bytes: 磁盘缓存总大小上限（字节）
+        """
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self.hash_size = hash_size
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        # (分组键, 哈希) -> 结果
+        self._memory: OrderedDict[tuple[str, int], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def stats(self) -> dict:
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def _group(self, image: Image.Image, instruction: str) -> str:
+        """分组键：坐标与图像尺寸相关，尺寸不同的截图不能共用结果"""
+        return f"{image.width}x{image.height}\x1f{normalize_instruction(instruction)}"
+
+    def _disk_prefix(self, group: str) -> str:
+        return hashlib.blake2b(group.encode(), digest_size=8).hexdigest()
+
+    def get(self, image: Image.Image, instruction: str) -> Optional[dict]:
+        """
+        查询缓存
+
+        Args:
+            image: 截图
+            instruction: 自然语言指令
+
+        Returns:
+            缓存的检测结果，未命中为 None
+        """
+        group = self._group(image, instruction)
+        phash = perceptual_hash(image, self.hash_size)
+
+        with self._lock:
+            key = self._lookup_memory(group, phash)
+            if key is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(self._memory[key])
+
+            result = self._lookup_disk(group, phash)
+            if result is not None:
+                self._remember(group, phash, result)
+                self.hits += 1
+                self.disk_hits += 1
+                return dict(result)
+
+            self.misses += 1
+            return None
+
+    def put(self, image: Image.Image, instruction: str, result: dict):
+        """写入检测结果，result 需可 JSON 序列化"""
+        group = self._group(image, instruction)
+        phash = perceptual_hash(image, self.hash_size)
+        with self._lock:
+            self._remember(group, phash, dict(result))
+            if self.cache_dir:
+                self._write_disk(group, phash, result)
+
+    def _lookup_memory(self, group: str, phash: int) -> Optional[tuple[str, int]]:
+        """内存中同组、汉明距离最小且不超过容差的条目"""
+        if (group, phash) in self._memory:
+            return (group, phash)
+        best, best_distance = None, self.tolerance + 1
+        for key in self._memory:
+            if key[0] == group:
+                distance = (key[1] ^ phash).bit_count()
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
+
+    def _remember(self, group: str, phash: int, result: dict):
+        self._memory[(group, phash)] = result
+        self._memory.move_to_end((group, phash))
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup_disk(self, group: str, phash: int) -> Optional[dict]:
+        """磁盘中同组、汉明距离不超过容差的结果，文件名为 <分组>_<哈希>.json"""
+        if not self.cache_dir:
+            return None
+        best, best_distance = None, self.tolerance + 1
+        for path in self.cache_dir.glob(f"{self._disk_prefix(group)}_*.json"):
+            try:
+                distance = (int(path.stem.split("_", 1)[1], 16) ^ phash).bit_count()
+            except ValueError:
+                continue
+            if distance < best_distance:
+                best, best_distance = path, distance
+        if best is None:
+            return None
+        try:
+            with open(best, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("group") != group:
+            return None
+        # 更新访问时间，供淘汰使用
+        os.utime(best)
+        return entry["result"]
+
+    def _write_disk(self, group: str, phash: int, result: dict):
+        path = self.cache_dir / f"{self._disk_prefix(group)}_{phash:x}.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"group": group, "result": result, "created": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """总大小超限时按最近访问时间淘汰"""
+        files = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
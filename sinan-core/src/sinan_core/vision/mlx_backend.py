@@ -99,6 +99,24 @@ class MLXBackend:
             traceback.print_exc()
             return None
 
+    def detect_elements_batch(
+        self,
+        requests: list[tuple[Image.Image, str]]
+    ) -> list[Optional[dict]]:
+        """
+        批量检测元素位置
+
+        mlx-vlm 的 generate 只支持单个样本，这里按顺序逐个推理，
+        保证与其他后端接口一致。
+
+        Args:
+            requests: (图像, 指令) 列表
+
+        Returns:
+            与请求顺序一致的检测结果列表
+        """
+        return [self.detect_element(image, instruction) for image, instruction in requests]
+
     def get_raw_response(self, image: Image.Image, instruction: str) -> Optional[str]:
         """获取原始模型响应（用于调试）"""
         if not self.model or not self.processor:
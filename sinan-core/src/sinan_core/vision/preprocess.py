@@ -0,0 +1,137 @@
+"""视觉模型输入预处理
+
+视觉 token 数与像素数成正比，把整张高分辨率截图送入模型既慢又没必要。
+预处理阶段：
+1. 可选地裁剪到感兴趣区域（如 UI 树给出的容器或上一次的 bbox）
+2. 等比缩小到像素预算以内，边长对齐到模型 patch 大小的整数倍
+3. 模型返回的 bbox / center 按缩放比例和裁剪偏移映射回设备坐标
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from PIL import Image
+
+# Qwen-VL 系列的 patch 大小（14）× 合并窗口（2）
+DEFAULT_FACTOR = 28
+
+
+@dataclass
+class PreparedImage:
+    """预处理后的图像及其到设备坐标的映射"""
+    image: Image.Image
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+    offset_x: int = 0
+    offset_y: int = 0
+
+    @property
+    def is_identity(self) -> bool:
+        """是否未做任何缩放和裁剪"""
+        return (self.scale_x, self.scale_y, self.offset_x, self.offset_y) == (1.0, 1.0, 0, 0)
+
+    def to_device_point(self, x: float, y: float) -> tuple[int, int]:
+        """模型坐标 -> 设备坐标"""
+        return (
+            round(x / self.scale_x) + self.offset_x,
+            round(y / self.scale_y) + self.offset_y,
+        )
+
+    def to_device(self, result: Optional[dict]) -> Optional[dict]:
+        """将检测结果中的 bbox 和 center 映射回设备坐标"""
+        if not result or self.is_identity:
+            return result
+        mapped = dict(result)
+        if result.get("bbox"):
+            x1, y1, x2, y2 = result["bbox"]
+            mapped["bbox"] = [*self.to_device_point(x1, y1), *self.to_device_point(x2, y2)]
+        if result.get("center"):
+            mapped["center"] = self.to_device_point(*result["center"])
+        return mapped
+
+
+def fit_size(
+    width: int,
+    height: int,
+    max_pixels: Optional[int],
+    factor: int = DEFAULT_FACTOR
+) -> tuple[int, int]:
+    """
+    计算不超过像素预算的目标尺寸，保持宽高比
+
+    Args:
+        width: 原始宽度
+        height: 原始高度
+        max_pixels: 像素预算，为 None 时不缩小
+        factor: 边长对齐的倍数，为 1 时不对齐
+
+    Returns:
+        (目标宽度, 目标高度)
+    """
+    if not max_pixels or width * height <= max_pixels:
+        return width, height
+    ratio = math.sqrt(max_pixels / (width * height))
+    # 向下对齐，保证对齐后仍在预算内
+    new_width = max(factor, math.floor(width * ratio / factor) * factor)
+    new_height = max(factor, math.floor(height * ratio / factor) * factor)
+    return new_width, new_height
+
+
+class ImagePreprocessor:
+    """视觉模型输入预处理器"""
+
+    def __init__(
+        self,
+        max_pixels: Optional[int] = None,
+        factor: int = DEFAULT_FACTOR,
+        roi_margin: int = 16
+    ):
+        """
+        Args:
+            max_pixels: 送入模型的最大像素数，为 None 时保持原尺寸
+            factor: 缩放后边长对齐的倍数
+            roi_margin: 裁剪感兴趣区域时向外扩展的边距（像素）
+        """
+        self.max_pixels = max_pixels
+        self.factor = factor
+        self.roi_margin = roi_margin
+
+    def prepare(
+        self,
+        image: Image.Image,
+        roi: Optional[Sequence[int]] = None
+    ) -> PreparedImage:
+        """
+        预处理截图
+
+        Args:
+            image: 设备截图
+            roi: 可选的感兴趣区域 [x1, y1, x2, y2]（设备坐标）
+
+        Returns:
+            预处理后的图像及坐标映射
+        """
+        offset_x = offset_y = 0
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            m = self.roi_margin
+            box = (
+                max(0, int(x1) - m), max(0, int(y1) - m),
+                min(image.width, int(x2) + m), min(image.height, int(y2) + m),
+            )
+            # 区域无效时退化为整张截图
+            if box[2] > box[0] and box[3] > box[1]:
+                image = image.crop(box)
+                offset_x, offset_y = box[0], box[1]
+
+        width, height = fit_size(image.width, image.height, self.max_pixels, self.factor)
+        if (width, height) == image.size:
+            return PreparedImage(image, offset_x=offset_x, offset_y=offset_y)
+
+        resized = image.resize((width, height), Image.Resampling.BICUBIC)
+        return PreparedImage(
+            resized,
+            scale_x=width / image.width,
+            scale_y=height / image.height,
+            offset_x=offset_x,
+            offset_y=offset_y,
+        )
@@ -24,6 +24,10 @@ class TransformersBackend:
                 self.model_name,
                 trust_remote_code=True
             )
+            # 批量生成需要左侧补齐，保证各序列的生成位置对齐
+            tokenizer = getattr(self.processor, "tokenizer", None)
+            if tokenizer is not None:
+                tokenizer.padding_side = "left"
 
             # 根据平台选择设备和精度
             if torch.cuda.is_available():
@@ -63,34 +67,48 @@ class TransformersBackend:
         Returns:
             包含 bbox 和 center 的字典，或 None
         """
-        if not self.model or not self.processor:
-            return None
+        return self.detect_elements_batch([(image, instruction)])[0]
 
-        # 构建提示词
-        prompt = f"""请找到屏幕上"{instruction}"的位置。
-返回 JSON 格式：{{"bbox_2d": [x1, y1, x2, y2]}}
-其中 (x1, y1) 是左上角坐标，(x2, y2) 是右下角坐标。
-只返回 JSON，不要其他内容。"""
+    def detect_elements_batch(
+        self,
+        requests: list[tuple[Image.Image, str]]
+    ) -> list[Optional[dict]]:
+        """
+        批量检测元素位置，所有请求左侧补齐后一次 generate
+
+        Args:
+            requests: (图像, 指令) 列表
+
+        Returns:
+            与请求顺序一致的检测结果列表
+        """
+        if not self.model or not self.processor or not requests:
+            return [None] * len(requests)
 
         try:
             # 构建消息
-            messages = [{
-                "role": "user",
-                "content": [
-                    {"type": "image", "image": image},
-                    {"type": "text", "text": prompt}
-                ]
-            }]
-
-            # 处理输入
-            text = self.processor.apply_chat_template(
-                messages,
-                tokenize=False,
-                add_generation_prompt=True
-            )
+            texts = []
+            images = []
+            for image, instruction in requests:
+                messages = [{
+                    "role": "user",
+                    "content": [
+                        {"type": "image", "image": image},
+                        {"type": "text", "text": self._build_prompt(instruction)}
+                    ]
+                }]
+                texts.append(self.processor.apply_chat_template(
+                    messages,
+                    tokenize=False,
+                    add_generation_prompt=True
+                ))
+                images.append(image)
+
+            # 处理输入，批内按最长序列补齐
             inputs = self.processor(
-                text=[text],
-                images=[image],
+                text=texts,
+                images=images,
+                padding=True,
                 return_tensors="pt"
             )
 
@@ -108,14 +126,24 @@ class TransformersBackend:
 
             # 解码
             generated_ids = outputs[:, inputs.input_ids.shape[1]:]
-            response = self.processor.batch_decode(
+            responses = self.processor.batch_decode(
                 generated_ids,
                 skip_special_tokens=True
-            )[0]
+            )
 
-            return self._parse_response(response)
+            return [self._parse_response(r) for r in responses]
         except Exception:
-            return None
+            if len(requests) == 1:
+                return [None]
+            # 批次失败（如显存不足）时逐个重试
+            return [self.detect_elements_batch([r])[0] for r in requests]
+
+    def _build_prompt(self, instruction: str) -> str:
+        """构建提示词"""
+        return f"""请找到屏幕上"{instruction}"的位置。
+返回 JSON 格式：{{"bbox_2d": [x1, y1, x2, y2]}}
+其中 (x1, y1) 是左上角坐标，(x2, y2) 是右下角坐标。
+只返回 JSON，不要其他内容。"""
 
     def _parse_response(self, content: str) -> Optional[dict]:
         """解析模型响应"""
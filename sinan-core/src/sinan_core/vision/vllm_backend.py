@@ -1,11 +1,13 @@
 # sinan-core/src/sinan_core/vision/vllm_backend.py
 """vLLM 后端 - 通过 OpenAI 兼容 API 调用 MAI-UI-8B"""
-import base64
+import asyncio
 import json
+import random
 import re
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from PIL import Image
+from ..drivers.frame_encoder import PNG, frame_encoder
 
 
 class VLLMBackend:
@@ -14,10 +16,18 @@ class VLLMBackend:
     def __init__(
         self,
         base_url: str = "http://127.0.0.1:8001/v1",
-        model_name: str = "MAI-UI-8B"
+        model_name: str = "MAI-UI-8B",
+        max_concurrency: int = 8
     ):
+        """
+        Args:
+            base_url: OpenAI 兼容 API 地址
+            model_name: 模型名称
+            max_concurrency: 批量检测时的最大并发请求数
+        """
         self.base_url = base_url
         self.model_name = model_name
+        self.max_concurrency = max_concurrency
         self.client = None
 
     def initialize(self) -> bool:
@@ -49,30 +59,10 @@ class VLLMBackend:
         if not self.client:
             return None
 
-        # 图片转 base64
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        img_b64 = base64.b64encode(buffer.getvalue()).decode()
-
-        # 构建提示词
-        prompt = f"""请找到屏幕上"{instruction}"的位置。
-返回 JSON 格式：{{"bbox_2d": [x1, y1, x2, y2]}}
-其中 (x1, y1) 是左上角坐标，(x2, y2) 是右下角坐标。
-只返回 JSON，不要其他内容。"""
-
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/png;base64,{img_b64}"}
-                        },
-                        {"type": "text", "text": prompt}
-                    ]
-                }],
+                messages=self._build_messages(image, instruction),
                 max_tokens=100,
                 temperature=0.1
             )
@@ -80,6 +70,50 @@ class VLLMBackend:
         except Exception:
             return None
 
+    def _build_messages(self, image: Image.Image, instruction: str) -> list[dict]:
+        """构建包含截图和提示词的对话消息"""
+        # 图片转 data URL，重试时复用同一次编码结果
+        image_url = frame_encoder.data_url(image, PNG)
+
+        # 构建提示词
+        prompt = f"""请找到屏幕上"{instruction}"的位置。
+返回 JSON 格式：{{"bbox_2d": [x1, y1, x2, y2]}}
+其中 (x1, y1) 是左上角坐标，(x2, y2) 是右下角坐标。
+只返回 JSON，不要其他内容。"""
+
+        return [{
+            "role": "user",
+            "content": [
+                {
+                    "type": "image_url",
+                    "image_url": {"url": image_url}
+                },
+                {"type": "text", "text": prompt}
+            ]
+        }]
+
+    def detect_elements_batch(
+        self,
+        requests: list[tuple[Image.Image, str]]
+    ) -> list[Optional[dict]]:
+        """
+        批量检测元素位置，并发发送请求，由 vLLM 服务端做连续批处理
+
+        Args:
+            requests: (图像, 指令) 列表
+
+        Returns:
+            与请求顺序一致的检测结果列表
+        """
+        if not self.client or not requests:
+            return [None] * len(requests)
+        if len(requests) == 1:
+            return [self.detect_element(*requests[0])]
+
+        workers = min(self.max_concurrency, len(requests))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda r: self.detect_element(*r), requests))
+
     def _parse_response(self, content: str) -> Optional[dict]:
         """解析模型响应"""
         if not content:
@@ -112,3 +146,160 @@ class VLLMBackend:
             "bbox": [x1, y1, x2, y2],
             "center": center
         }
+
+
+# 可重试的 HTTP 状态码：限流和服务端暂时不可用
+_RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class _RetryableError(Exception):
+    """可重试的服务端响应"""
+
+
+class AsyncVLLMBackend(VLLMBackend):
+    """异步 vLLM 后端
+
+    使用 httpx.AsyncClient 直接调用 OpenAI 兼容接口，连接池保持长连接；
+    信号量限制同时在途的请求数，超时和可重试错误按带抖动的指数退避重试。
+    同步接口继承自 VLLMBackend，仍可在线程中使用。
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8001/v1",
+        model_name: str = "MAI-UI-8B",
+        max_concurrency: int = 8,
+        max_in_flight: int = 4,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff: float = 0.5
+    ):
+        """
+        Args:
+            base_url: OpenAI 兼容 API 地址
+            model_name: 模型名称
+            max_concurrency: 同步批量检测时的最大并发请求数
+            max_in_flight: 异步接口同时在途的最大请求数
+            timeout: 单次请求超时（秒）
+            max_retries: 超时或可重试错误的最大重试次数
+            backoff: 退避基准时间（秒），第 n 次重试前等待 [0, backoff * 2^n) 内的随机时间
+        """
+        super().__init__(base_url=base_url, model_name=model_name, max_concurrency=max_concurrency)
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retries = 0
+        self._http = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ready = False
+
+    def initialize(self) -> bool:
+        """检查服务可用，同时尽量初始化同步客户端"""
+        try:
+            import httpx
+            response = httpx.get(f"{self.base_url.rstrip('/')}/models", timeout=self.timeout)
+            response.raise_for_status()
+        except Exception:
+            return False
+        self._ready = True
+        # 同步客户端依赖 openai，不可用时只提供异步接口
+        super().initialize()
+        return True
+
+    async def initialize_async(self) -> bool:
+        """异步检查服务可用"""
+        try:
+            response = await self._client().get("models")
+            response.raise_for_status()
+        except Exception:
+            return False
+        self._ready = True
+        return True
+
+    def _client(self):
+        """懒加载的连接池客户端和并发信号量"""
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url.rstrip("/") + "/",
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._http
+
+    async def aclose(self):
+        """关闭连接池"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._semaphore = None
+
+    async def detect_element_async(
+        self,
+        image: Image.Image,
+        instruction: str
+    ) -> Optional[dict]:
+        """
+        异步检测元素位置
+
+        Args:
+            image: PIL 图像对象
+            instruction: 自然语言指令，描述要找的元素
+
+        Returns:
+            包含 bbox 和 center 的字典，或 None
+        """
+        if not self._ready:
+            return None
+
+        # PNG 编码较慢，放到线程中避免阻塞事件循环
+        messages = await asyncio.to_thread(self._build_messages, image, instruction)
+        data = await self._post_chat({
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": 100,
+            "temperature": 0.1,
+        })
+        if not data:
+            return None
+        try:
+            return self._parse_response(data["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    async def detect_elements_batch_async(
+        self,
+        requests: list[tuple[Image.Image, str]]
+    ) -> list[Optional[dict]]:
+        """并发检测多个请求，在途数量受 max_in_flight 限制"""
+        return list(await asyncio.gather(
+            *(self.detect_element_async(image, instruction) for image, instruction in requests)
+        ))
+
+    async def _post_chat(self, payload: dict) -> Optional[dict]:
+        """发送 chat/completions 请求，失败时按带抖动的指数退避重试"""
+        import httpx
+        client = self._client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await client.post("chat/completions", json=payload)
+                if response.status_code in _RETRY_STATUS:
+                    raise _RetryableError(f"HTTP {response.status_code}")
+                response.raise_for_status()
+                return response.json()
+            except (httpx.TimeoutException, httpx.TransportError, _RetryableError):
+                if attempt == self.max_retries:
+                    return None
+            except (httpx.HTTPStatusError, ValueError):
+                # 4xx 等不可重试的错误
+                return None
+            self.retries += 1
+            # 全抖动退避，避免多个请求同时重试
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        return None
@@ -0,0 +1,50 @@
+"""异步设备驱动测试"""
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, patch
+from sinan_core.drivers.async_base import AsyncBaseDevice, SyncDeviceAdapter, as_async_device
+from sinan_core.drivers.manager import DeviceManager
+
+
+def test_async_base_device_is_abstract():
+    """AsyncBaseDevice 不能直接实例化"""
+    with pytest.raises(TypeError):
+        AsyncBaseDevice()
+
+
+def test_as_async_device_wraps_only_sync_drivers():
+    """同步驱动被包装为适配器，异步设备原样返回"""
+    sync_device = Mock()
+    adapter = as_async_device(sync_device)
+    try:
+        assert isinstance(adapter, SyncDeviceAdapter)
+        assert adapter.device is sync_device
+        assert as_async_device(adapter) is adapter
+    finally:
+        adapter.close()
+
+
+@pytest.mark.asyncio
+async def test_adapter_slow_device_does_not_block_others():
+    """一台设备阻塞时，其他设备和事件循环仍可响应"""
+    slow = Mock()
+    slow.tap.side_effect = lambda x, y: time.sleep(0.3) or True
+    fast = Mock()
+    fast.tap.return_value = True
+
+    slow_task = asyncio.create_task(SyncDeviceAdapter(slow).tap(1, 1))
+    start = time.perf_counter()
+    assert await SyncDeviceAdapter(fast).tap(2, 2) is True
+    assert time.perf_counter() - start < 0.2
+    assert await slow_task is True
+
+
+@pytest.mark.asyncio
+async def test_manager_get_async_device():
+    """DeviceManager 返回缓存的异步设备"""
+    manager = DeviceManager()
+    with patch.object(manager, "get_device", return_value=Mock()):
+        device = await manager.get_async_device("emulator-5554")
+        assert isinstance(device, SyncDeviceAdapter)
+        assert await manager.get_async_device("emulator-5554") is device
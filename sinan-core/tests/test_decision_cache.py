@@ -0,0 +1,105 @@
+"""策略决策缓存测试"""
+import asyncio
+from unittest.mock import Mock
+import pytest
+from PIL import Image, ImageDraw
+from sinan_core.agents.decision_cache import DecisionCache, elements_fingerprint
+from sinan_core.agents.executor import ExecutionAgent, ExecutionStrategy
+from sinan_core.agents.ui_parser import UITreeParser
+
+ELEMENTS = [
+    {"text": "设置", "center": [100, 50]},
+    {"text": "显示", "center": [100, 100]},
+]
+
+
+def _screen(offset: int = 0) -> Image.Image:
+    image = Image.new("RGB", (100, 200), "white")
+    ImageDraw.Draw(image).rectangle([10, 10 + offset, 60, 40 + offset], fill="black")
+    return image
+
+
+def test_lru_eviction():
+    """超过容量时淘汰最久未用的决策"""
+    cache = DecisionCache(max_entries=2)
+    cache.put("strategy", "a", "s", 1)
+    cache.put("strategy", "b", "s", 2)
+    assert cache.get("strategy", "a", "s") == 1
+    cache.put("strategy", "c", "s", 3)
+
+    assert cache.get("strategy", "b", "s") is None
+    assert cache.get("strategy", "a", "s") == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_persistence(tmp_path):
+    """写入只标记脏数据，flush 后新实例可加载"""
+    path = tmp_path / "decisions.json"
+    cache = DecisionCache(path=path)
+    cache.put("strategy", "点击设置", "abc", {"center": [1, 2]})
+    assert cache.dirty and not path.exists()
+
+    cache.flush()
+    assert not cache.dirty
+    assert DecisionCache(path=path).get("strategy", "点击设置", "abc") == {"center": [1, 2]}
+
+
+@pytest.mark.asyncio
+async def test_flusher_saves_in_background_and_on_cancel(tmp_path):
+    """后台定期保存，取消时保存最后的写入"""
+    path = tmp_path / "decisions.json"
+    cache = DecisionCache(path=path)
+    task = asyncio.create_task(cache.run_flusher(interval=0.01))
+    cache.put("strategy", "a", "s", 1)
+    await asyncio.sleep(0.1)
+    assert DecisionCache(path=path).get("strategy", "a", "s") == 1
+
+    cache.put("strategy", "b", "s", 2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert DecisionCache(path=path).get("strategy", "b", "s") == 2
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    """文件损坏时从空缓存开始"""
+    path = tmp_path / "decisions.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert len(DecisionCache(path=path)) == 0
+
+
+def test_fingerprints():
+    """结构哈希随元素属性和位置变化"""
+    store = UITreeParser().parse_android_store(
+        '<hierarchy><node text="设置" bounds="[0,0][100,50]"/></hierarchy>'
+    )
+    moved = UITreeParser().parse_android_store(
+        '<hierarchy><node text="设置" bounds="[0,10][100,60]"/></hierarchy>'
+    )
+    assert elements_fingerprint(store) != elements_fingerprint(moved)
+    assert elements_fingerprint(ELEMENTS) == elements_fingerprint([dict(e) for e in ELEMENTS])
+
+
+def test_decide_strategy_uses_cache():
+    """同一屏幕同一指令直接返回缓存的决策"""
+    agent = ExecutionAgent(decision_cache=DecisionCache())
+
+    first = agent.decide_strategy("点击设置", ELEMENTS)
+    agent.tokenizer = Mock(side_effect=AssertionError("不应重新分词"))
+    second = agent.decide_strategy("点击设置", ELEMENTS)
+
+    assert first == second == (ExecutionStrategy.UI_TREE, ELEMENTS[0])
+    assert agent.decision_cache.hits == 1
+
+
+def test_vision_results_use_vision_cache():
+    """视觉结果交给 VisionAgent 的结果缓存，不写入决策缓存"""
+    agent = ExecutionAgent(decision_cache=DecisionCache())
+    vision = Mock()
+    vision.is_initialized.return_value = True
+    vision.detect_element.return_value = {"bbox": [0, 0, 10, 10], "center": [5, 5]}
+    agent._vision_agent = vision
+
+    assert agent.execute_vision_strategy("点击图标", _screen())["center"] == [5, 5]
+    vision.detect_element.assert_called_once()
+    assert len(agent.decision_cache) == 0
@@ -1,6 +1,7 @@
 # sinan-core/tests/test_device_manager.py
 import pytest
 from unittest.mock import Mock, patch
+from PIL import Image
 from sinan_core.drivers.manager import DeviceManager
 
 
@@ -19,3 +20,74 @@ def test_device_manager_get_device():
         with patch('sinan_core.drivers.android.AndroidDevice.connect', return_value=True):
             device = manager.get_device("emulator-5554")
             assert device is not None
+
+
+def test_detect_device_type_uses_cached_index():
+    """缓存有效期内类型检测不再扫描设备"""
+    manager = DeviceManager(cache_ttl=60)
+    with patch.object(manager, '_scan_devices', return_value=[
+        {"serial": "emulator-5554", "type": "android"},
+        {"serial": "FMR0223C13000649", "type": "harmony"},
+    ]) as scan:
+        assert manager._detect_device_type("emulator-5554") == "android"
+        assert manager._detect_device_type("FMR0223C13000649") == "harmony"
+        assert manager._detect_device_type("unknown") is None
+        assert len(manager.cached_devices()) == 2
+        scan.assert_called_once()
+
+
+def test_invalidate_removes_disconnected_device():
+    """设备断开后从注册表和实例缓存中移除"""
+    manager = DeviceManager(cache_ttl=60)
+    manager.update_devices([{"serial": "emulator-5554", "type": "android"}])
+    with patch('sinan_core.drivers.android.AndroidDevice.connect', return_value=True):
+        assert manager.get_device("emulator-5554") is not None
+
+    manager.invalidate({"emulator-5554"})
+
+    assert "emulator-5554" not in manager._devices
+    assert manager.cached_devices() == []
+    with patch.object(manager, '_scan_devices', return_value=[]) as scan:
+        manager.invalidate()
+        assert manager._detect_device_type("emulator-5554") is None
+        scan.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_releases_disconnected_device():
+    """设备断开后断开驱动并关闭异步适配器"""
+    manager = DeviceManager()
+    manager.update_devices([{"serial": "emulator-5554", "type": "android"}])
+    device = Mock()
+    with patch.object(manager, "get_device", return_value=device):
+        adapter = await manager.get_async_device("emulator-5554")
+    manager._devices["emulator-5554"] = device
+
+    manager.invalidate({"emulator-5554"})
+
+    device.disconnect.assert_called_once()
+    assert adapter._executor._shutdown
+    assert "emulator-5554" not in manager._type_index
+    assert "emulator-5554" not in manager._async_devices
+
+
+def test_frame_source_is_shared_and_reference_counted():
+    """同一设备只有一个帧源，最后一个引用释放后停止采集"""
+    manager = DeviceManager()
+    device = Mock()
+    device.supports_raw_screenshot = False
+    device.screenshot.return_value = Image.new("RGB", (4, 4))
+    manager._devices["emulator-5554"] = device
+
+    assert manager.acquire_frame_source("unknown") is None
+    first = manager.acquire_frame_source("emulator-5554")
+    second = manager.acquire_frame_source("emulator-5554")
+    assert first is second and first.is_running()
+    assert first.wait_for_frame(timeout=1.0) is not None
+    assert manager.frame_source("emulator-5554") is first
+
+    manager.release_frame_source("emulator-5554")
+    assert first.is_running()
+    manager.release_frame_source("emulator-5554")
+    assert not first.is_running()
+    assert manager.frame_source("emulator-5554") is None
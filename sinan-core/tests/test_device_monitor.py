@@ -0,0 +1,66 @@
+"""设备监控测试，使用伪造的 adb 脚本代替 adb server"""
+import asyncio
+import stat
+import sys
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sinan_core.api.device_monitor import AdaptiveInterval, DeviceMonitor
+
+FAKE_ADB = '''#!{python}
+import sys, time
+
+def send(payload):
+    sys.stdout.write("%04x%s" % (len(payload), payload))
+    sys.stdout.flush()
+
+if sys.argv[1] == "track-devices":
+    send("emulator-5554\\tdevice\\n")
+    time.sleep(0.2)
+    send("emulator-5554\\tdevice\\nemulator-5556\\tdevice\\n")
+    time.sleep(0.2)
+    send("emulator-5556\\tdevice\\n")
+    time.sleep(30)
+'''
+
+
+@pytest.fixture
+def fake_adb(tmp_path):
+    path = tmp_path / "adb"
+    path.write_text(FAKE_ADB.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_adaptive_interval_backoff():
+    """无变化时退避，有变化时重置"""
+    interval = AdaptiveInterval(1.0, 4.0)
+    assert [interval.next(False) for _ in range(3)] == [2.0, 4.0, 4.0]
+    assert interval.next(True) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_monitor_streams_track_devices_events(fake_adb):
+    """track-devices 流中的变化立即转为连接/断开事件"""
+    device_manager = Mock()
+    device_manager.list_devices.return_value = []
+    ws_manager = Mock()
+    ws_manager.broadcast = AsyncMock()
+
+    monitor = DeviceMonitor(device_manager, ws_manager,
+                            adb_cmd=(fake_adb,), hdc_cmd=("nonexistent-hdc",))
+    task = asyncio.create_task(monitor.start())
+    try:
+        for _ in range(50):
+            if ws_manager.broadcast.await_count >= 3:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    events = [call.args[0]["payload"] for call in ws_manager.broadcast.await_args_list]
+    assert events[0]["connected"] == ["emulator-5554"]
+    assert events[1]["connected"] == ["emulator-5556"]
+    assert events[2]["disconnected"] == ["emulator-5554"]
+    device_manager.invalidate.assert_called_with({"emulator-5554"})
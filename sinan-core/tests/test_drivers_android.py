@@ -1,5 +1,8 @@
 # sinan-core/tests/test_drivers_android.py
+import subprocess
 import pytest
+from io import BytesIO
+from PIL import Image
 from unittest.mock import Mock, patch
 from sinan_core.drivers.android import AndroidDevice
 from sinan_core.drivers.base import BaseDevice
@@ -25,3 +28,56 @@ def test_android_device_connect(mock_run):
     result = device.connect()
 
     assert result is True
+
+
+def _png_bytes(size=(4, 8)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@patch('subprocess.run')
+def test_android_screenshot_exec_out(mock_run):
+    """exec-out 截图直接从 stdout 解码"""
+    mock_run.return_value = Mock(returncode=0, stdout=_png_bytes())
+
+    device = AndroidDevice(serial="emulator-5554")
+    img = device.screenshot()
+
+    assert img.size == (4, 8)
+    cmd = mock_run.call_args[0][0]
+    assert cmd[-3:] == ["exec-out", "screencap", "-p"]
+
+
+def test_android_screenshot_falls_back_to_pull():
+    """exec-out 成功执行但输出不是 PNG 时回退到 pull 方式，并记住探测结果"""
+    device = AndroidDevice(serial="emulator-5554")
+    fallback = Image.new("RGB", (2, 2))
+    with patch.object(device, "_adb_bytes", return_value=Mock(returncode=0, stdout=b"\x89PNG\r\r\n")) as exec_out, \
+            patch.object(device, "_screenshot_pull", return_value=fallback):
+        assert device.screenshot() is fallback
+        assert device.screenshot() is fallback
+        exec_out.assert_called_once()
+
+
+def test_android_screenshot_retries_exec_out_after_transient_failure():
+    """exec-out 命令本身失败属于临时错误，不会永久禁用 exec-out"""
+    device = AndroidDevice(serial="emulator-5554")
+    fallback = Image.new("RGB", (2, 2))
+    results = [Mock(returncode=1, stdout=b""), Mock(returncode=0, stdout=_png_bytes())]
+    with patch.object(device, "_adb_bytes", side_effect=results), \
+            patch.object(device, "_screenshot_pull", return_value=fallback):
+        assert device.screenshot() is fallback
+        assert device.screenshot().size == (4, 8)
+    assert device._exec_out_supported is True
+
+
+def test_shell_timeout_drops_session_and_falls_back():
+    """会话超时后被丢弃，命令回退到单次 adb 调用"""
+    device = AndroidDevice(serial="emulator-5554")
+    with patch("sinan_core.drivers.android._shell_pool") as pool, \
+            patch.object(device, "_adb", return_value=Mock(returncode=0, stdout="ok")) as adb:
+        pool.get.return_value.run_many.side_effect = subprocess.TimeoutExpired("cat", 30)
+        assert device._shell("echo", "ok").stdout == "ok"
+        pool.close.assert_called_once_with("emulator-5554")
+        adb.assert_called_once_with("shell", "echo ok")
@@ -1,4 +1,5 @@
 # sinan-core/tests/test_drivers_harmony.py
+import subprocess
 import pytest
 from unittest.mock import Mock, patch
 from sinan_core.drivers.harmony import HarmonyDevice
@@ -22,3 +23,44 @@ def test_harmony_device_connect(mock_run):
     result = device.connect()
 
     assert result is True
+
+
+def _completed(*codes):
+    return [subprocess.CompletedProcess("", code, "", "") for code in codes]
+
+
+def test_harmony_tap_uses_shell_session():
+    """tap 通过常驻 hdc shell 会话执行"""
+    session = Mock()
+    session.run_many.return_value = _completed(0)
+    device = HarmonyDevice(serial="FMR0223C13000649")
+    with patch("sinan_core.drivers.harmony._shell_pool") as pool:
+        pool.get.return_value = session
+        assert device.tap(100, 200) is True
+    session.run_many.assert_called_once_with(["uitest uiInput click 100 200"])
+
+
+def test_harmony_batch_sends_actions_in_one_round_trip():
+    """批量操作一次发送全部 uiInput 命令"""
+    session = Mock()
+    session.run_many.return_value = _completed(0, 0, 1)
+    device = HarmonyDevice(serial="FMR0223C13000649")
+    with patch("sinan_core.drivers.harmony._shell_pool") as pool:
+        pool.get.return_value = session
+        results = device.batch().tap(1, 2).input_text("草莓").swipe(0, 800, 0, 200).execute()
+
+    assert results == [True, True, False]
+    session.run_many.assert_called_once_with([
+        "uitest uiInput click 1 2",
+        "uitest uiInput inputText 草莓",
+        "uitest uiInput swipe 0 800 0 200 300",
+    ])
+
+
+def test_screenshot_failure_reports_session_output():
+    """会话命令失败时错误信息包含 stdout 和退出码"""
+    device = HarmonyDevice(serial="test123")
+    failed = subprocess.CompletedProcess("snapshot_display", 1, "Error: display not found\n", "")
+    with patch.object(device, "_shell_many", return_value=[failed]):
+        with pytest.raises(RuntimeError, match="display not found.*退出码 1"):
+            device.screenshot()
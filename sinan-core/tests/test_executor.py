@@ -1,6 +1,8 @@
 # sinan-core/tests/test_executor.py
 """执行决策 Agent 测试"""
+from unittest.mock import Mock
 import pytest
+from PIL import Image
 from sinan_core.agents.executor import ExecutionAgent, ExecutionStrategy
 
 
@@ -45,3 +47,50 @@ def test_decide_strategy_llm_select():
     assert strategy == ExecutionStrategy.LLM_SELECT
     assert isinstance(target, list)
     assert len(target) == 3
+
+
+def test_fuzzy_match_does_not_auto_tap():
+    """编辑距离相近的元素不能直接点击：「退出」不能点到「退款」"""
+    agent = ExecutionAgent()
+    ui_elements = [{"text": "退款", "center": [100, 50]}]
+
+    strategy, target = agent.decide_strategy("点击退出", ui_elements)
+
+    assert strategy == ExecutionStrategy.VISION
+    assert target is None
+
+
+def test_clear_winner_is_tapped():
+    """唯一的完全相同匹配明显领先其余子串匹配时直接点击"""
+    agent = ExecutionAgent()
+    ui_elements = [
+        {"text": "高级设置", "center": [100, 50]},
+        {"text": "设置", "center": [100, 100]},
+        {"text": "通知设置", "center": [100, 150]},
+    ]
+
+    strategy, target = agent.decide_strategy("点击设置", ui_elements)
+
+    assert strategy == ExecutionStrategy.UI_TREE
+    assert target["text"] == "设置"
+
+
+def test_vision_uses_candidate_region_with_fallback():
+    """多个候选时视觉模型只看候选所在区域，区域内未识别到时检测整屏"""
+    candidates = [
+        {"text": "设置", "bounds": [0, 100, 200, 150]},
+        {"text": "高级设置", "bounds": [0, 300, 400, 350]},
+    ]
+    roi = ExecutionAgent.candidate_region(candidates)
+    assert roi == [0, 100, 400, 350]
+    assert ExecutionAgent.candidate_region([{"text": "无边界"}]) is None
+
+    agent = ExecutionAgent()
+    vision = Mock()
+    vision.is_initialized.return_value = True
+    vision.detect_element.side_effect = [None, {"bbox": [0, 0, 10, 10], "center": [5, 5]}]
+    agent._vision_agent = vision
+    screenshot = Image.new("RGB", (500, 500))
+
+    assert agent.execute_vision_strategy("点击设置", screenshot, roi)["center"] == [5, 5]
+    assert [c.args[2:] for c in vision.detect_element.call_args_list] == [(roi,), ()]
@@ -0,0 +1,123 @@
+"""截图编码服务测试"""
+import base64
+import gc
+import threading
+import time
+from io import BytesIO
+import pytest
+from PIL import Image
+from sinan_core.drivers.frame_encoder import PNG, PREVIEW, WEBP, FrameEncoder
+
+
+def _frame(color="red", mode="RGB") -> Image.Image:
+    return Image.new(mode, (64, 128), color)
+
+
+def test_same_frame_encoded_once():
+    """同一帧同一格式只编码一次，base64 复用字节编码"""
+    encoder = FrameEncoder()
+    frame = _frame()
+
+    data = encoder.encode(frame, PNG)
+    assert encoder.encode(frame, PNG) is data
+    assert base64.b64decode(encoder.encode_base64(frame, PNG)) == data
+    assert encoder.encodes == 1
+
+
+def test_formats_are_memoized_separately():
+    """不同格式分别编码，且输出为对应格式"""
+    encoder = FrameEncoder()
+    frame = _frame(mode="RGBA")
+
+    for fmt, expected in ((PNG, "PNG"), (PREVIEW, "JPEG"), (WEBP, "WEBP")):
+        assert Image.open(BytesIO(encoder.encode(frame, fmt))).format == expected
+    assert encoder.encodes == 3
+    assert encoder.data_url(frame, PREVIEW).startswith("data:image/jpeg;base64,")
+
+
+def test_new_frame_is_encoded_again():
+    """新截到的帧即使内容相同也重新编码"""
+    encoder = FrameEncoder()
+    encoder.encode(_frame(), PNG)
+    encoder.encode(_frame(), PNG)
+    assert encoder.encodes == 2
+
+
+def test_memo_evicts_old_frames():
+    """超过帧数上限时淘汰最久未用的帧"""
+    encoder = FrameEncoder(max_frames=2)
+    frames = [_frame() for _ in range(3)]
+    for frame in frames:
+        encoder.encode(frame, PNG)
+
+    encoder.encode(frames[0], PNG)
+    assert encoder.encodes == 4
+
+
+def test_collected_frame_releases_memo():
+    """帧被回收后立即释放其编码结果"""
+    encoder = FrameEncoder()
+    frame = _frame()
+    encoder.encode(frame, PNG)
+    assert len(encoder) == 1 and encoder.nbytes > 0
+
+    del frame
+    gc.collect()
+    assert len(encoder) == 0 and encoder.nbytes == 0
+
+
+def test_memo_is_capped_by_bytes():
+    """编码结果总字节数超过上限时淘汰最久未用的帧"""
+    frames = [Image.effect_noise((128, 128), 64) for _ in range(3)]
+    size = len(FrameEncoder().encode(frames[0], PNG))
+    encoder = FrameEncoder(max_bytes=int(size * 2.5))
+    for frame in frames:
+        encoder.encode(frame, PNG)
+
+    assert len(encoder) == 2
+    assert encoder.nbytes <= encoder.max_bytes
+    encoder.encode(frames[0], PNG)
+    assert encoder.encodes == 4
+
+
+def test_concurrent_callers_share_one_encode():
+    """并发请求同一编码时只编码一次"""
+    encoder = FrameEncoder()
+    original = encoder._encode
+
+    def slow_encode(image, fmt):
+        time.sleep(0.05)
+        return original(image, fmt)
+
+    encoder._encode = slow_encode
+    frame = _frame()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(encoder.encode(frame, PNG))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(r) for r in results}) == 1
+    assert encoder.encodes == 1
+
+
+@pytest.mark.asyncio
+async def test_async_encode_runs_in_thread_pool():
+    """异步编码在线程池中执行，结果与同步接口共享"""
+    encoder = FrameEncoder()
+    frame = _frame()
+    seen = []
+    original = encoder._encode
+
+    def record_thread(image, fmt):
+        seen.append(threading.current_thread().name)
+        return original(image, fmt)
+
+    encoder._encode = record_thread
+    data = await encoder.encode_base64_async(frame, PREVIEW)
+
+    assert seen and seen[0].startswith("frame-encoder")
+    assert encoder.encode_base64(frame, PREVIEW) == data
+    assert encoder.encodes == 1
+    encoder.shutdown()
@@ -0,0 +1,75 @@
+"""持续帧源测试"""
+import pytest
+from unittest.mock import Mock
+from PIL import Image
+from sinan_core.drivers.frame_source import CaptureFrameSource, FileFrameSource
+from sinan_core.agents.runner import CaseRunner
+from sinan_core.models.case import TestStep
+
+
+@pytest.fixture
+def frame_dir(tmp_path):
+    for i, color in enumerate(["red", "green", "blue"]):
+        Image.new("RGB", (8, 16), color).save(tmp_path / f"{i:03d}.png")
+    return tmp_path
+
+
+def test_file_frame_source_latest_frame_is_fresh(frame_dir):
+    """文件帧源持续产出新帧，latest_frame 满足 100ms 新鲜度"""
+    source = FileFrameSource(frame_dir, fps=60)
+    source.start()
+    try:
+        first = source.wait_for_frame(timeout=1.0)
+        assert first is not None
+        second = source.wait_for_frame(after_seq=first.seq, timeout=1.0)
+        assert second.seq > first.seq
+
+        frame = source.latest_frame(max_age=0.1)
+        assert frame is not None
+        assert frame.image.size == (8, 16)
+    finally:
+        source.stop()
+    assert not source.is_running()
+
+
+def test_file_frame_source_without_loop_stops(frame_dir):
+    """非循环模式播放完毕后停止"""
+    source = FileFrameSource(frame_dir, fps=200, loop=False)
+    source.start()
+    source._thread.join(timeout=1.0)
+    assert source.latest_frame().seq == 3
+
+
+def test_capture_frame_source_uses_raw_screenshot():
+    """支持原始帧缓冲的设备使用 raw 截图"""
+    device = Mock()
+    device.supports_raw_screenshot = True
+    device.screenshot.return_value = Image.new("RGB", (4, 4))
+
+    source = CaptureFrameSource(device)
+    source.start()
+    try:
+        assert source.wait_for_frame(timeout=1.0) is not None
+    finally:
+        source.stop()
+    device.screenshot.assert_called_with(raw=True)
+
+
+@pytest.mark.asyncio
+async def test_runner_reads_screen_from_frame_source(frame_dir):
+    """CaseRunner 从帧源取图，不再单独截图"""
+    device = Mock()
+    device.tap.return_value = True
+    source = FileFrameSource(frame_dir, fps=60)
+    source.start()
+    try:
+        runner = CaseRunner(device, frame_source=source)
+        result = await runner.run_step(
+            TestStep(step_id=1, action="tap", target_desc="设置", coordinates=[1, 2])
+        )
+    finally:
+        source.stop()
+
+    assert result["success"] is True
+    assert result["screenshot"]
+    device.screenshot.assert_not_called()
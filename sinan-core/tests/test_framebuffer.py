@@ -0,0 +1,48 @@
+"""原始帧缓冲解码测试"""
+import struct
+import pytest
+from pathlib import Path
+from unittest.mock import Mock, patch
+from sinan_core.drivers.framebuffer import decode_framebuffer, parse_header
+from sinan_core.drivers.android import AndroidDevice
+from sinan_core.drivers.base import BaseDevice
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_decode_rgba8888():
+    """解码 RGBA_8888（16 字节头部）"""
+    img = decode_framebuffer((FIXTURES / "framebuffer_rgba8888.raw").read_bytes())
+    assert img.mode == "RGBA"
+    assert img.size == (4, 3)
+    assert img.getpixel((2, 1)) == (120, 100, 200, 255)
+
+
+def test_decode_rgb565():
+    """解码 RGB_565（12 字节旧头部）"""
+    img = decode_framebuffer((FIXTURES / "framebuffer_rgb565.raw").read_bytes())
+    assert img.mode == "RGB"
+    assert img.size == (4, 3)
+    assert [img.getpixel((x, 0)) for x in range(4)] == [
+        (255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255)
+    ]
+
+
+def test_parse_header_rejects_unknown_format():
+    """不支持的像素格式抛出 ValueError"""
+    data = struct.pack("<III", 1, 1, 99) + b"\x00" * 4
+    with pytest.raises(ValueError):
+        parse_header(data)
+
+
+def test_android_raw_screenshot():
+    """AndroidDevice 支持 raw 截图"""
+    assert AndroidDevice.supports_raw_screenshot is True
+    assert BaseDevice.supports_raw_screenshot is False
+
+    data = (FIXTURES / "framebuffer_rgba8888.raw").read_bytes()
+    with patch("subprocess.run", return_value=Mock(returncode=0, stdout=data)) as mock_run:
+        img = AndroidDevice(serial="emulator-5554").screenshot(raw=True)
+
+    assert img.size == (4, 3)
+    assert mock_run.call_args[0][0][-2:] == ["exec-out", "screencap"]
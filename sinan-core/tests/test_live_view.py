@@ -0,0 +1,213 @@
+"""实时画面推送测试"""
+import asyncio
+from io import BytesIO
+from unittest.mock import Mock
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+from sinan_core.api import websocket as ws_module
+from sinan_core.api.frames import unpack_live_frame
+from sinan_core.api.live_view import MAX_FPS_LIMIT, LiveViewManager, parse_max_fps
+from sinan_core.api.main import app
+from sinan_core.drivers.frame_encoder import PNG
+from sinan_core.drivers.tile_diff import TileDiffer
+
+
+def _screen(mark=None, size=(256, 512)) -> Image.Image:
+    image = Image.new("RGB", size, "white")
+    if mark is not None:
+        ImageDraw.Draw(image).rectangle([10, 140, 20, 150], fill=mark)
+    return image
+
+
+def test_first_frame_is_keyframe():
+    """首帧与尺寸变化时发送整帧"""
+    differ = TileDiffer(tile_size=64)
+    delta = differ.diff(_screen())
+    assert delta.keyframe and delta.regions[0][:2] == (0, 0)
+    assert delta.regions[0][2].size == (256, 512)
+    assert differ.diff(_screen(size=(128, 128))).keyframe
+
+
+def test_only_changed_tiles_are_returned():
+    """只返回变化所在的瓦片，静止画面无变化"""
+    differ = TileDiffer(tile_size=64)
+    differ.diff(_screen())
+    assert differ.diff(_screen()).empty
+
+    delta = differ.diff(_screen("red"))
+    assert not delta.keyframe
+    assert delta.changed == 1
+    x, y, region = delta.regions[0]
+    assert (x, y, region.size) == (0, 128, (64, 64))
+
+
+def test_adjacent_tiles_merge_and_large_change_is_keyframe():
+    """同行相邻瓦片合并为一个区域，大面积变化改发整帧"""
+    differ = TileDiffer(tile_size=64, keyframe_ratio=0.5)
+    differ.diff(_screen())
+    wide = _screen()
+    ImageDraw.Draw(wide).rectangle([0, 0, 200, 10], fill="black")
+    delta = differ.diff(wide)
+    assert delta.changed == 4 and len(delta.regions) == 1
+    assert delta.regions[0][2].size == (256, 64)
+
+    assert differ.diff(Image.new("RGB", (256, 512), "black")).keyframe
+
+
+class ChangingDevice:
+    """每次截图内容都不同的设备"""
+
+    def __init__(self, static=False):
+        self.static = static
+        self.shots = 0
+
+    async def screenshot(self):
+        self.shots += 1
+        color = (0, 0, 0) if self.static else ((self.shots * 40) % 256, 0, 0)
+        return _screen(color)
+
+
+@pytest.mark.asyncio
+async def test_stream_pauses_until_acked():
+    """未确认帧达到上限后暂停推送，确认后继续"""
+    sent = []
+
+    async def send(data):
+        sent.append(data)
+
+    views = LiveViewManager(max_bandwidth=0)
+    stream = views.subscribe("ws", "dev", ChangingDevice(), send=send, max_fps=100, max_unacked=2, fmt=PNG)
+    await asyncio.sleep(0.3)
+    assert len(sent) == 2
+
+    header, regions = unpack_live_frame(sent[-1])
+    # 只有标记所在的瓦片变化
+    assert [(x, y) for x, y, _ in regions] == [(0, 128)]
+    assert Image.open(BytesIO(regions[0][2])).size == (128, 128)
+    stream.ack(header.seq)
+    await asyncio.sleep(0.3)
+    assert len(sent) == 4
+    await views.close("ws")
+    assert views.stream_count == 0
+
+
+@pytest.mark.asyncio
+async def test_static_screen_sends_nothing_after_keyframe():
+    """画面静止时只发送首个关键帧，且采集间隔退避"""
+    sent = []
+
+    async def send(data):
+        sent.append(data)
+
+    device = ChangingDevice(static=True)
+    views = LiveViewManager(max_bandwidth=0)
+    views.subscribe("ws", "dev", device, send=send, max_fps=100, max_interval=0.05)
+    await asyncio.sleep(0.3)
+    await views.close("ws")
+
+    assert len(sent) == 1
+    header, regions = unpack_live_frame(sent[0])
+    assert (header.width, header.height) == (256, 512)
+    assert Image.open(BytesIO(regions[0][2])).size == (256, 512)
+    # 退避后采集次数远少于最高帧率下的 30 次
+    assert device.shots < 15
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_device_capture():
+    """同一设备的多个订阅共享截图"""
+    async def send(data):
+        pass
+
+    device = ChangingDevice()
+    views = LiveViewManager(max_bandwidth=0)
+    first = views.subscribe("a", "dev", device, send=send, max_fps=10)
+    second = views.subscribe("b", "dev", device, send=send, max_fps=10)
+    assert first.capture is second.capture
+    await asyncio.sleep(0.05)
+    assert device.shots == 1
+
+    await views.unsubscribe("a", first.stream_id)
+    await views.close("b")
+    assert not views._captures
+
+
+@pytest.mark.asyncio
+async def test_live_view_reads_device_frame_source():
+    """提供设备管理器时从设备共享帧源取帧，不再单独截图，订阅结束后释放帧源"""
+    sent = []
+
+    async def send(data):
+        sent.append(data)
+
+    device = ChangingDevice()
+    source = Mock()
+    source.is_running.return_value = True
+    source.fresh_frame.return_value = Mock(image=_screen())
+    frame_sources = Mock()
+    frame_sources.acquire_frame_source.return_value = source
+    views = LiveViewManager(max_bandwidth=0, frame_sources=frame_sources)
+    views.subscribe("ws", "dev", device, send=send, max_fps=100)
+    await asyncio.sleep(0.05)
+    await views.close("ws")
+
+    assert sent and device.shots == 0
+    frame_sources.acquire_frame_source.assert_called_once_with("dev")
+    frame_sources.release_frame_source.assert_called_once_with("dev")
+
+
+def test_websocket_live_subscribe(monkeypatch):
+    """通过 /ws 订阅设备画面并收到关键帧"""
+    device = ChangingDevice(static=True)
+
+    async def get_async_device(serial):
+        return device
+
+    monkeypatch.setattr(ws_module.device_manager, "get_async_device", get_async_device)
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"type": "live_subscribe", "payload": {"device": "fake"}})
+        subscribed = websocket.receive_json()
+        assert subscribed["type"] == "live_subscribed"
+        stream_id = subscribed["payload"]["streamId"]
+
+        header, regions = unpack_live_frame(websocket.receive_bytes())
+        assert header.stream_id == stream_id and header.seq == 1
+        assert len(regions) == 1
+
+        websocket.send_json({"type": "live_unsubscribe", "payload": {"streamId": stream_id}})
+        assert websocket.receive_json()["type"] == "live_unsubscribed"
+
+
+def test_parse_max_fps():
+    """帧率必须为正数，过高时限制到上限"""
+    assert parse_max_fps(5) == 5.0
+    assert parse_max_fps(1000) == MAX_FPS_LIMIT
+    for value in (0, -1, float("nan"), "10", True, None):
+        with pytest.raises(ValueError):
+            parse_max_fps(value)
+
+
+def test_websocket_rejects_invalid_live_payload(monkeypatch):
+    """非法的 maxFps 返回错误，非法的 seq 被忽略，断开后释放订阅"""
+    device = ChangingDevice(static=True)
+
+    async def get_async_device(serial):
+        return device
+
+    monkeypatch.setattr(ws_module.device_manager, "get_async_device", get_async_device)
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"type": "live_subscribe", "payload": {"device": "fake", "maxFps": 0}})
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"type": "live_subscribe", "payload": {"device": "fake", "maxFps": 5}})
+        stream_id = websocket.receive_json()["payload"]["streamId"]
+        websocket.receive_bytes()
+        websocket.send_json({"type": "live_ack", "payload": {"streamId": stream_id, "seq": "x"}})
+        websocket.send_json({"type": "live_ack", "payload": {"streamId": [stream_id], "seq": 1}})
+        websocket.send_json({"type": "live_keyframe", "payload": "bad"})
+        assert ws_module.live_view.stream_count == 1
+
+    assert ws_module.live_view.stream_count == 0
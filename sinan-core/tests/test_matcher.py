@@ -0,0 +1,62 @@
+"""元素匹配引擎测试"""
+import pytest
+from sinan_core.agents.matcher import ElementMatcher
+from sinan_core.agents.ui_parser import UITreeParser
+
+ELEMENTS = [
+    {"text": "高级设置", "content_desc": "", "resource_id": "", "center": [50, 10]},
+    {"text": "设置中心", "content_desc": "", "resource_id": "", "center": [50, 30]},
+    {"text": "设置", "content_desc": "", "resource_id": "", "center": [50, 50]},
+    {"text": "显示", "content_desc": "", "resource_id": "com.app:id/display", "center": [50, 70]},
+]
+
+
+def test_match_ranks_exact_prefix_substring():
+    """完全相同 > 前缀 > 子串"""
+    results = ElementMatcher(ELEMENTS).match(["设置"])
+
+    assert [r.element["text"] for r in results] == ["设置", "设置中心", "高级设置"]
+    assert [r.kind for r in results] == ["exact", "prefix", "substring"]
+
+
+def test_match_dedups_by_element():
+    """多个关键词命中同一元素只出现一次，坐标相同的不同元素都保留"""
+    elements = ELEMENTS + [{"text": "设置", "center": [50, 50]}]
+    results = ElementMatcher(elements).match(["设置", "设"])
+
+    indexes = [r.index for r in results]
+    assert len(indexes) == len(set(indexes))
+    assert {2, 4} <= set(indexes)
+    assert results[0].hits == 2
+
+
+def test_match_case_insensitive_resource_id():
+    """资源 ID 忽略大小写"""
+    results = ElementMatcher(ELEMENTS).match(["DISPLAY"])
+    assert [r.index for r in results] == [3]
+
+
+def test_match_edit_distance_fallback():
+    """没有直接命中时按编辑距离兜底"""
+    elements = [{"text": "登录"}, {"text": "注册"}]
+    results = ElementMatcher(elements).match(["登陆"])
+
+    assert [r.element["text"] for r in results] == ["登录"]
+    assert results[0].kind in ("edit", "pinyin")
+
+
+def test_match_no_hits():
+    """无关关键词不返回候选"""
+    assert ElementMatcher(ELEMENTS).match(["蓝色图标"]) == []
+
+
+def test_matcher_cached_on_store():
+    """UIElementStore 上的索引只建一次"""
+    parser = UITreeParser()
+    store = parser.parse_android_store(
+        '<hierarchy><node text="设置" bounds="[0,0][100,50]"/></hierarchy>'
+    )
+
+    matcher = ElementMatcher.for_elements(store)
+    assert ElementMatcher.for_elements(store) is matcher
+    assert matcher.match(["设置"])[0].element["center"] == [50, 25]
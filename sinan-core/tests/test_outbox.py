@@ -0,0 +1,139 @@
+"""WebSocket 发送队列与广播测试"""
+import asyncio
+import json
+import time
+import pytest
+from sinan_core.api.outbox import Outbox
+from sinan_core.api.websocket import ConnectionManager
+
+
+class FakeSocket:
+    """模拟客户端：可设置每条消息的发送耗时或直接失败"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False, block: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.block = block
+        self.received = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+    async def send_text(self, data):
+        await self._send(data)
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+    async def _send(self, data):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        if self.block:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(data)
+
+
+@pytest.mark.asyncio
+async def test_messages_sent_in_order():
+    """入队后由写协程按顺序发送"""
+    socket = FakeSocket()
+    outbox = Outbox(socket)
+    outbox.start()
+    for i in range(5):
+        assert outbox.put(str(i))
+    outbox.put(b"frame")
+    await outbox.join()
+
+    assert socket.received == ["0", "1", "2", "3", "4", b"frame"]
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_pending_messages_coalesce():
+    """同键的待发送消息被最新消息替换"""
+    socket = FakeSocket()
+    outbox = Outbox(socket)
+    for i in range(3):
+        outbox.put(f"devices-{i}", droppable=True, key="device_change")
+    outbox.put("reply")
+    outbox.start()
+    await outbox.join()
+
+    assert socket.received == ["devices-2", "reply"]
+    assert outbox.coalesced == 2
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest_notification():
+    """队列满时丢弃最旧的可丢弃消息，保留响应"""
+    socket = FakeSocket()
+    outbox = Outbox(socket, max_size=3)
+    outbox.put("reply")
+    outbox.put("note-1", droppable=True)
+    outbox.put("note-2", droppable=True)
+    outbox.put("note-3", droppable=True)
+    outbox.start()
+    await outbox.join()
+
+    assert socket.received == ["reply", "note-2", "note-3"]
+    assert outbox.dropped == 1
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_client_that_cannot_keep_up_is_closed():
+    """队列中全是不可丢弃消息时关闭连接"""
+    closed = []
+    socket = FakeSocket()
+    outbox = Outbox(socket, max_size=2, on_close=closed.append)
+    outbox.put("a")
+    outbox.put("b")
+
+    assert not outbox.put("c")
+    assert closed == [outbox]
+    await asyncio.sleep(0)
+    assert socket.closed
+
+
+@pytest.mark.asyncio
+async def test_failed_and_stuck_connections_are_pruned():
+    """发送失败或超时的连接从管理器中移除"""
+    manager = ConnectionManager(send_timeout=0.05)
+    healthy, broken, stuck = FakeSocket(), FakeSocket(fail=True), FakeSocket(block=True)
+    for socket in (healthy, broken, stuck):
+        await manager.connect(socket)
+
+    await manager.broadcast({"type": "device_change"})
+    await asyncio.sleep(0.2)
+
+    assert manager.active_connections == [healthy]
+    assert json.loads(healthy.received[0])["type"] == "device_change"
+    assert broken.closed and stuck.closed
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_others():
+    """数百个连接中的慢客户端不影响其他连接收到广播"""
+    manager = ConnectionManager()
+    fast = [FakeSocket(delay=0.001) for _ in range(300)]
+    slow = FakeSocket(delay=0.5)
+    for socket in [slow, *fast]:
+        await manager.connect(socket)
+
+    start = time.perf_counter()
+    await manager.broadcast({"type": "device_change", "payload": {"devices": []}})
+    await asyncio.gather(*(manager.outbox(s).join() for s in fast))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.4
+    assert all(len(s.received) == 1 for s in fast)
+    assert not slow.received
+    for socket in [slow, *fast]:
+        manager.disconnect(socket)
@@ -0,0 +1,73 @@
+"""视觉模型输入预处理测试"""
+from unittest.mock import Mock
+import pytest
+from PIL import Image
+from sinan_core.vision import VisionAgent
+from sinan_core.vision.agent import BACKEND_MAX_PIXELS, QWEN3_VL_FACTOR
+from sinan_core.vision.preprocess import ImagePreprocessor, fit_size
+
+
+def test_fit_size_respects_budget_and_factor():
+    """缩小后不超过像素预算，边长为 factor 的整数倍"""
+    width, height = fit_size(1080, 2400, 1024 * 28 * 28)
+
+    assert width * height <= 1024 * 28 * 28
+    assert width % 28 == 0 and height % 28 == 0
+    assert abs(width / height - 1080 / 2400) < 0.05
+    assert fit_size(100, 200, None) == (100, 200)
+    assert fit_size(100, 200, 10 ** 6) == (100, 200)
+
+
+def test_prepare_maps_coordinates_back():
+    """缩放后的模型坐标映射回设备坐标"""
+    prepared = ImagePreprocessor(max_pixels=540 * 1200, factor=1).prepare(Image.new("RGB", (1080, 2400)))
+
+    assert prepared.image.size == (540, 1200)
+    result = prepared.to_device({"bbox": [100, 200, 150, 260], "center": (125, 230)})
+    assert result["bbox"] == [200, 400, 300, 520]
+    assert result["center"] == (250, 460)
+
+
+def test_prepare_crops_roi_with_margin():
+    """裁剪感兴趣区域，坐标加上裁剪偏移"""
+    preprocessor = ImagePreprocessor(roi_margin=10)
+    prepared = preprocessor.prepare(Image.new("RGB", (1080, 2400)), roi=[100, 1000, 500, 1200])
+
+    assert prepared.image.size == (420, 220)
+    assert prepared.to_device({"center": (10, 10)})["center"] == (100, 1000)
+
+
+def test_prepare_invalid_roi_uses_full_image():
+    """无效区域退化为整张截图"""
+    prepared = ImagePreprocessor().prepare(Image.new("RGB", (100, 100)), roi=[500, 500, 600, 600])
+    assert prepared.image.size == (100, 100)
+    assert prepared.is_identity
+
+
+def test_agent_sends_downscaled_image():
+    """VisionAgent 送入缩小后的图像并返回设备坐标"""
+    agent = VisionAgent(enable_cache=False, batch_window=0, max_pixels=540 * 1200)
+    agent.preprocessor.factor = 1
+    agent._backend = Mock(spec=["detect_element"])
+    agent._backend.detect_element.return_value = {"bbox": [10, 10, 20, 20], "center": (15, 15)}
+
+    result = agent.detect_element(Image.new("RGB", (1080, 2400)), "点击外卖")
+
+    sent = agent._backend.detect_element.call_args[0][0]
+    assert sent.size == (540, 1200)
+    assert result == {"bbox": [20, 20, 40, 40], "center": (30, 30)}
+
+
+def test_agent_uses_backend_pixel_budget():
+    """未指定预算时按后端设置默认预算，显式指定（包括 0）时保持不变"""
+    agent = VisionAgent(enable_cache=False)
+    agent._use_backend(Mock(), "vllm")
+    assert agent.preprocessor.max_pixels == BACKEND_MAX_PIXELS["vllm"]
+    assert agent.preprocessor.factor == QWEN3_VL_FACTOR
+    prepared = agent.preprocessor.prepare(Image.new("RGB", (1440, 3200)))
+    assert prepared.image.width * prepared.image.height <= BACKEND_MAX_PIXELS["vllm"]
+
+    for max_pixels in (0, 540 * 1200):
+        agent = VisionAgent(enable_cache=False, max_pixels=max_pixels)
+        agent._use_backend(Mock(), "mlx")
+        assert agent.preprocessor.max_pixels == max_pixels
@@ -2,7 +2,9 @@
 """用例执行引擎测试"""
 import pytest
 from unittest.mock import Mock, AsyncMock
+from PIL import Image
 from sinan_core.agents.runner import CaseRunner
+from sinan_core.drivers.async_base import SyncDeviceAdapter
 from sinan_core.models.case import TestCase, TestStep
 
 
@@ -10,7 +12,7 @@ from sinan_core.models.case import TestCase, TestStep
 def mock_device():
     device = Mock()
     device.tap.return_value = True
-    device.screenshot.return_value = Mock()  # PIL Image mock
+    device.screenshot.return_value = Image.new("RGB", (10, 20))
     device.get_ui_tree.return_value = {"raw_xml": "<hierarchy/>"}
     return device
 
@@ -41,3 +43,15 @@ async def test_run_case(mock_device):
 
     assert len(results) == 2
     assert all(r["success"] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_runner_closes_its_adapter(mock_device):
+    """执行器关闭自己为同步驱动创建的适配器，不关闭调用方传入的异步设备"""
+    async with CaseRunner(mock_device) as runner:
+        executor = runner.device._executor
+    assert executor._shutdown
+
+    shared = Mock(spec=SyncDeviceAdapter)
+    CaseRunner(shared).close()
+    shared.close.assert_not_called()
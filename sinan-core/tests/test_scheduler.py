@@ -0,0 +1,76 @@
+"""多设备并行调度器测试"""
+import asyncio
+import pytest
+from PIL import Image
+from sinan_core.agents.scheduler import CaseScheduler, DeviceSlot
+from sinan_core.drivers.async_base import AsyncBaseDevice
+from sinan_core.models.case import TestCase, TestStep
+
+
+class FakeDevice(AsyncBaseDevice):
+    """模拟设备，记录同时执行的用例数"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def connect(self): return True
+    async def disconnect(self): pass
+    async def swipe(self, x1, y1, x2, y2, duration_ms=300): return True
+    async def get_ui_tree(self): return {}
+    async def input_text(self, text): return True
+
+    async def tap(self, x, y):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return True
+
+    async def screenshot(self):
+        return Image.new("RGB", (2, 2))
+
+
+def _case(i: int, device_type=None) -> TestCase:
+    case = TestCase(case_id=f"tc_{i}", case_name=f"用例{i}", device_type=device_type)
+    case.add_step(TestStep(step_id=1, action="tap", target_desc="", coordinates=[1, 1]))
+    return case
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_cases_in_parallel_with_affinity():
+    """用例按设备类型分配，每台设备同时只运行一个用例"""
+    devices = {
+        "a1": FakeDevice(), "a2": FakeDevice(), "h1": FakeDevice(),
+    }
+    scheduler = CaseScheduler([
+        DeviceSlot("a1", "android", devices["a1"]),
+        DeviceSlot("a2", "android", devices["a2"]),
+        DeviceSlot("h1", "harmony", devices["h1"]),
+    ])
+    cases = [_case(0, "harmony"), _case(1, "android"), _case(2), _case(3, "ios")]
+
+    results = [r async for r in scheduler.run(cases)]
+
+    by_id = {r["case_id"]: r for r in results}
+    assert by_id["tc_0"]["device"] == "h1"
+    assert by_id["tc_1"]["device"] in ("a1", "a2")
+    assert by_id["tc_3"]["status"] == "skipped"
+    assert scheduler.stats.passed == 3
+    assert all(d.max_active <= 1 for d in devices.values())
+
+
+@pytest.mark.asyncio
+async def test_scheduler_work_stealing():
+    """慢设备积压的用例被空闲设备窃取"""
+    slow, fast = FakeDevice(delay=1.0), FakeDevice()
+    slow_slot = DeviceSlot("slow", "android", slow)
+    scheduler = CaseScheduler([slow_slot, DeviceSlot("fast", "android", fast)])
+    cases = [_case(i) for i in range(4)]
+
+    results = [r async for r in scheduler.run(cases)]
+
+    assert len(results) == 4
+    assert sum(r["device"] == "fast" for r in results) == 3
+    assert scheduler.stats.stolen == 1
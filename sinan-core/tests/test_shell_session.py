@@ -0,0 +1,102 @@
+"""常驻 shell 会话测试（使用本地 sh 代替设备 shell）"""
+import subprocess
+import pytest
+from unittest.mock import Mock, patch
+from sinan_core.drivers.shell_session import ShellSession, ShellSessionPool
+from sinan_core.drivers.android import AndroidDevice
+
+
+@pytest.fixture
+def session():
+    s = ShellSession(["sh"])
+    yield s
+    s.close()
+
+
+def test_run_returns_output_and_code(session):
+    """单条命令返回输出和退出码"""
+    result = session.run("echo hello")
+    assert result.returncode == 0
+    assert result.stdout == "hello\n"
+
+    result = session.run("sh -c 'exit 3'")
+    assert result.returncode == 3
+
+
+def test_output_without_trailing_newline(session):
+    """输出末尾无换行时哨兵仍能正确切分"""
+    result = session.run("printf abc")
+    assert result.stdout == "abc"
+    assert result.returncode == 0
+
+
+def test_run_many_pipelines_commands(session):
+    """多条命令一次写入，按顺序返回"""
+    results = session.run_many(["echo a", "false", "printf 'x\\ny\\n'"])
+    assert [r.returncode for r in results] == [0, 1, 0]
+    assert results[0].stdout == "a\n"
+    assert results[2].stdout == "x\ny\n"
+
+
+def test_reconnect_after_channel_dies(session):
+    """会话进程退出后自动重连"""
+    session.run("echo first")
+    session._proc.kill()
+    session._proc.wait()
+
+    result = session.run("echo again")
+    assert result.stdout == "again\n"
+    assert session.is_alive()
+
+
+def test_shell_that_echoes_input(tmp_path):
+    """回显输入的 shell 不会误判哨兵，回显的命令行也不会混入输出"""
+    script = tmp_path / "echo_shell.sh"
+    script.write_text('while IFS= read -r line; do echo "$line"; eval "$line"; done\n')
+    s = ShellSession(["sh", str(script)])
+    try:
+        result = s.run("sh -c 'exit 3'")
+        assert result.returncode == 3
+        assert result.stdout == ""
+        assert s.run("echo ok").stdout == "ok\n"
+        assert [r.stdout for r in s.run_many(["echo a", "echo b"])] == ["a\n", "b\n"]
+    finally:
+        s.close()
+
+
+def test_command_with_newline_is_rejected(session):
+    """包含换行的命令会破坏分帧，直接拒绝"""
+    with pytest.raises(ValueError):
+        session.run_many(["echo a", "echo b\necho c"])
+    assert session.run("echo a").stdout == "a\n"
+
+
+def test_read_timeout_closes_session():
+    """响应超时后关闭会话，下次调用重新建立"""
+    s = ShellSession(["sh"], timeout=0.2)
+    try:
+        with pytest.raises(subprocess.TimeoutExpired):
+            s.run("sleep 5")
+        assert not s.is_alive()
+        assert s.run("echo again").stdout == "again\n"
+    finally:
+        s.close()
+
+
+def test_pool_reuses_session_per_serial():
+    """同一序列号复用同一会话"""
+    pool = ShellSessionPool(lambda serial: ShellSession(["sh"]))
+    assert pool.get("a") is pool.get("a")
+    assert pool.get("a") is not pool.get("b")
+    pool.close_all()
+
+
+def test_android_tap_uses_shell_session():
+    """AndroidDevice 的 tap 通过会话执行"""
+    session = Mock()
+    session.run_many.return_value = [subprocess.CompletedProcess("input tap 10 20", 0, "", "")]
+    device = AndroidDevice(serial="emulator-5554")
+    with patch("sinan_core.drivers.android._shell_pool") as pool:
+        pool.get.return_value = session
+        assert device.tap(10, 20) is True
+    session.run_many.assert_called_once_with(["input tap 10 20"])
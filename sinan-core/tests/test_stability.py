@@ -0,0 +1,93 @@
+"""屏幕稳定检测测试"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+from PIL import Image
+from sinan_core.agents.stability import ScreenStabilityDetector
+
+
+def _device(frames):
+    device = Mock()
+    device.screenshot = AsyncMock(side_effect=frames)
+    return device
+
+
+@pytest.mark.asyncio
+async def test_static_screen_returns_after_window():
+    """静止画面在稳定窗口后立即返回"""
+    still = Image.new("RGB", (90, 200), "white")
+    detector = ScreenStabilityDetector(
+        _device([still] * 10), stable_window=0.05, poll_interval=0.02, min_settle=0
+    )
+
+    result = await detector.wait()
+
+    assert result.stable is True
+    assert result.image is still
+    assert result.samples <= 5
+
+
+@pytest.mark.asyncio
+async def test_waits_for_animation_to_finish():
+    """画面变化期间持续等待，记录实际稳定耗时"""
+    frames = [Image.new("RGB", (90, 200), (i * 40, 0, 0)) for i in range(4)]
+    frames += [frames[-1]] * 10
+    detector = ScreenStabilityDetector(_device(frames), stable_window=0.05, poll_interval=0.02)
+
+    result = await detector.wait()
+
+    assert result.stable is True
+    assert result.samples >= 5
+    assert result.settle_time >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_timeout_when_screen_never_settles():
+    """一直变化的画面在超时后返回"""
+    frames = [Image.new("RGB", (90, 200), (i % 2 * 255,) * 3) for i in range(100)]
+    detector = ScreenStabilityDetector(_device(frames), stable_window=0.1, poll_interval=0.01, timeout=0.2)
+
+    result = await detector.wait()
+
+    assert result.stable is False
+    assert result.settle_time >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_tree_mode_uses_ui_fingerprint():
+    """tree 模式比较 UI 树结构哈希"""
+    device = Mock()
+    device.get_ui_tree = AsyncMock(return_value={"raw_xml": '<hierarchy><node text="a"/></hierarchy>'})
+    detector = ScreenStabilityDetector(device, mode="tree", stable_window=0.05, poll_interval=0.02, min_settle=0)
+
+    result = await detector.wait()
+
+    assert result.stable is True
+    assert result.image is None
+
+
+@pytest.mark.asyncio
+async def test_unchanged_screen_waits_min_settle():
+    """画面一直未变化时至少等待 min_settle，不把转场前的旧画面当作稳定"""
+    still = Image.new("RGB", (90, 200), "white")
+    detector = ScreenStabilityDetector(
+        _device([still] * 50), stable_window=0.05, poll_interval=0.02, min_settle=0.2
+    )
+
+    result = await detector.wait()
+
+    assert result.stable is True
+    assert result.settle_time >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_late_transition_is_not_missed():
+    """转场晚于稳定窗口才开始时，返回转场后的新画面"""
+    old = Image.new("RGB", (90, 200), "white")
+    new = Image.new("RGB", (90, 200), "black")
+    frames = [old] * 6 + [new] * 30
+    detector = ScreenStabilityDetector(_device(frames), stable_window=0.05, poll_interval=0.02, min_settle=0.3)
+
+    result = await detector.wait()
+
+    assert result.stable is True
+    assert result.image is new
@@ -0,0 +1,60 @@
+"""指令分词测试"""
+import json
+from pathlib import Path
+import pytest
+from sinan_core.agents.executor import ExecutionAgent, ExecutionStrategy
+from sinan_core.agents.tokenizer import InstructionTokenizer
+
+CORPUS = Path(__file__).parent / "fixtures" / "instruction_corpus.json"
+
+
+def test_tokenize_with_screen_vocabulary():
+    """屏幕文本作为整词切出，动词和虚词被丢弃"""
+    tokenizer = InstructionTokenizer()
+    vocab = ["蔬菜", "水果", "我的"]
+
+    assert tokenizer.tokenize("点击蔬菜水果", vocab) == ["蔬菜", "水果"]
+    assert tokenizer.tokenize("请点击底部我的", vocab) == ["底部", "我的"]
+
+
+def test_tokenize_without_vocabulary():
+    """没有屏幕词表时，未登录的连续字符合并为一个关键词"""
+    tokenizer = InstructionTokenizer()
+
+    assert tokenizer.tokenize("点击蔬菜水果") == ["蔬菜水果"]
+    assert tokenizer.tokenize("click Settings") == ["Settings"]
+    assert tokenizer.tokenize("打开 com.app:id/login") == ["com.app:id/login"]
+
+
+def test_tokenize_keeps_instruction_when_empty():
+    """只有动词时返回原始指令"""
+    assert InstructionTokenizer().tokenize("点击") == ["点击"]
+
+
+def test_tokenize_lru_cache():
+    """相同指令和词表命中缓存，超过容量淘汰最久未用的条目"""
+    tokenizer = InstructionTokenizer(cache_size=2)
+
+    tokenizer.tokenize("点击设置", ["设置"])
+    tokenizer.tokenize("点击设置", ["设置"])
+    assert (tokenizer.hits, tokenizer.misses) == (1, 1)
+
+    tokenizer.tokenize("点击显示", ["设置"])
+    tokenizer.tokenize("点击声音", ["设置"])
+    tokenizer.tokenize("点击设置", ["设置"])
+    assert tokenizer.misses == 4
+
+
+def test_corpus_ui_tree_hit_rate():
+    """录制语料上 UI_TREE 策略的命中率"""
+    agent = ExecutionAgent()
+    corpus = json.loads(CORPUS.read_text(encoding="utf-8"))
+
+    hits = 0
+    for record in corpus:
+        elements = [{"text": t, "center": [0, i * 100]} for i, t in enumerate(record["screen"])]
+        strategy, target = agent.decide_strategy(record["instruction"], elements)
+        if strategy == ExecutionStrategy.UI_TREE and target["text"] == record["target"]:
+            hits += 1
+
+    assert hits / len(corpus) >= 0.9
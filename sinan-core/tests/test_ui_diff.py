@@ -0,0 +1,101 @@
+"""UI 树增量对比测试"""
+from sinan_core.agents.ui_diff import UITreeDiffer
+from sinan_core.agents.ui_parser import UITreeParser
+
+BEFORE = '''<hierarchy>
+  <node class="List" bounds="[0,0][100,300]">
+    <node text="草莓" class="Item" bounds="[0,0][100,100]"/>
+    <node text="苹果" class="Item" bounds="[0,100][100,200]"/>
+  </node>
+  <node text="购物车(0)" class="Button" bounds="[0,300][100,400]"/>
+</hierarchy>'''
+
+AFTER = '''<hierarchy>
+  <node class="List" bounds="[0,0][100,300]">
+    <node text="草莓" class="Item" bounds="[0,0][100,100]"/>
+    <node text="苹果" class="Item" bounds="[0,100][100,200]"/>
+    <node text="香蕉" class="Item" bounds="[0,200][100,300]"/>
+  </node>
+  <node text="购物车(1)" class="Button" bounds="[0,300][100,400]"/>
+</hierarchy>'''
+
+
+def test_snapshot_matches_parser_output():
+    """快照的元素列表与 parse_android 一致"""
+    snapshot = UITreeDiffer().snapshot_android(BEFORE)
+    assert snapshot.elements() == UITreeParser().parse_android(BEFORE)
+
+
+def test_identical_dump_has_empty_diff_and_reuses_elements():
+    """相同 dump 结构哈希一致，元素全部复用"""
+    differ = UITreeDiffer()
+    first = differ.snapshot_android(BEFORE)
+    differ.update(first)
+
+    second = differ.snapshot_android(BEFORE)
+    assert second.fingerprint == first.fingerprint
+    assert second.reused == 3
+    assert second.elements()[0] is first.elements()[0]
+    assert differ.update(second).is_empty
+
+
+def test_diff_reports_added_and_changed():
+    """新增节点和属性变化分别报告"""
+    differ = UITreeDiffer()
+    differ.update(differ.snapshot_android(BEFORE))
+    snapshot = differ.snapshot_android(AFTER)
+    diff = differ.update(snapshot)
+
+    assert [e["text"] for e in diff.added.values()] == ["香蕉"]
+    assert not diff.removed
+    [(old, new)] = diff.changed.values()
+    assert (old["text"], new["text"]) == ("购物车(0)", "购物车(1)")
+    assert snapshot.reused == 2
+
+    diff = differ.update(differ.snapshot_android(BEFORE))
+    assert [e["text"] for e in diff.removed.values()] == ["香蕉"]
+
+
+def test_insert_at_front_does_not_shift_siblings():
+    """列表前部插入节点时，按文本取键的兄弟节点路径不变"""
+    front = BEFORE.replace(
+        '<node text="草莓"', '<node text="香蕉" class="Item" bounds="[0,0][100,100]"/>\n    <node text="草莓"'
+    )
+    differ = UITreeDiffer()
+    differ.update(differ.snapshot_android(BEFORE))
+    diff = differ.update(differ.snapshot_android(front))
+
+    assert [e["text"] for e in diff.added.values()] == ["香蕉"]
+    assert not diff.removed and not diff.changed
+
+
+def test_harmony_snapshot_diff():
+    """鸿蒙 JSON 树同样支持增量对比"""
+    tree = {
+        "type": "Column", "text": "", "id": "root",
+        "bounds": {"left": 0, "top": 0, "right": 100, "bottom": 100},
+        "children": [{"type": "Text", "text": "主页", "id": "", "bounds": {}, "children": []}],
+    }
+    differ = UITreeDiffer()
+    first = differ.snapshot_harmony(tree)
+    assert first.elements() == UITreeParser().parse_harmony(tree)
+    differ.update(first)
+
+    tree["children"][0]["text"] = "我的"
+    diff = differ.update(differ.snapshot_harmony(tree))
+    [(old, new)] = diff.changed.values()
+    assert (old["text"], new["text"]) == ("主页", "我的")
+
+
+def test_snapshot_tree_becomes_reuse_baseline():
+    """snapshot_tree 按 get_ui_tree 的返回分派，并作为下次解析复用元素的基准"""
+    differ = UITreeDiffer()
+    first = differ.snapshot_tree({"raw_xml": BEFORE})
+    assert differ.previous is first
+
+    second = differ.snapshot_tree({"raw_xml": AFTER})
+    assert second.reused == 2
+    assert second.elements()[0] is first.elements()[0]
+
+    empty = differ.snapshot_tree({"raw_xml": ""})
+    assert empty.elements() == [] and empty.fingerprint == ""
@@ -1,6 +1,8 @@
 # sinan-core/tests/test_ui_parser.py
 """UI 树解析器测试"""
 import pytest
+from sinan_core.agents.bounds import compute_geometry, decode_bounds, parse_bounds
+from sinan_core.agents.matcher import ElementMatcher
 from sinan_core.agents.ui_parser import UITreeParser
 
 SAMPLE_ANDROID_XML = '''<?xml version="1.0" encoding="UTF-8"?>
@@ -57,3 +59,94 @@ def test_parse_harmony_ui_tree():
     assert len(result) == 2
     assert result[0]["text"] == "主页"
     assert result[1]["text"] == "设置"
+
+
+def test_harmony_id_is_not_matched():
+    """鸿蒙元素只按文本匹配，id 不参与匹配"""
+    parser = UITreeParser()
+    harmony_json = {
+        "type": "Button",
+        "text": "确定",
+        "id": "settings_btn",
+        "bounds": {"left": 0, "top": 0, "right": 100, "bottom": 50},
+    }
+    store = parser.parse_harmony_store(harmony_json)
+
+    assert parser.fuzzy_match("settings", store) == []
+    assert parser.fuzzy_match("settings", store.to_dicts()) == []
+    assert ElementMatcher.for_elements(store).match(["settings_btn"]) == []
+    assert parser.fuzzy_match("确定", store)[0]["id"] == "settings_btn"
+
+
+def test_parse_android_store_compact_columns():
+    """紧凑存储：bounds 为 int32 数组，字典视图与旧格式一致"""
+    parser = UITreeParser()
+    store = parser.parse_android_store(SAMPLE_ANDROID_XML)
+
+    assert len(store) == 2
+    assert store.bounds.dtype.name == "int32"
+    assert store.bounds.shape == (2, 4)
+    assert store.to_dicts() == parser.parse_android(SAMPLE_ANDROID_XML)
+    assert store.element(0) == {
+        "text": "设置",
+        "class": "android.widget.TextView",
+        "content_desc": "",
+        "resource_id": "",
+        "bounds": [0, 0, 100, 50],
+        "center": [50, 25],
+    }
+
+
+def test_store_index_lookup():
+    """索引检索与字典扫描结果一致"""
+    parser = UITreeParser()
+    xml = '''<hierarchy>
+      <node text="设置" class="a" resource-id="com.app:id/settings" bounds="[0,0][1080,200]">
+        <node text="高级设置" class="b" bounds="[0,100][540,200]"/>
+      </node>
+      <node text="显示" class="c" content-desc="Display" bounds="[0,200][1080,400]"/>
+    </hierarchy>'''
+    store = parser.parse_android_store(xml)
+    elements = store.to_dicts()
+
+    for query in ["设置", "SETTINGS", "display", "不存在"]:
+        assert parser.fuzzy_match(query, store) == parser.fuzzy_match(query, elements)
+    assert store.find_exact("设置") == [0]
+
+
+def test_iter_android_deep_tree_without_recursion():
+    """深层嵌套的树不会触发递归溢出"""
+    depth = 5000
+    xml = "<hierarchy>" + '<node class="v" bounds="[0,0][10,10]">' * depth \
+        + '<node text="底部" bounds="[0,0][10,10]"/>' + "</node>" * depth + "</hierarchy>"
+    parser = UITreeParser()
+
+    elements = parser.parse_android(xml)
+    assert [e["text"] for e in elements] == ["底部"]
+
+
+def test_iter_android_predicate_and_limit():
+    """流式解析支持过滤条件和提前停止"""
+    parser = UITreeParser()
+    xml = "<hierarchy>" + "".join(
+        f'<node text="商品{i}" bounds="[0,{i}][10,{i + 1}]"/>' for i in range(100)
+    ) + "<broken"
+    matches = list(parser.iter_android(xml, predicate=lambda e: e["text"].endswith("5"), limit=2))
+    assert [m["text"] for m in matches] == ["商品5", "商品15"]
+    assert parser.parse_android(xml) == []
+
+
+def test_decode_bounds_batch():
+    """批量解码与逐个解析一致，异常格式回退逐个解析"""
+    strs = ["[0,0][100,50]", "[10,20][30,40]", "[5,5][5,5]"]
+    bounds = decode_bounds(strs)
+    assert bounds.dtype.name == "int32"
+    assert bounds.tolist() == [parse_bounds(s) for s in strs]
+    assert decode_bounds(["[0,0][1,1]", "bad"]).tolist() == [[0, 0, 1, 1], [0, 0, 0, 0]]
+    # 数值个数凑巧是 4 的倍数也不能错位
+    assert decode_bounds(["[1,2][3,4][5,6]", "[7,8]"]).tolist() == [[0, 0, 0, 0], [0, 0, 0, 0]]
+
+    geometry = compute_geometry(bounds)
+    assert geometry.centers.tolist() == [[50, 25], [20, 30], [5, 5]]
+    assert geometry.areas.tolist() == [5000, 400, 0]
+    assert geometry.visible.tolist() == [True, True, False]
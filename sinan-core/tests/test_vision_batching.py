@@ -0,0 +1,118 @@
+"""视觉推理微批处理测试"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+from PIL import Image
+from sinan_core.vision import VisionAgent
+from sinan_core.vision.batching import MicroBatcher
+from sinan_core.vision.vllm_backend import VLLMBackend
+
+
+class FakeBatchBackend:
+    """记录批次大小的假后端，结果中心点为指令编号"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_element(self, image, instruction):
+        return self.detect_elements_batch([(image, instruction)])[0]
+
+    def detect_elements_batch(self, requests):
+        self.batch_sizes.append(len(requests))
+        return [{"bbox": [0, 0, 1, 1], "center": [int(instr), 0]} for _, instr in requests]
+
+
+def _agent(backend) -> VisionAgent:
+    agent = VisionAgent(enable_cache=False, batch_window=0.05)
+    agent._backend = backend
+    return agent
+
+
+def test_concurrent_requests_share_one_batch():
+    """并发请求合并为一个批次，各自拿到自己的结果"""
+    backend = FakeBatchBackend()
+    agent = _agent(backend)
+    image = Image.new("RGB", (10, 10))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda i: agent.detect_element(image, str(i)), range(4)))
+    agent.close()
+
+    assert [r["center"][0] for r in results] == [0, 1, 2, 3]
+    assert backend.batch_sizes == [4]
+
+
+@pytest.mark.asyncio
+async def test_async_requests_batched():
+    """多个协程的并发请求同样被合并"""
+    backend = FakeBatchBackend()
+    agent = _agent(backend)
+    image = Image.new("RGB", (10, 10))
+
+    results = await asyncio.gather(*(agent.detect_element_async(image, str(i)) for i in range(3)))
+    agent.close()
+
+    assert [r["center"][0] for r in results] == [0, 1, 2]
+    assert backend.batch_sizes == [3]
+
+
+def test_batch_respects_max_size():
+    """超过 max_batch 的请求拆成多个批次"""
+    sizes = []
+    batcher = MicroBatcher(lambda reqs: sizes.append(len(reqs)) or [None] * len(reqs), max_batch=2, window=0.05)
+    futures = [batcher.submit(None, str(i)) for i in range(5)]
+
+    assert [f.result(timeout=2) for f in futures] == [None] * 5
+    batcher.close()
+    assert sorted(sizes, reverse=True) == [2, 2, 1]
+
+
+def test_batch_error_propagates_to_each_future():
+    """批处理异常传递给批次内的每个请求"""
+    def fail(requests):
+        raise RuntimeError("显存不足")
+
+    batcher = MicroBatcher(fail, window=0.01)
+    futures = [batcher.submit(None, "a"), batcher.submit(None, "b")]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=2)
+    batcher.close()
+
+
+def test_cached_requests_skip_batch():
+    """命中缓存的请求不送入模型"""
+    backend = FakeBatchBackend()
+    agent = VisionAgent(batch_window=0)
+    agent._backend = backend
+    image = Image.new("RGB", (10, 10))
+
+    agent.detect_element(image, "1")
+    results = agent.detect_elements_batch([(image, "1"), (image, "2")])
+
+    assert [r["center"][0] for r in results] == [1, 2]
+    assert backend.batch_sizes == [1, 1]
+
+
+def test_vllm_batch_sends_concurrent_requests():
+    """vLLM 后端批量检测时并发发送请求"""
+    barrier = threading.Barrier(3, timeout=2)
+
+    def create(**kwargs):
+        # 三个请求必须同时在途才能通过屏障
+        barrier.wait()
+        text = kwargs["messages"][0]["content"][1]["text"]
+        index = text.split('"')[1]
+        content = f'{{"bbox_2d": [{index}, 0, {index}, 0]}}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    backend = VLLMBackend()
+    backend.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    image = Image.new("RGB", (10, 10))
+
+    results = backend.detect_elements_batch([(image, str(i)) for i in range(3)])
+    assert [r["bbox"][0] for r in results] == [0, 1, 2]
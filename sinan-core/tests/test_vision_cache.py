@@ -0,0 +1,99 @@
+"""视觉推理结果缓存测试"""
+import os
+import time
+from unittest.mock import Mock
+import pytest
+from PIL import Image, ImageDraw
+from sinan_core.vision import VisionAgent
+from sinan_core.vision.cache import VisionResultCache, normalize_instruction, perceptual_hash
+
+RESULT = {"bbox": [10, 10, 60, 40], "center": [35, 25]}
+
+
+def _screen(offset: int = 0, size=(360, 720)) -> Image.Image:
+    image = Image.new("RGB", size, "white")
+    ImageDraw.Draw(image).rectangle([20, 20 + offset, 200, 80 + offset], fill="black")
+    return image
+
+
+def test_perceptual_hash_tolerates_noise():
+    """细微噪声只改变少量位，不同画面差异很大"""
+    noisy = _screen()
+    noisy.putpixel((300, 700), (240, 240, 240))
+    base = perceptual_hash(_screen())
+
+    assert (base ^ perceptual_hash(noisy)).bit_count() <= 4
+    assert (base ^ perceptual_hash(_screen(offset=400))).bit_count() > 4
+
+
+def test_normalize_instruction():
+    """全角、大小写和空白被规范化"""
+    assert normalize_instruction("  点击  ＷｉＦｉ ") == "点击 wifi"
+
+
+def test_memory_hit_and_miss():
+    """同一屏幕同一指令命中，换屏幕、换尺寸或换指令均未命中"""
+    cache = VisionResultCache()
+    cache.put(_screen(), "点击外卖", RESULT)
+
+    assert cache.get(_screen(), " 点击外卖 ") == RESULT
+    assert cache.get(_screen(offset=400), "点击外卖") is None
+    assert cache.get(_screen(size=(720, 1440)), "点击外卖") is None
+    assert cache.get(_screen(), "点击加入购物车") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_memory_eviction():
+    """内存按条目数 LRU 淘汰"""
+    cache = VisionResultCache(max_entries=1)
+    cache.put(_screen(), "a", RESULT)
+    cache.put(_screen(), "b", RESULT)
+
+    assert cache.get(_screen(), "a") is None
+    assert cache.get(_screen(), "b") == RESULT
+
+
+def test_disk_tier(tmp_path):
+    """磁盘缓存跨实例命中"""
+    VisionResultCache(cache_dir=tmp_path).put(_screen(), "点击外卖", RESULT)
+
+    cache = VisionResultCache(cache_dir=tmp_path)
+    assert cache.get(_screen(), "点击外卖") == RESULT
+    assert cache.disk_hits == 1
+
+
+def test_disk_size_eviction(tmp_path):
+    """磁盘总大小超限时淘汰最久未访问的文件"""
+    cache = VisionResultCache(cache_dir=tmp_path, max_disk_bytes=300)
+    cache.put(_screen(), "第一条", RESULT)
+    oldest = next(tmp_path.glob("*.json"))
+    past = time.time() - 60
+    os.utime(oldest, (past, past))
+    cache.put(_screen(), "第二条", RESULT)
+    cache.put(_screen(), "第三条", RESULT)
+
+    assert not oldest.exists()
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.json")) <= 300
+
+
+def test_agent_skips_backend_on_hit():
+    """VisionAgent 命中缓存时不调用后端"""
+    agent = VisionAgent()
+    agent._backend = Mock(spec=["detect_element"])
+    agent._backend.detect_element.return_value = RESULT
+
+    assert agent.detect_element(_screen(), "点击外卖") == RESULT
+    assert agent.detect_element(_screen(), "点击外卖") == RESULT
+    assert agent._backend.detect_element.call_count == 1
+
+
+def test_agent_cache_disabled():
+    """关闭缓存时每次都调用后端"""
+    agent = VisionAgent(enable_cache=False)
+    agent._backend = Mock(spec=["detect_element"])
+    agent._backend.detect_element.return_value = RESULT
+
+    agent.detect_element(_screen(), "点击外卖")
+    agent.detect_element(_screen(), "点击外卖")
+    assert agent._backend.detect_element.call_count == 2
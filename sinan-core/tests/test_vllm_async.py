@@ -0,0 +1,169 @@
+"""异步 vLLM 后端测试，使用本地的 OpenAI 兼容桩服务"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from PIL import Image
+from sinan_core.vision import VisionAgent
+from sinan_core.vision.vllm_backend import AsyncVLLMBackend
+
+
+class StubServer:
+    """OpenAI 兼容桩服务：记录并发数，可让前若干个请求失败或超时"""
+
+    def __init__(self, delay: float = 0.05, fail_first: int = 0, fail_status: int = 503, hang_first: int = 0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.hang_first = hang_first
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply(200, {"data": [{"id": "MAI-UI-8B"}]})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    number = stub.requests
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if number <= stub.hang_first:
+                        time.sleep(1.0)
+                    time.sleep(stub.delay)
+                    if number <= stub.fail_first:
+                        self._reply(stub.fail_status, {"error": "busy"})
+                        return
+                    # 用指令中的数字作为坐标，便于核对结果
+                    text = body["messages"][0]["content"][1]["text"]
+                    n = int(text.split('"')[1])
+                    content = json.dumps({"bbox_2d": [n, n, n + 10, n + 10]})
+                    self._reply(200, {"choices": [{"message": {"content": content}}]})
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+IMAGE = Image.new("RGB", (20, 20))
+
+
+@pytest.mark.asyncio
+async def test_async_detect_and_in_flight_limit():
+    """并发请求受 max_in_flight 限制，结果各自对应"""
+    with StubServer(delay=0.1) as stub:
+        backend = AsyncVLLMBackend(base_url=stub.url, max_in_flight=2)
+        assert await backend.initialize_async()
+
+        results = await backend.detect_elements_batch_async([(IMAGE, str(i)) for i in range(6)])
+        await backend.aclose()
+
+    assert [r["bbox"][0] for r in results] == [0, 1, 2, 3, 4, 5]
+    assert stub.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_status():
+    """503 时带退避重试直到成功"""
+    with StubServer(delay=0, fail_first=2) as stub:
+        backend = AsyncVLLMBackend(base_url=stub.url, max_retries=2, backoff=0.01)
+        await backend.initialize_async()
+        result = await backend.detect_element_async(IMAGE, "7")
+        await backend.aclose()
+
+    assert result["center"] == (12, 12)
+    assert backend.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_retries_and_on_client_error():
+    """重试耗尽或 4xx 时返回 None"""
+    with StubServer(delay=0, fail_first=10) as stub:
+        backend = AsyncVLLMBackend(base_url=stub.url, max_retries=1, backoff=0.01)
+        await backend.initialize_async()
+        assert await backend.detect_element_async(IMAGE, "1") is None
+        assert stub.requests == 2
+        await backend.aclose()
+
+    with StubServer(delay=0, fail_first=10, fail_status=400) as stub:
+        backend = AsyncVLLMBackend(base_url=stub.url, max_retries=3, backoff=0.01)
+        await backend.initialize_async()
+        assert await backend.detect_element_async(IMAGE, "1") is None
+        assert stub.requests == 1
+        await backend.aclose()
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_retried():
+    """请求超时后重试"""
+    with StubServer(delay=0, hang_first=1) as stub:
+        backend = AsyncVLLMBackend(base_url=stub.url, timeout=0.3, max_retries=1, backoff=0.01)
+        await backend.initialize_async()
+        result = await backend.detect_element_async(IMAGE, "3")
+        await backend.aclose()
+
+    assert result["bbox"] == [3, 3, 13, 13]
+    assert backend.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_vision_agent_uses_async_backend():
+    """VisionAgent 的异步接口直接走异步后端，且不阻塞事件循环"""
+    with StubServer(delay=0.2) as stub:
+        agent = VisionAgent(prefer_mlx=False, vllm_url=stub.url)
+        assert agent.initialize()
+        assert agent.backend_name == "vllm"
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await agent.detect_element_async(IMAGE, "5")
+        task.cancel()
+        await agent.aclose()
+
+    assert result["bbox"] == [5, 5, 15, 15]
+    assert ticks >= 10
+
@@ -0,0 +1,115 @@
+"""WebSocket 二进制截图帧测试"""
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sinan_core.api import websocket as ws_module
+from sinan_core.api.frames import HEADER_SIZE, pack_frame, unpack_frame
+from sinan_core.api.main import app
+from sinan_core.agents.executor import ExecutionStrategy
+from sinan_core.drivers.frame_encoder import PNG, PREVIEW
+
+
+def test_pack_unpack_roundtrip():
+    """帧头字段和图像字节原样还原"""
+    frame = pack_frame(7, 3, PREVIEW, (1080, 2400), b"jpeg-bytes")
+
+    header, data = unpack_frame(frame)
+    assert len(frame) == HEADER_SIZE + len(b"jpeg-bytes")
+    assert (header.msg_id, header.step_id, header.format) == (7, 3, "jpeg")
+    assert (header.width, header.height) == (1080, 2400)
+    assert data == b"jpeg-bytes"
+
+
+def test_unpack_rejects_invalid_frames():
+    """过短或 magic 不匹配的帧报错"""
+    with pytest.raises(ValueError):
+        unpack_frame(b"SN")
+    with pytest.raises(ValueError):
+        unpack_frame(b"XX" + pack_frame(1, 1, PNG, (1, 1), b"")[2:])
+
+
+class FakeDevice:
+    def __init__(self):
+        self.image = Image.new("RGB", (120, 240), "blue")
+
+    async def get_ui_tree(self):
+        return {"raw_xml": ""}
+
+    async def tap(self, x, y):
+        return True
+
+    async def screenshot(self):
+        return self.image
+
+
+@pytest.fixture
+def fake_step(monkeypatch):
+    """让 execute 直接走 UI 树策略，并返回固定截图"""
+    device = FakeDevice()
+
+    async def get_async_device(serial):
+        return device
+
+    class Detector:
+        def __init__(self, device, differ):
+            self.device = device
+            self.differ = differ
+
+        async def wait(self):
+            return SimpleNamespace(image=device.image, settle_time=0.1)
+
+    monkeypatch.setattr(ws_module.device_manager, "get_async_device", get_async_device)
+    monkeypatch.setattr(ws_module.execution_agent, "decide_strategy",
+                        lambda instruction, elements, screen_key: (ExecutionStrategy.UI_TREE, {"center": (1, 1), "text": "设置"}))
+    monkeypatch.setattr(ws_module, "ScreenStabilityDetector", Detector)
+    return device
+
+
+def _execute(websocket):
+    websocket.send_json({"type": "execute", "payload": {"instruction": "点击设置", "device": "fake"}})
+    assert websocket.receive_json()["type"] == "step_start"
+
+
+def test_legacy_client_gets_base64(fake_step):
+    """未协商的客户端仍在 JSON 中收到 base64 截图"""
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        _execute(websocket)
+        done = websocket.receive_json()
+        assert done["type"] == "step_done"
+        image = Image.open(BytesIO(base64.b64decode(done["payload"]["screenshot"])))
+        assert image.size == (120, 240)
+        assert "screenshotFrame" not in done["payload"]
+        assert websocket.receive_json()["type"] == "case_done"
+
+
+def test_binary_client_gets_frame(fake_step):
+    """协商后截图以二进制帧发送，JSON 中只带帧 id"""
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"type": "hello", "payload": {"binaryFrames": True}})
+        assert websocket.receive_json()["payload"]["binaryFrames"] is True
+
+        _execute(websocket)
+        done = websocket.receive_json()
+        assert "screenshot" not in done["payload"]
+        header, data = unpack_frame(websocket.receive_bytes())
+        assert header.msg_id == done["payload"]["screenshotFrame"]
+        assert (header.step_id, header.format) == (1, done["payload"]["screenshotFormat"])
+        assert (header.width, header.height) == (120, 240)
+        assert Image.open(BytesIO(data)).format == "JPEG"
+        assert websocket.receive_json()["type"] == "case_done"
+
+
+def test_disconnect_forgets_capability():
+    """断开后不再保留连接能力"""
+    manager = ws_module.ConnectionManager()
+    websocket = object()
+    manager.active_connections.append(websocket)
+    assert manager.negotiate(websocket, {"binaryFrames": True})["binaryFrames"] is True
+
+    manager.disconnect(websocket)
+    assert websocket not in manager.binary_clients
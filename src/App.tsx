@@ -42,6 +42,7 @@ function App() {
         action: step.action,
         targetDesc: step.targetDesc,
         screenshot: step.screenshot,
+        screenshotFormat: step.screenshotFormat,
         status: step.status,
       }))
     : mockSteps
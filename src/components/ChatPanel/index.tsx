@@ -25,8 +25,13 @@ export function ChatPanel() {
       const { caseId, stepId } = msg.payload as { caseId: string; stepId: number }
       updateStep(caseId, stepId, { status: 'running' })
     } else if (msg.type === 'step_done') {
-      const { caseId, stepId, screenshot } = msg.payload as { caseId: string; stepId: number; screenshot: string }
-      updateStep(caseId, stepId, { status: 'passed', screenshot })
+      const { caseId, stepId, screenshot, screenshotFormat } = msg.payload as {
+        caseId: string
+        stepId: number
+        screenshot: string
+        screenshotFormat?: string
+      }
+      updateStep(caseId, stepId, { status: 'passed', screenshot, screenshotFormat })
     } else if (msg.type === 'case_done') {
       setIsLoading(false)
       const result = (msg.payload as { result: string })?.result
@@ -16,6 +16,7 @@ type Step = {
   action: string
   targetDesc: string
   screenshot?: string
+  screenshotFormat?: string
   status: 'pending' | 'running' | 'passed' | 'failed'
 }
 
@@ -30,6 +31,7 @@ function StepNode({ data }: { data: Step }) {
         action={data.action}
         targetDesc={data.targetDesc}
         screenshot={data.screenshot}
+        screenshotFormat={data.screenshotFormat}
         status={data.status}
       />
     </div>
@@ -4,6 +4,7 @@ interface ScreenshotNodeProps {
   action: string
   targetDesc: string
   screenshot?: string
+  screenshotFormat?: string
   status: 'pending' | 'running' | 'passed' | 'failed'
 }
 
@@ -12,6 +13,7 @@ export function ScreenshotNode({
   action,
   targetDesc,
   screenshot,
+  screenshotFormat = 'png',
   status,
 }: ScreenshotNodeProps) {
   const statusLabel = {
@@ -32,7 +34,7 @@ export function ScreenshotNode({
           <div className="screenshot-preview">
             {screenshot ? (
               <img
-                src={`data:image/png;base64,${screenshot}`}
+                src={screenshot.startsWith('blob:') ? screenshot : `data:image/${screenshotFormat};base64,${screenshot}`}
                 alt={`步骤 ${stepId}`}
                 className="w-full h-full object-cover"
               />
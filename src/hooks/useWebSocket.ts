@@ -6,6 +6,12 @@ interface WebSocketMessage {
   payload?: Record<string, unknown>
 }
 
+// 二进制截图帧头部：magic(2) version(1) format(1) msgId(4) stepId(4) width(2) height(2)，大端序
+const FRAME_HEADER_SIZE = 16
+const FRAME_MIMES: Record<number, string> = { 1: 'image/png', 2: 'image/jpeg', 3: 'image/webp' }
+// 最多等待的二进制帧数，超出时丢弃最早的
+const MAX_PENDING_FRAMES = 32
+
 interface UseWebSocketOptions {
   url: string
   onMessage?: (message: WebSocketMessage) => void
@@ -16,18 +22,25 @@ export function useWebSocket({ url, onMessage, reconnectInterval = 3000 }: UseWe
   const wsRef = useRef<WebSocket | null>(null)
   const [connected, setConnected] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  // 等待二进制截图帧的消息，按帧 id 索引
+  const pendingRef = useRef(new Map<number, WebSocketMessage>())
 
   const connect = useCallback(() => {
     try {
       const ws = new WebSocket(url)
+      ws.binaryType = 'arraybuffer'
 
       ws.onopen = () => {
         setConnected(true)
         setError(null)
+        // 协商二进制截图帧
+        ws.send(JSON.stringify({ type: 'hello', payload: { binaryFrames: true } }))
       }
 
       ws.onclose = () => {
         setConnected(false)
+        // 旧连接上未到达的二进制帧不会再来
+        pendingRef.current.clear()
         // 自动重连
         setTimeout(connect, reconnectInterval)
       }
@@ -37,8 +50,28 @@ export function useWebSocket({ url, onMessage, reconnectInterval = 3000 }: UseWe
       }
 
       ws.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+          const view = new DataView(event.data)
+          const msgId = view.getUint32(4)
+          const message = pendingRef.current.get(msgId)
+          if (!message) return
+          pendingRef.current.delete(msgId)
+          const blob = new Blob([event.data.slice(FRAME_HEADER_SIZE)], { type: FRAME_MIMES[view.getUint8(3)] })
+          onMessage?.({ ...message, payload: { ...message.payload, screenshot: URL.createObjectURL(blob) } })
+          return
+        }
         try {
           const message = JSON.parse(event.data) as WebSocketMessage
+          const frameId = message.payload?.screenshotFrame
+          if (typeof frameId === 'number') {
+            // 截图随后以二进制帧到达
+            const pending = pendingRef.current
+            pending.set(frameId, message)
+            if (pending.size > MAX_PENDING_FRAMES) {
+              pending.delete(pending.keys().next().value as number)
+            }
+            return
+          }
           onMessage?.(message)
         } catch (e) {
           console.error('解析消息失败:', e)
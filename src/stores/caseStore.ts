@@ -7,6 +7,7 @@ interface TestStep {
   targetDesc: string
   coordinates: number[]
   screenshot?: string
+  screenshotFormat?: string
   status: 'pending' | 'running' | 'passed' | 'failed'
 }
 
@@ -25,23 +26,40 @@ interface CaseState {
   setCurrentCase: (caseId: string) => void
 }
 
+// 二进制截图帧生成的是 blob URL，不再使用时需要释放
+function revokeScreenshot(screenshot?: string) {
+  if (screenshot?.startsWith('blob:')) {
+    URL.revokeObjectURL(screenshot)
+  }
+}
+
 export const useCaseStore = create<CaseState>((set) => ({
   cases: [],
   currentCase: null,
   addCase: (testCase) => set((state) => ({
     cases: [...state.cases, testCase]
   })),
-  updateStep: (caseId, stepId, update) => set((state) => ({
-    cases: state.cases.map(c =>
+  updateStep: (caseId, stepId, update) => set((state) => {
+    let stored = false
+    const cases = state.cases.map(c =>
       c.caseId === caseId
         ? {
             ...c,
-            steps: c.steps.map(s =>
-              s.stepId === stepId ? { ...s, ...update } : s
-            )
+            steps: c.steps.map(s => {
+              if (s.stepId !== stepId) return s
+              stored = true
+              // 截图被替换时释放旧的 blob URL
+              if (update.screenshot !== undefined && s.screenshot !== update.screenshot) {
+                revokeScreenshot(s.screenshot)
+              }
+              return { ...s, ...update }
+            })
           }
         : c
     )
-  })),
+    // 没有对应步骤时截图不会被展示，直接释放
+    if (!stored) revokeScreenshot(update.screenshot)
+    return { cases }
+  }),
   setCurrentCase: (caseId) => set({ currentCase: caseId }),
 }))